@@ -0,0 +1,93 @@
+# File: .dev-tools/benchmarks/bench_dynamo_json.py
+# Compares the former recursive python_to_dynamodb_json + json.dumps with the dynamo_json streaming writer.
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from faker import Faker
+from dummyStudent import generate_student_data
+from dynamo_json import dump_item, dumps_item, serialize_item
+
+# --- Former Implementation (baseline) ---
+
+def legacy_python_to_dynamodb_json(data):
+    """The recursive converter dummyStudent used before dynamo_json, kept verbatim for comparison."""
+    if isinstance(data, dict):
+        return {'M': {k: legacy_python_to_dynamodb_json(v) for k, v in data.items()}}
+    elif isinstance(data, list):
+        return {'L': [legacy_python_to_dynamodb_json(i) for i in data]}
+    elif isinstance(data, str):
+        return {'S': data} if data else {'NULL': True}
+    elif isinstance(data, (int, float)):
+        return {'N': str(data)}
+    elif isinstance(data, bool):
+        return {'BOOL': data}
+    elif data is None:
+        return {'NULL': True}
+    else:
+        return {'S': str(data)}
+
+def legacy_write(students, stream):
+    for student in students:
+        stream.write(json.dumps(legacy_python_to_dynamodb_json(student)['M'], indent=2))
+
+def streaming_write(students, stream):
+    for student in students:
+        dump_item(student, stream, indent=2, empty_string_as_null=True)
+
+def time_path(label, func, students, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func(students)
+        best = min(best, time.perf_counter() - started_at)
+    print(f"  {label:<34} {best:8.3f}s  {len(students) / best:12,.0f} items/sec")
+    return best
+
+def peak_memory(func, students):
+    """Peak Python heap (KiB) while converting a single large item."""
+    tracemalloc.start()
+    func(students)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark DynamoDB JSON conversion (items/sec).')
+    parser.add_argument('--items', type=int, default=20000, help='Number of generated students to convert.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation; the best time is reported.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the generated students.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    faker = Faker()
+    faker.seed_instance(args.seed)
+    students = [generate_student_data(student_id, rng, faker) for student_id in range(1000, 1000 + args.items)]
+
+    # Both implementations must agree before their speed is worth comparing
+    for student in students[:1000]:
+        expected = legacy_python_to_dynamodb_json(student)['M']
+        if serialize_item(student, empty_string_as_null=True) != expected or dumps_item(student, indent=2, empty_string_as_null=True) != json.dumps(expected, indent=2):
+            print(f"Error: dynamo_json output differs from the legacy converter for student {student['StudentId']}")
+            sys.exit(1)
+    if serialize_item({'Active': True})['Active'] != {'BOOL': True}:
+        print("Error: booleans must serialize as BOOL.")
+        sys.exit(1)
+
+    print(f"Converting {args.items} students to indented DynamoDB JSON (best of {args.repeat}):")
+    legacy_time = time_path('legacy (recursive + json.dumps)', lambda items: legacy_write(items, io.StringIO()), students, args.repeat)
+    stream_time = time_path('dynamo_json.dump_item (streaming)', lambda items: streaming_write(items, io.StringIO()), students, args.repeat)
+    print(f"  Speedup: {legacy_time / stream_time:.2f}x")
+
+    # One wide item: the legacy path holds the whole wrapper tree and the full text in memory at once
+    big_item = {'StudentId': 0, 'History': students[:2000]}
+    print("Peak memory converting one item holding 2000 students:")
+    print(f"  legacy:  {peak_memory(lambda items: legacy_write(items, io.StringIO()), [big_item]):10,.0f} KiB")
+    print(f"  stream:  {peak_memory(lambda items: streaming_write(items, open(os.devnull, 'w')), [big_item]):10,.0f} KiB")
@@ -0,0 +1,116 @@
+# File: .dev-tools/benchmarks/bench_extraction_pipeline.py
+# Runs reqs_creator's batch pipeline offline: saved (or synthetic) pages from fixture_server, answers from the
+# replay model. Reports throughput, throttling/429 behavior and cache effectiveness for a cold and a warm run.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import reqs_creator
+from bench_page_extraction import load_pages, make_catalog_page
+from fixture_server import FixtureServer, write_manifest
+from model_backends import ReplayBackend
+
+def synthetic_recordings(major_codes, rng):
+    """One recorded answer per major, matched by major code."""
+    recordings = []
+    for major_code in major_codes:
+        rules = [{"MajorCode": major_code, "RequirementType": requirement_type,
+                  "Courses": [{"Subject": "CIS", "CourseNumber": str(rng.randint(1000, 4999))} for _ in range(3)]}
+                 for requirement_type in ("CORE", "ELECTIVES")]
+        recordings.append({"major_code": major_code, "text": json.dumps(rules)})
+    return recordings
+
+def run_pass(label, manifest, output_file, args, verbose):
+    """One batch run with the current model/caches; returns the printed summary numbers."""
+    model = reqs_creator.model
+    before = dict(model.stats)
+    http_before = (reqs_creator.http_cache.revalidated, reqs_creator.http_cache.downloaded)
+    llm_before = (reqs_creator.llm_cache.hits, reqs_creator.llm_cache.misses)
+    log = io.StringIO()
+    started_at = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else log):
+        try:
+            reqs_creator.run_batch(manifest, output_file, fetch_workers=args.fetch_workers, llm_workers=args.llm_workers)
+        except SystemExit:
+            pass # Failed majors are counted below
+    elapsed = time.perf_counter() - started_at
+
+    calls = model.stats['generate'] - before['generate']
+    rate_limited = model.stats['rate_limited'] - before['rate_limited']
+    throttled = log.getvalue().count('-> Throttling:')
+    with open(output_file, 'r', encoding='utf-8') as f:
+        rules_written = len(json.load(f))
+    print(f"  {label:<5} {elapsed:8.2f}s  {len(manifest) / elapsed * 60:9,.1f} majors/min  {rules_written:6} rules  "
+          f"{calls:5} model calls  {rate_limited:4} x 429  {throttled:4} throttle waits  "
+          f"HTTP 304/200: {reqs_creator.http_cache.revalidated - http_before[0]}/{reqs_creator.http_cache.downloaded - http_before[1]}  "
+          f"LLM cache hit/miss: {reqs_creator.llm_cache.hits - llm_before[0]}/{reqs_creator.llm_cache.misses - llm_before[1]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the reqs_creator batch pipeline offline (majors/min, throttling, caches).')
+    parser.add_argument('pages', nargs='*', help='Saved catalog pages (.html files or directories). Synthetic pages are used when omitted.')
+    parser.add_argument('--synthetic', type=int, default=40, help='Number of synthetic pages to generate when no pages are given.')
+    parser.add_argument('--replay-file', default=None, help='Recorded responses (JSON Lines from reqs_creator --record-file). Synthetic answers when omitted.')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds each model response takes.')
+    parser.add_argument('--fetch-latency', type=float, default=0.02, help='Seconds each page fetch takes.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of model calls answered with an injected 429.')
+    parser.add_argument('--server-rpm', type=int, default=None, help='RPM enforced by the fake model service (429 above it).')
+    parser.add_argument('--server-tpm', type=int, default=None, help='TPM enforced by the fake model service (429 above it).')
+    parser.add_argument('--rpm', type=int, default=reqs_creator.RPM_LIMIT, help='RPM limit given to the throttler.')
+    parser.add_argument('--tpm', type=int, default=reqs_creator.TPM_LIMIT, help='TPM limit given to the throttler.')
+    parser.add_argument('--fetch-workers', type=int, default=reqs_creator.DEFAULT_FETCH_WORKERS, help='Concurrent page fetches.')
+    parser.add_argument('--llm-workers', type=int, default=4, help='Concurrent model calls.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for synthetic pages, answers, latency jitter and 429s.')
+    parser.add_argument('--verbose', action='store_true', help="Show reqs_creator's own output.")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+    try:
+        rng = random.Random(args.seed)
+        page_dir = os.path.join(work_dir, 'pages')
+        os.makedirs(page_dir)
+        pages = load_pages(args.pages) if args.pages else [(f"MAJOR_{index}.html", make_catalog_page(rng)) for index in range(args.synthetic)]
+        if not pages:
+            print("Error: No .html pages found.")
+            sys.exit(1)
+        for name, content in pages:
+            with open(os.path.join(page_dir, name), 'wb') as f:
+                f.write(content)
+
+        server = FixtureServer(page_dir, latency=args.fetch_latency).start()
+        manifest_path = os.path.join(work_dir, 'manifest.csv')
+        write_manifest(server, manifest_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            manifest = reqs_creator.load_manifest(manifest_path)
+
+        options = {'latency': args.latency, 'jitter': args.latency / 4, 'error_rate': args.error_rate,
+                   'server_rpm': args.server_rpm, 'server_tpm': args.server_tpm, 'seed': args.seed}
+        if args.replay_file:
+            reqs_creator.model = ReplayBackend.from_file(args.replay_file, **options)
+        else:
+            reqs_creator.model = ReplayBackend(synthetic_recordings([code for code, _ in manifest], rng), **options)
+        reqs_creator.MODEL_NAME = reqs_creator.model.name
+        reqs_creator.WEBSITE_SCRAPE_DELAY = 0 # Local fixture server: no politeness delay needed
+        reqs_creator.api_throttler = reqs_creator.Throttler(args.rpm, args.tpm, reqs_creator.RPD_LIMIT)
+        reqs_creator.llm_cache = reqs_creator.LLMResultCache(os.path.join(work_dir, 'llm_cache'))
+        reqs_creator.http_cache = reqs_creator.HttpPageCache(os.path.join(work_dir, 'http_cache'))
+
+        print(f"Extracting {len(manifest)} page(s) offline ({args.fetch_workers} fetch / {args.llm_workers} LLM workers, "
+              f"{args.latency:.2f}s model latency, {args.error_rate:.0%} injected 429s):")
+        output_file = os.path.join(work_dir, 'degree_requirements.json')
+        run_pass('cold', manifest, output_file, args, args.verbose)
+        run_pass('warm', manifest, output_file, args, args.verbose) # Same caches: pages revalidate, results are reused
+        print(f"  Fixture server responses: {server.counts[200]} x 200, {server.counts[304]} x 304; "
+              f"peak concurrent model calls: {reqs_creator.model.stats['max_active']}")
+        server.shutdown()
+        server.server_close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
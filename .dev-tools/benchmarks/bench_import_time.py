@@ -0,0 +1,96 @@
+# File: .dev-tools/benchmarks/bench_import_time.py
+# Measures dev-tool startup with `python -X importtime`: each tool's import cost, its heaviest imports, the cost
+# of the dependencies it used to import eagerly, and `--help` wall time. Exits non-zero above --target-ms.
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+TOOLS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Heavy dependencies each tool imported at startup before they were deferred to the code paths that need them
+EAGER_DEPENDENCIES = {
+    'reqs_creator': ['requests', 'google.generativeai', 'lxml.html'],
+    'degree_reqs_upload': ['boto3', 'botocore.config'],
+    'dummyStudent': ['faker', 'numpy', 'multiprocessing'],
+}
+
+def import_profile(statement):
+    """Runs `statement` under -X importtime; returns [(name, self_us, cumulative_us, depth)] in completion order."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=TOOLS_DIR,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else statement)
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+def module_cost(module, repeat):
+    """Best-of-N cumulative import time (ms) of `module`, plus its direct imports from that run, heaviest first."""
+    best, best_children = None, []
+    for _ in range(repeat):
+        entries = import_profile(f'import {module}')
+        position = max(index for index, entry in enumerate(entries) if entry[0] == module and entry[3] == 0)
+        start = position
+        while start > 0 and entries[start - 1][3] > 0: # The module's own imports complete right before it
+            start -= 1
+        children = sorted((entry for entry in entries[start:position] if entry[3] == 1), key=lambda entry: -entry[2])
+        cumulative_ms = entries[position][2] / 1000
+        if best is None or cumulative_ms < best:
+            best, best_children = cumulative_ms, children
+    return best, best_children
+
+def help_wall_time(module, repeat):
+    """Best-of-N wall time (ms) of `python <tool>.py --help`, interpreter startup included."""
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable, f'{module}.py', '--help'], cwd=TOOLS_DIR, capture_output=True)
+        best = min(best, (time.perf_counter() - started_at) * 1000)
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark dev-tool import/startup time (-X importtime).')
+    parser.add_argument('modules', nargs='*', default=list(EAGER_DEPENDENCIES), help='Tool modules to measure.')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement; the best time is reported.')
+    parser.add_argument('--target-ms', type=float, default=100.0, help='Fail when a tool takes longer than this to import.')
+    parser.add_argument('--top', type=int, default=3, help='Heaviest direct imports to list per tool.')
+    args = parser.parse_args()
+
+    over_target = []
+    print(f"Import time per tool (best of {args.repeat}, target {args.target_ms:.0f} ms):")
+    for module in args.modules:
+        try:
+            import_ms, children = module_cost(module, args.repeat)
+        except ImportError as e:
+            print(f"  {module:<20} could not be imported: {e}")
+            over_target.append(module)
+            continue
+        help_ms = help_wall_time(module, args.repeat) if os.path.exists(os.path.join(TOOLS_DIR, f'{module}.py')) else None
+        status = 'OK' if import_ms <= args.target_ms else 'OVER TARGET'
+        help_text = f"  --help {help_ms:7.1f} ms" if help_ms is not None else ''
+        print(f"  {module:<20} import {import_ms:7.1f} ms{help_text}  {status}")
+        for name, _, cumulative_us, _ in children[:args.top]:
+            print(f"      {name:<28} {cumulative_us / 1000:7.1f} ms")
+        eager = []
+        for dependency in EAGER_DEPENDENCIES.get(module, []):
+            try:
+                eager.append((dependency, module_cost(dependency, args.repeat)[0]))
+            except ImportError:
+                eager.append((dependency, None))
+        if eager:
+            listed = ', '.join(f"{name} {cost:.1f} ms" if cost is not None else f"{name} not installed" for name, cost in eager)
+            print(f"      deferred until needed: {listed}")
+        if import_ms > args.target_ms:
+            over_target.append(module)
+
+    if over_target:
+        print(f"Error: {', '.join(over_target)} exceeded the {args.target_ms:.0f} ms import target.")
+        sys.exit(1)
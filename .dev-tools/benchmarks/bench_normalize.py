@@ -0,0 +1,93 @@
+# File: .dev-tools/benchmarks/bench_normalize.py
+# Compares the fused normalize_item pass with the former two recursive walks on synthetic requirements.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from degree_reqs_upload import PRIMARY_KEYS, normalize_item, replace_floats_with_decimal
+
+SUBJECTS = ['CIS', 'MATH', 'ENGL', 'HIST', 'BIOL', 'CHEM', 'ART', 'PSYC', 'BSAD', 'ECON']
+
+# --- Former Implementation (baseline) ---
+
+def legacy_clean_empty_values(item, primary_keys):
+    """The recursive cleaning pass normalize_item replaced, kept verbatim for comparison."""
+    if isinstance(item, dict):
+        cleaned_dict = {}
+        for k, v in item.items():
+            if k in primary_keys and (v is None or v == ""):
+                 raise ValueError(f"Primary key attribute '{k}' cannot be empty or None. Item: {item}")
+            cleaned_value = legacy_clean_empty_values(v, primary_keys)
+            if isinstance(cleaned_value, str) and cleaned_value == "" and k not in primary_keys:
+                cleaned_dict[k] = None
+            elif cleaned_value is not None or k in primary_keys:
+                 cleaned_dict[k] = cleaned_value
+        return cleaned_dict
+    elif isinstance(item, list):
+        return [legacy_clean_empty_values(i, primary_keys) for i in item]
+    else:
+        return item
+
+def legacy_normalize(item):
+    return legacy_clean_empty_values(replace_floats_with_decimal(item), PRIMARY_KEYS)
+
+# --- Synthetic Data ---
+
+def make_requirement(rng, index):
+    """Builds one requirement shaped like the scraper output, with floats, empty strings and NULLs mixed in."""
+    requirement = {
+        'MajorCode': f"MAJOR_{index % 200}",
+        'RequirementType': f"REQUIREMENT_{index}",
+        'TotalCreditsRequired': rng.randint(3, 70),
+        'Notes': rng.choice(['', None, 'Must be completed with a C or better']),
+        'Courses': [
+            {'Subject': rng.choice(SUBJECTS), 'CourseNumber': rng.randint(1000, 4999), 'Credits': rng.choice([3, 4, 1.5]), 'Section': ''}
+            for _ in range(rng.randint(0, 15))
+        ],
+    }
+    if rng.random() < 0.3:
+        requirement['MinCredits'] = rng.randint(6, 18)
+        requirement['AllowedSubjects'] = rng.sample(SUBJECTS, k=3)
+        requirement['Restrictions'] = ['Must be 3000+ level', '']
+        requirement['Categories'] = {'Math': {'MinCredits': 6.0, 'Courses': ['MATH-1003', '']}}
+    return requirement
+
+def time_pass(label, func, items, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for item in items:
+            func(item)
+        best = min(best, time.perf_counter() - started_at)
+    print(f"  {label:<28} {best:8.3f}s  {len(items) / best:12,.0f} items/sec")
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark requirement normalization (items/sec).')
+    parser.add_argument('--items', type=int, default=100000, help='Number of synthetic requirements to normalize.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation; the best time is reported.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic data.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    items = [make_requirement(rng, i) for i in range(args.items)]
+
+    # Both implementations must agree before their speed is worth comparing
+    for item in items[:1000]:
+        if normalize_item(item, PRIMARY_KEYS) != legacy_normalize(item):
+            print(f"Error: normalize_item output differs from the legacy passes for {item}")
+            sys.exit(1)
+    deep = current = []
+    for _ in range(sys.getrecursionlimit() * 2):
+        current.append([])
+        current = current[0]
+    normalize_item({'MajorCode': 'DEEP', 'RequirementType': 'NESTING', 'Value': deep}, PRIMARY_KEYS)
+
+    print(f"Normalizing {args.items} synthetic requirements (best of {args.repeat}):")
+    legacy_time = time_pass('legacy (two recursive walks)', legacy_normalize, items, args.repeat)
+    fused_time = time_pass('normalize_item (fused)', lambda item: normalize_item(item, PRIMARY_KEYS), items, args.repeat)
+    print(f"  Speedup: {legacy_time / fused_time:.2f}x")
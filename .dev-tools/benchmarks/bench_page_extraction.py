@@ -0,0 +1,121 @@
+# File: .dev-tools/benchmarks/bench_page_extraction.py
+# Compares the former html.parser + find_all cleaning path with page_extractor on saved catalog pages.
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from bs4 import BeautifulSoup
+from page_extractor import HTML_PARSER, extract_text, find_main_content, parse_html
+
+SUBJECTS = ['CIS', 'MATH', 'ENGL', 'HIST', 'BIOL', 'CHEM', 'ART', 'PSYC', 'BSAD', 'ECON']
+
+# --- Former Implementation (baseline) ---
+
+def legacy_extract(content):
+    """The cleaning steps get_page_content used before page_extractor, kept verbatim for comparison."""
+    soup = BeautifulSoup(content, 'html.parser')
+    for element in soup(["script", "style", "nav", "header", "footer", "aside", "form", "button", "iframe", "img", "svg", "link", "meta"]):
+        element.decompose()
+    main_content = (
+        soup.find('main') or
+        soup.find('article') or
+        soup.find(id='content') or
+        soup.find(class_='content') or
+        soup.find(id='main') or
+        soup.find(class_='main') or
+        soup.find(role='main') or
+        soup.body
+    )
+    text_blocks = []
+    for element in main_content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'div', 'section', 'table']):
+        block_text = element.get_text(separator=' ', strip=True).replace('\xa0', ' ')
+        if block_text:
+            text_blocks.append(block_text)
+    text_content = '\n\n'.join(text_blocks)
+    text_content = re.sub(r'[ \t]+', ' ', text_content)
+    text_content = re.sub(r'(\n\s*){3,}', '\n\n', text_content)
+    return text_content.strip()
+
+def current_extract(content, parser=None):
+    main_content, _ = find_main_content(parse_html(content, parser))
+    return extract_text(main_content) if main_content is not None else ''
+
+# --- Pages ---
+
+def make_catalog_page(rng, sections=12):
+    """Builds a catalog-style page: requirement sections inside several layers of layout divs."""
+    parts = ['<html><head><script>var x = 1;</script><style>p {}</style></head><body>',
+             '<nav><a href="/">Home</a> <a href="/programs">Programs</a></nav>',
+             '<div class="wrapper"><div class="container"><main><div class="row"><div class="col">']
+    for index in range(sections):
+        parts.append(f'<div class="section"><h2>Requirement Block {index}</h2><div class="body">')
+        parts.append(f'<p>Complete {rng.randint(6, 30)} credits from the following courses with a grade of C or better.</p><ul>')
+        for _ in range(rng.randint(4, 12)):
+            parts.append(f'<li><span>{rng.choice(SUBJECTS)} {rng.randint(1000, 4999)}</span> - <a href="#">Course Title</a> (3)</li>')
+        parts.append('</ul><table><tr><th>Course</th><th>Credits</th></tr>')
+        for _ in range(rng.randint(2, 6)):
+            parts.append(f'<tr><td>{rng.choice(SUBJECTS)} {rng.randint(1000, 4999)}</td><td>3</td></tr>')
+        parts.append('</table></div></div>')
+    parts.append('</div></div></main></div></div><footer>Contact the registrar</footer></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+def load_pages(paths):
+    """Reads every .html/.htm file named directly or found in the given directories."""
+    pages = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(name for name in os.listdir(path) if name.lower().endswith(('.html', '.htm')))
+            paths_to_read = [os.path.join(path, name) for name in names]
+        else:
+            paths_to_read = [path]
+        for page_path in paths_to_read:
+            with open(page_path, 'rb') as f:
+                pages.append((os.path.basename(page_path), f.read()))
+    return pages
+
+def time_path(label, func, pages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        texts = [func(content) for _, content in pages]
+        best = min(best, time.perf_counter() - started_at)
+    chars = sum(len(text) for text in texts)
+    print(f"  {label:<34} {best:8.3f}s  {len(pages) / best:10,.1f} pages/sec  {chars:10,} chars  ~{chars // 4:9,} tokens")
+    return best, chars
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark catalog page cleaning (parse time and text size).')
+    parser.add_argument('pages', nargs='*', help='Saved catalog pages (.html files or directories). Synthetic pages are used when omitted.')
+    parser.add_argument('--synthetic', type=int, default=20, help='Number of synthetic pages to generate when no pages are given.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation; the best time is reported.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the synthetic pages.')
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = load_pages(args.pages)
+    else:
+        rng = random.Random(args.seed)
+        pages = [(f"synthetic-{index}.html", make_catalog_page(rng)) for index in range(args.synthetic)]
+    if not pages:
+        print("Error: No .html pages found.")
+        sys.exit(1)
+
+    # The lxml and BeautifulSoup paths must agree, and every word (bar heading markers) must come from the page's text
+    for name, content in pages:
+        text = current_extract(content)
+        if text != current_extract(content, 'html.parser'):
+            print(f"Error: lxml and html.parser extraction differ on page {name}")
+            sys.exit(1)
+        if not set(word for word in text.split() if word.strip('#')) <= set(parse_html(content, 'html.parser').get_text(' ').replace('\xa0', ' ').split()):
+            print(f"Error: page_extractor produced text that is not on page {name}")
+            sys.exit(1)
+
+    print(f"Cleaning {len(pages)} page(s) (best of {args.repeat}, page_extractor parser: {HTML_PARSER}):")
+    legacy_time, legacy_chars = time_path('legacy (html.parser + find_all)', legacy_extract, pages, args.repeat)
+    current_time, current_chars = time_path('page_extractor (single pass)', current_extract, pages, args.repeat)
+    print(f"  Speedup: {legacy_time / current_time:.2f}x, text/token reduction: {100 * (1 - current_chars / legacy_chars):.1f}%")
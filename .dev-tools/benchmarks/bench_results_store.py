@@ -0,0 +1,81 @@
+# File: .dev-tools/benchmarks/bench_results_store.py
+# Compares the former read-concatenate-rewrite --append of write_results_to_json with fsync'd JSON Lines appends.
+
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from results_store import append_jsonl, export_json
+
+SUBJECTS = ['CIS', 'MATH', 'ENGL', 'HIST', 'BIOL', 'CHEM', 'ART', 'PSYC', 'BSAD', 'ECON']
+
+# --- Former Implementation (baseline) ---
+
+def legacy_append(rules, filename):
+    """What --append cost per major before: parse the whole array, concatenate, rewrite it all with indent=2."""
+    existing = []
+    if os.path.exists(filename) and os.path.getsize(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            existing = json.loads(f.read().strip())
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(existing + rules, f, indent=2, ensure_ascii=False)
+
+def make_major_rules(rng, major_index, rules_per_major):
+    return [{
+        "MajorCode": f"MAJOR_{major_index}",
+        "RequirementType": f"REQUIREMENT_{index}",
+        "Description": "Complete the following courses with a grade of C or better.",
+        "TotalCreditsRequired": rng.randint(3, 30),
+        "Courses": [{"Subject": rng.choice(SUBJECTS), "CourseNumber": str(rng.randint(1000, 4999))} for _ in range(rng.randint(2, 12))],
+    } for index in range(rules_per_major)]
+
+def time_path(label, append, path, batches):
+    """Appends every major's rules in turn; reports the total and the average cost of the first and last 10%."""
+    durations = []
+    for rules in batches:
+        started_at = time.perf_counter()
+        append(rules, path)
+        durations.append(time.perf_counter() - started_at)
+    tenth = max(1, len(durations) // 10)
+    first_ms = sum(durations[:tenth]) / tenth * 1000
+    last_ms = sum(durations[-tenth:]) / tenth * 1000
+    print(f"  {label:<32} {sum(durations):8.3f}s total  first appends {first_ms:7.2f} ms  last appends {last_ms:7.2f} ms")
+    return sum(durations)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark appending extracted rules (legacy JSON rewrite vs JSON Lines).')
+    parser.add_argument('--majors', type=int, default=200, help='Number of appends (one per major).')
+    parser.add_argument('--rules', type=int, default=8, help='Rules appended per major.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the generated rules.')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    batches = [make_major_rules(rng, index, args.rules) for index in range(args.majors)]
+    work_dir = tempfile.mkdtemp(prefix='bench_results_store_')
+    try:
+        legacy_path = os.path.join(work_dir, 'legacy.json')
+        jsonl_path = os.path.join(work_dir, 'rules.jsonl')
+        export_path = os.path.join(work_dir, 'exported.json')
+
+        print(f"Appending {args.majors} majors x {args.rules} rules:")
+        legacy_time = time_path('legacy (read + rewrite JSON)', legacy_append, legacy_path, batches)
+        jsonl_time = time_path('results_store.append_jsonl', lambda rules, path: append_jsonl(path, rules), jsonl_path, batches)
+        print(f"  Speedup: {legacy_time / jsonl_time:.2f}x")
+
+        # The exported array must be byte-identical to what the legacy appends produced
+        started_at = time.perf_counter()
+        export_json(jsonl_path, export_path)
+        export_time = time.perf_counter() - started_at
+        with open(legacy_path, 'rb') as legacy, open(export_path, 'rb') as exported:
+            if legacy.read() != exported.read():
+                print("Error: exported JSON differs from the legacy output.")
+                sys.exit(1)
+        print(f"  One-time export to degree_requirements.json form: {export_time:.3f}s (identical to legacy output)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
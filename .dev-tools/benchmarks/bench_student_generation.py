@@ -0,0 +1,59 @@
+# File: .dev-tools/benchmarks/bench_student_generation.py
+# Compares per-student generation (Faker + random per field) with the NumPy bulk path used by --bulk.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from faker import Faker
+from dummyStudent import build_name_pools, generate_student_chunk, generate_student_data, load_numpy
+
+def time_path(label, func, count, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        students = func()
+        best = min(best, time.perf_counter() - started_at)
+    if len(students) != count:
+        print(f"Error: {label} produced {len(students)} students, expected {count}")
+        sys.exit(1)
+    print(f"  {label:<28} {best:8.3f}s  {count / best:12,.0f} students/sec")
+    return best
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark student generation (students/sec).')
+    parser.add_argument('--count', type=int, default=20000, help='Number of students to generate per run.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation; the best time is reported.')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for both generators.')
+    args = parser.parse_args()
+
+    np = load_numpy()
+    if np is None:
+        print("Error: this benchmark requires numpy. Install it with 'pip install numpy'.")
+        sys.exit(1)
+
+    faker = Faker()
+
+    def per_student():
+        rng = random.Random(args.seed)
+        faker.seed_instance(args.seed)
+        return [generate_student_data(student_id, rng, faker) for student_id in range(1000, 1000 + args.count)]
+
+    def bulk():
+        # Pool construction is included: it is paid once per worker process in real runs
+        faker.seed_instance(args.seed)
+        return generate_student_chunk(1000, args.count, np.random.default_rng(args.seed), build_name_pools(faker))
+
+    # The bulk path must produce the same record shape before its speed is worth comparing
+    reference, candidate = per_student()[0], bulk()[0]
+    if set(reference) != set(candidate) or set(reference['CompletedCourses'][0]) != set(candidate['CompletedCourses'][0]):
+        print("Error: bulk records do not have the same fields as generate_student_data records.")
+        sys.exit(1)
+
+    print(f"Generating {args.count} students (best of {args.repeat}):")
+    per_student_time = time_path('per-student (Faker/random)', per_student, args.count, args.repeat)
+    bulk_time = time_path('bulk (NumPy + name pools)', bulk, args.count, args.repeat)
+    print(f"  Speedup: {per_student_time / bulk_time:.2f}x")
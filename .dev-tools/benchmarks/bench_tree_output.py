@@ -0,0 +1,99 @@
+# File: .dev-tools/benchmarks/bench_tree_output.py
+# Compares tree_logger's former per-line print + log write with the buffered TreeOutput sink (console + log,
+# log only as with --quiet, console only as with --no-log) on the lines of a synthetic deep tree.
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from tree_logger import TreeOutput, iter_tree_lines
+
+# --- Former Implementation (baseline) ---
+
+def print_and_log(message, log_file):
+    """Prints a message to the console and writes it to the log file."""
+    print(message)
+    if log_file:
+        log_file.write(message + "\n")
+
+def make_tree(root, depth, fanout, files):
+    """Creates `fanout` subdirectories per level down to `depth`, each holding `files` empty files."""
+    directories = [root]
+    for _ in range(depth):
+        next_level = []
+        for directory in directories:
+            for index in range(files):
+                open(os.path.join(directory, f"file_{index}.txt"), 'w').close()
+            for index in range(fanout):
+                path = os.path.join(directory, f"dir_{index}")
+                os.mkdir(path)
+                next_level.append(path)
+        directories = next_level
+
+def time_path(label, write, lines, log_path, repeat):
+    """Best-of-N time for writing every line with `write(lines, console, log_file)`; console is os.devnull."""
+    best = float('inf')
+    for _ in range(repeat):
+        with open(os.devnull, 'w', encoding='utf-8') as console, open(log_path, 'w', encoding='utf-8') as log_file:
+            console.reconfigure(line_buffering=True) # Like an interactive terminal
+            started_at = time.perf_counter()
+            write(lines, console, log_file)
+            best = min(best, time.perf_counter() - started_at)
+    print(f"  {label:<34} {best:8.3f}s  {len(lines) / best:12,.0f} lines/sec")
+    return best
+
+def legacy_sink(lines, console, log_file):
+    stdout = sys.stdout
+    sys.stdout = console
+    try:
+        for line in lines:
+            print_and_log(line, log_file)
+    finally:
+        sys.stdout = stdout
+
+def buffered_sink(console_enabled, log_enabled):
+    def write(lines, console, log_file):
+        output = TreeOutput(console=console if console_enabled else False, log_file=log_file if log_enabled else None)
+        for line in lines:
+            output.write_line(line)
+        output.flush()
+    return write
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark tree_logger output sinks (lines/sec) on a synthetic deep tree.')
+    parser.add_argument('--depth', type=int, default=6, help='Directory levels in the synthetic tree.')
+    parser.add_argument('--fanout', type=int, default=4, help='Subdirectories per directory.')
+    parser.add_argument('--files', type=int, default=5, help='Files per directory.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per sink; the best time is reported.')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_tree_output_')
+    try:
+        tree_root = os.path.join(work_dir, 'tree')
+        os.mkdir(tree_root)
+        make_tree(tree_root, args.depth, args.fanout, args.files)
+        lines = ["tree/"] + list(iter_tree_lines(tree_root))
+        legacy_log = os.path.join(work_dir, 'legacy_log.txt')
+        buffered_log = os.path.join(work_dir, 'buffered_log.txt')
+        quiet_log = os.path.join(work_dir, 'quiet_log.txt')
+
+        print(f"Writing {len(lines):,} tree lines (depth {args.depth}, fanout {args.fanout}, {args.files} files per directory):")
+        legacy_time = time_path('legacy print + log write per line', legacy_sink, lines, legacy_log, args.repeat)
+        buffered_time = time_path('TreeOutput console + log', buffered_sink(True, True), lines, buffered_log, args.repeat)
+        quiet_time = time_path('TreeOutput log only (--quiet)', buffered_sink(False, True), lines, quiet_log, args.repeat)
+        time_path('TreeOutput console only (--no-log)', buffered_sink(True, False), lines, os.devnull, args.repeat)
+        print(f"  Speedup: {legacy_time / buffered_time:.2f}x (console + log), {legacy_time / quiet_time:.2f}x (--quiet)")
+
+        # The buffered sinks must log exactly what the per-line writes did
+        with open(legacy_log, 'rb') as legacy, open(buffered_log, 'rb') as buffered, open(quiet_log, 'rb') as quiet:
+            legacy_bytes = legacy.read()
+            if buffered.read() != legacy_bytes or quiet.read() != legacy_bytes:
+                print("Error: buffered log differs from the legacy output.")
+                sys.exit(1)
+        print("  Log files identical to the legacy output.")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
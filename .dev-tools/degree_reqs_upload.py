@@ -1,12 +1,18 @@
 # File: .dev-tools/degree_reqs_upload_v4.py
 
-import boto3
 import json
 import os
 import sys
 import argparse
+import base64
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal # Import Decimal for handling float types in DynamoDB
 
+from dynamo_batch_writer import AdaptiveBatchWriter, AdaptiveRateLimiter, BatchWriteError, BatchWriteStats, BATCH_WRITE_SIZE
+
 # --- Helper Functions ---
 
 def load_config():
@@ -59,6 +65,126 @@ def load_requirements_from_json(filepath):
         print(f"An unexpected error occurred reading '{absolute_filepath}': {e}")
         return None
 
+def _iter_json_array_items(infile, decoder, chunk_size):
+    """Incrementally decodes the elements of a top-level JSON array without reading the whole file."""
+    buf = ''
+    pos = 0
+    eof = False
+
+    def read_more():
+        nonlocal buf, pos, eof
+        data = infile.read(chunk_size)
+        if not data:
+            eof = True
+        buf = buf[pos:] + data
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            read_more()
+
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError("The JSON file must contain an array.")
+    pos += 1
+    skip_whitespace()
+    if pos < len(buf) and buf[pos] == ']':
+        return
+
+    while True:
+        skip_whitespace()
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+            # A value is only complete once its delimiter is buffered: "1" may still continue as "1.5" in the next chunk
+            complete = eof or (end < len(buf) and buf[end] in ' \t\r\n,]')
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if not complete:
+            read_more()
+            continue
+        yield value
+        pos = end
+        skip_whitespace()
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of file inside the JSON array.")
+        if buf[pos] == ',':
+            pos += 1
+        elif buf[pos] == ']':
+            return
+        else:
+            raise ValueError(f"Expected ',' or ']' after array element, found {buf[pos]!r}.")
+
+JSON_LINES_EXTENSIONS = ('.jsonl', '.ndjson')
+
+def _first_content(infile):
+    """Returns the first non-whitespace character and the first non-blank line of a file, then rewinds it."""
+    first_char = ''
+    while True:
+        first_char = infile.read(1)
+        if not first_char or not first_char.isspace():
+            break
+    infile.seek(0)
+    first_line = ''
+    for line in infile:
+        if line.strip():
+            first_line = line.strip()
+            break
+    infile.seek(0)
+    return first_char, first_line
+
+def _is_json_object_line(line, decoder):
+    try:
+        return isinstance(decoder.decode(line), dict)
+    except json.JSONDecodeError:
+        return False
+
+def iter_requirements_from_json(filepath, chunk_size=1024 * 1024):
+    """
+    Returns an iterator over the degree requirements of a JSON array or JSON Lines file, one item at a time.
+    Numbers with a fractional part are parsed straight into Decimal, so memory stays flat for any file size.
+    A file is read as JSON Lines when its extension is .jsonl/.ndjson or its first line is a complete JSON
+    object. The format is checked before returning: anything else raises ValueError (expected a JSON array),
+    as does a malformed file while it is read.
+    """
+    absolute_filepath = os.path.abspath(filepath)
+    decoder = json.JSONDecoder(parse_float=Decimal)
+    with open(absolute_filepath, mode='r', encoding='utf-8') as infile:
+        first_char, first_line = _first_content(infile)
+    if first_char == '[':
+        return _iter_json_array_file(absolute_filepath, decoder, chunk_size)
+    if absolute_filepath.lower().endswith(JSON_LINES_EXTENSIONS) or _is_json_object_line(first_line, decoder):
+        return _iter_json_lines_file(absolute_filepath, decoder)
+    if not first_char:
+        raise ValueError(f"'{absolute_filepath}' is empty; expected a JSON array of requirements.")
+    raise ValueError(f"'{absolute_filepath}' is not a JSON array of requirements (expected a JSON array, or a "
+                     f".jsonl file with one requirement object per line).")
+
+def _iter_json_array_file(absolute_filepath, decoder, chunk_size):
+    with open(absolute_filepath, mode='r', encoding='utf-8') as infile:
+        try:
+            yield from _iter_json_array_items(infile, decoder, chunk_size)
+        except ValueError as e:
+            raise ValueError(f"Could not decode JSON from '{absolute_filepath}': {e}") from e
+
+def _iter_json_lines_file(absolute_filepath, decoder):
+    """JSON Lines: one requirement object per line."""
+    with open(absolute_filepath, mode='r', encoding='utf-8') as infile:
+        for line_number, line in enumerate(infile, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield decoder.decode(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Could not decode JSON Lines record at '{absolute_filepath}' line {line_number}: {e}") from e
+
 def replace_floats_with_decimal(item):
     """
     Recursively replaces float values in a dictionary or list with Decimal objects.
@@ -73,102 +199,592 @@ def replace_floats_with_decimal(item):
         return Decimal(str(item))
     return item # Keep int, str, bool, None, etc. as-is
 
-def clean_empty_values(item, primary_keys):
+_PASSTHROUGH_TYPES = (str, int, bool, Decimal, bytes, bytearray, set, frozenset) # Values DynamoDB stores as-is
+
+def _normalize_scalar(value, key):
+    """Converts one non-container value to its DynamoDB form, raising on types DynamoDB cannot store."""
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is Decimal or value is None:
+        return value
+    if value_type is float:
+        if value != value or value in (float('inf'), float('-inf')):
+            raise ValueError(f"Attribute '{key}' has a non-finite number ({value}), which DynamoDB cannot store.")
+        return Decimal(str(value)) # str() first to avoid binary float artifacts
+    if isinstance(value, _PASSTHROUGH_TYPES):
+        return value
+    raise TypeError(f"Attribute '{key}' has unsupported type '{value_type.__name__}' for DynamoDB.")
+
+def normalize_item(item, primary_keys):
     """
-    Recursively prepares item for DynamoDB:
-    1. Converts empty strings "" to None (NULL) for non-key attributes.
-    2. Keeps None values (to be stored as NULL).
+    Prepares an item for DynamoDB in one iterative pass (no recursion limit):
+    1. Converts floats to Decimal (DynamoDB rejects float).
+    2. Converts empty strings "" to None (NULL) for non-key map attributes; drops attributes whose value is None.
     3. Keeps empty lists [] and empty maps {}.
-    4. Raises error if any primary key is empty or None.
-    """
-    if isinstance(item, dict):
-        cleaned_dict = {}
-        for k, v in item.items():
-            # 1. Check Primary Keys
-            if k in primary_keys and (v is None or v == ""):
-                 raise ValueError(f"Primary key attribute '{k}' cannot be empty or None. Item: {item}")
-
-            # 2. Recurse
-            cleaned_value = clean_empty_values(v, primary_keys) # Pass primary_keys down
-
-            # 3. Apply DynamoDB rules (no empty strings for non-keys)
-            if isinstance(cleaned_value, str) and cleaned_value == "" and k not in primary_keys:
-                cleaned_dict[k] = None # Convert empty string to NULL
-            elif cleaned_value is not None or k in primary_keys: # Keep None only if not an empty string originally
-                 cleaned_dict[k] = cleaned_value
-        return cleaned_dict
-    elif isinstance(item, list):
-        return [clean_empty_values(i, primary_keys) for i in item]
-    else:
-        return item
+    4. Raises ValueError if any primary key is empty or None, TypeError for values DynamoDB cannot store.
+    Produces the same output and error messages as the former replace_floats_with_decimal + clean_empty_values passes.
+    """
+    if not isinstance(item, (dict, list)):
+        return _normalize_scalar(item, None)
+
+    result = {} if isinstance(item, dict) else []
+    # Each frame: (source container, iterator over it, output container, source is a dict)
+    stack = [(item, iter(item.items()) if isinstance(item, dict) else iter(item), result, isinstance(item, dict))]
+    while stack:
+        source, entries, output, is_dict = stack[-1]
+        if is_dict:
+            for k, v in entries:
+                value_type = type(v)
+                if value_type is str:
+                    if v:
+                        output[k] = v
+                    elif k in primary_keys:
+                        raise ValueError(f"Primary key attribute '{k}' cannot be empty or None. Item: {replace_floats_with_decimal(source)}")
+                    else:
+                        output[k] = None # Convert empty string to NULL
+                elif value_type is int or value_type is Decimal:
+                    output[k] = v
+                elif v is None:
+                    if k in primary_keys:
+                        raise ValueError(f"Primary key attribute '{k}' cannot be empty or None. Item: {replace_floats_with_decimal(source)}")
+                    # None attributes are dropped (only empty strings become NULL)
+                elif isinstance(v, (dict, list)):
+                    child_is_dict = isinstance(v, dict)
+                    child = output[k] = {} if child_is_dict else []
+                    stack.append((v, iter(v.items()) if child_is_dict else iter(v), child, child_is_dict))
+                    break # Descend; this frame's iterator resumes once the child is done
+                else:
+                    if k in primary_keys and v == "":
+                        raise ValueError(f"Primary key attribute '{k}' cannot be empty or None. Item: {replace_floats_with_decimal(source)}")
+                    value = _normalize_scalar(v, k)
+                    if value == "" and isinstance(value, str) and k not in primary_keys:
+                        value = None
+                    if value is not None or k in primary_keys:
+                        output[k] = value
+            else:
+                stack.pop()
+        else:
+            for v in entries:
+                if isinstance(v, (dict, list)):
+                    child_is_dict = isinstance(v, dict)
+                    child = {} if child_is_dict else []
+                    output.append(child)
+                    stack.append((v, iter(v.items()) if child_is_dict else iter(v), child, child_is_dict))
+                    break
+                output.append(_normalize_scalar(v, None))
+            else:
+                stack.pop()
+    return result
 
 # --- Main Upload Logic ---
 
-def upload_requirements_to_dynamodb(requirements, table_name, region_name, access_key_id=None, secret_access_key=None):
-    """Uploads a list of requirement objects to the specified DynamoDB table."""
+PRIMARY_KEYS = ['MajorCode', 'RequirementType'] # Partition + sort key of the degree requirements table
+DEFAULT_WORKERS = 8 # Concurrency cap used by --workers when no value is given
+DEFAULT_INITIAL_RATE = 10.0 # Starting BatchWriteItem requests/sec; adapted up/down from observed throttling
+JOURNAL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.upload_journal')
+
+# Retries are handled by AdaptiveBatchWriter so throttling is visible to (and counted by) the upload
+CLIENT_RETRIES = {'total_max_attempts': 1}
+
+_thread_state = threading.local() # Per-thread boto3 session/table (boto3 sessions are not thread-safe)
+
+def build_session_args(region_name, access_key_id=None, secret_access_key=None):
+    """Builds the keyword arguments used to create a boto3 Session."""
+    session_args = {}
+    if region_name:
+        session_args['region_name'] = region_name
+    if access_key_id and secret_access_key:
+        session_args['aws_access_key_id'] = access_key_id
+        session_args['aws_secret_access_key'] = secret_access_key
+    return session_args
+
+def new_session(session_args):
+    """Creates a boto3 Session. boto3 is imported on first use, so --help and dry runs never load it."""
+    import boto3
+    return boto3.Session(**session_args)
+
+def get_worker_table(table_name, session_args):
+    """
+    Returns a DynamoDB Table resource owned by the calling thread.
+    Each worker thread gets its own Session and resource so batch writers never share a connection.
+    """
+    tables = getattr(_thread_state, 'tables', None)
+    if tables is None:
+        tables = _thread_state.tables = {}
+    if table_name not in tables:
+        session = new_session(session_args)
+        tables[table_name] = session.resource('dynamodb').Table(table_name)
+    return tables[table_name]
+
+def get_worker_client(session_args, endpoint_url=None):
+    """
+    Returns a low-level DynamoDB client owned by the calling thread.
+    `endpoint_url` points the client at a local stand-in such as DynamoDB Local (e.g. http://localhost:8000).
+    """
+    clients = getattr(_thread_state, 'clients', None)
+    if clients is None:
+        clients = _thread_state.clients = {}
+    if endpoint_url not in clients:
+        from botocore.config import Config
+        session = new_session(session_args)
+        clients[endpoint_url] = session.client('dynamodb', endpoint_url=endpoint_url, config=Config(retries=CLIENT_RETRIES))
+    return clients[endpoint_url]
+
+class UploadTarget:
+    """Connection settings plus the rate limiter and write stats shared by every worker writing to one table."""
+
+    def __init__(self, table_name, session_args, initial_rate=DEFAULT_INITIAL_RATE, max_rate=None, key_names=PRIMARY_KEYS, endpoint_url=None):
+        self.table_name = table_name
+        self.session_args = session_args
+        self.key_names = key_names
+        self.endpoint_url = endpoint_url
+        self.rate_limiter = AdaptiveRateLimiter(initial_rate=initial_rate, max_rate=max_rate)
+        self.stats = BatchWriteStats()
+
+    def new_writer(self, on_acknowledged=None):
+        """Creates a batch writer bound to the calling worker thread's client."""
+        return AdaptiveBatchWriter(get_worker_client(self.session_args, self.endpoint_url), self.table_name, self.key_names,
+                                   rate_limiter=self.rate_limiter, stats=self.stats, on_acknowledged=on_acknowledged)
+
+def hash_file(filepath, chunk_size=1024 * 1024):
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class UploadJournal:
+    """
+    Append-only on-disk record of the (MajorCode, RequirementType) keys DynamoDB has acknowledged
+    for one input file. One JSON array per line, so a partially written last line is simply ignored.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.acknowledged = set()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if resume and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        self.acknowledged.add(tuple(json.loads(line)))
+                    except (json.JSONDecodeError, TypeError):
+                        continue # Torn write from an interrupted run
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    @classmethod
+    def for_input_file(cls, filepath, table_name, resume=False):
+        """Opens the journal for `filepath` (keyed by content hash) and the target table."""
+        file_hash = hash_file(filepath)
+        return cls(os.path.join(JOURNAL_DIR, f"{table_name}-{file_hash}.jsonl"), resume=resume)
+
+    def is_acknowledged(self, key):
+        return key in self.acknowledged
+
+    def record(self, keys):
+        """Appends acknowledged keys and forces them to disk."""
+        if not keys:
+            return
+        lines = ''.join(json.dumps(list(key)) + '\n' for key in keys)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.acknowledged.update(keys)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class UploadProgress:
+    """Thread-safe counters shared by all upload workers."""
+
+    def __init__(self, total=None, report_every=100):
+        self.total = total # None when streaming from a file of unknown length
+        self.report_every = report_every
+        self.uploaded = 0
+        self.failed = 0
+        self.resumed = 0
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, uploaded=0, failed=0):
+        """Adds to the counters and prints a progress line every `report_every` items."""
+        with self._lock:
+            before = self.uploaded + self.failed
+            self.uploaded += uploaded
+            self.failed += failed
+            processed = self.uploaded + self.failed
+            if processed // self.report_every > before // self.report_every or processed == self.total:
+                total = f"/{self.total}" if self.total is not None else ""
+                print(f"  Processed {processed}{total} requirements ({self.uploaded} uploaded, {self.failed} skipped, {self.items_per_second():.1f} items/sec)...")
+
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def items_per_second(self):
+        elapsed = self.elapsed()
+        return self.uploaded / elapsed if elapsed > 0 else 0.0
+
+def requirement_key(req):
+    """Returns the (MajorCode, RequirementType) primary key tuple of a requirement."""
+    if not isinstance(req, dict):
+        return None
+    return tuple(req.get(k) for k in PRIMARY_KEYS)
+
+def prepare_requirement(req):
+    """Validates and cleans one requirement for DynamoDB in a single pass over the item."""
+    if not isinstance(req, dict):
+        raise ValueError(f"Requirement must be a JSON object, got {type(req).__name__}.")
+    return normalize_item(req, PRIMARY_KEYS)
+
+def iter_requirement_chunks(requirements, progress, journal=None):
+    """
+    Prepares requirements one at a time and yields (MajorCode, items) chunks of up to BATCH_WRITE_SIZE items.
+    Only one partial chunk per major is buffered, so any iterable (including a file stream) can be uploaded.
+    """
+    buffers = {}
+    for i, req in enumerate(requirements):
+        if journal is not None and journal.is_acknowledged(requirement_key(req)):
+            progress.resumed += 1
+            continue
+        try:
+            item = prepare_requirement(req)
+        except ValueError as ve:
+            print(f"Error preparing item at index {i}: {ve}. Skipping item.")
+            progress.record(failed=1)
+            continue
+        except Exception as item_error:
+            print(f"Error preparing item at index {i}: {item_error}. Item: {req}. Skipping item.")
+            progress.record(failed=1)
+            continue
+        major_code = item['MajorCode']
+        buffer = buffers.setdefault(major_code, [])
+        buffer.append(item)
+        if len(buffer) >= BATCH_WRITE_SIZE:
+            yield major_code, buffers.pop(major_code)
+    for major_code, buffer in buffers.items():
+        yield major_code, buffer
+
+def upload_requirement_chunk(target, major_code, items, progress, journal=None, stop_event=None, acknowledged=None):
+    """
+    Uploads one chunk of a major's requirements through the calling worker's batch writer.
+    Only keys DynamoDB acknowledged (UnprocessedItems excluded) are counted as uploaded, journaled and
+    added to the `acknowledged` list when one is given.
+    """
+    if stop_event is not None and stop_event.is_set():
+        return
+
+    def on_acknowledged(keys):
+        if journal is not None:
+            journal.record(keys)
+        if acknowledged is not None:
+            acknowledged.extend(keys)
+        progress.record(uploaded=len(keys))
+
+    writer = target.new_writer(on_acknowledged)
     try:
-        session_args = {}
-        if region_name:
-            session_args['region_name'] = region_name
-        if access_key_id and secret_access_key:
-            session_args['aws_access_key_id'] = access_key_id
-            session_args['aws_secret_access_key'] = secret_access_key
-
-        session = boto3.Session(**session_args)
-        dynamodb = session.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-        print(f"Targeting table: '{table_name}' in region '{session.region_name or 'default'}'")
+        for item in items:
+            writer.put(item)
+        writer.flush()
+    except BatchWriteError as e:
+        not_written = len(writer.pending_keys())
+        print(f"\nAn error occurred while uploading major '{major_code}': {e}")
+        print(f"  {not_written} requirement(s) for '{major_code}' were not written.")
+        progress.record(failed=not_written)
 
+def upload_requirements_to_dynamodb(requirements, table_name, region_name, access_key_id=None, secret_access_key=None, workers=1, journal=None,
+                                    initial_rate=DEFAULT_INITIAL_RATE, max_rate=None, target=None, acknowledged=None):
+    """
+    Uploads requirement objects (a list or any iterable, e.g. iter_requirements_from_json) to the specified DynamoDB table.
+    Items are grouped into per-MajorCode chunks and uploaded by up to `workers` threads, each with its own batch writer;
+    all writers share one adaptive send rate that backs off when DynamoDB throttles.
+    When a journal is given, keys it already holds are skipped and newly acknowledged keys are appended to it.
+    When an `acknowledged` list is given, the keys DynamoDB confirmed are appended to it.
+    """
+    session_args = build_session_args(region_name, access_key_id, secret_access_key)
+    try:
+        session = new_session(session_args)
+        print(f"Targeting table: '{table_name}' in region '{session.region_name or 'default'}'")
     except Exception as e:
         print(f"Error connecting to DynamoDB: {e}")
         print("Ensure your AWS credentials and region are configured correctly.")
         return
+    if target is None:
+        target = UploadTarget(table_name, session_args, initial_rate=initial_rate, max_rate=max_rate)
 
-    total_reqs = len(requirements)
-    uploaded_count = 0
-    failed_count = 0
-    primary_keys = ['MajorCode', 'RequirementType'] # Define primary keys for validation
+    total_reqs = len(requirements) if hasattr(requirements, '__len__') else None
+    progress = UploadProgress(total_reqs)
+    stop_event = threading.Event()
+    if journal is not None and journal.acknowledged:
+        print(f"Resuming: skipping requirement(s) already acknowledged in journal '{journal.path}'.")
 
-    print(f"Starting upload of {total_reqs} requirements to table '{table_name}'...")
+    total_label = f"{total_reqs} " if total_reqs is not None else ""
+    print(f"Starting upload of {total_label}requirements to table '{table_name}' using {workers} worker(s)...")
 
+    # Bound the chunks in flight so reading the input never runs far ahead of the writers
+    in_flight = threading.BoundedSemaphore(workers * 2)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    futures = []
     try:
-        with table.batch_writer() as batch:
-            for i, req in enumerate(requirements):
-                try:
-                    item_to_upload = clean_empty_values(replace_floats_with_decimal(req), primary_keys)
-                    batch.put_item(Item=item_to_upload)
-                    uploaded_count += 1
-
-                    if (uploaded_count + failed_count) % 100 == 0 or (i + 1) == total_reqs:
-                        print(f"  Processed {i + 1}/{total_reqs} requirements ({uploaded_count} staged for upload, {failed_count} skipped)...")
-
-                except ValueError as ve:
-                    print(f"Error preparing item at index {i}: {ve}. Skipping item.")
-                    failed_count += 1
-                except Exception as item_error:
-                    print(f"Error preparing/adding item at index {i} to batch: {item_error}. Item: {req}. Skipping item.")
-                    failed_count += 1
+        for major_code, items in iter_requirement_chunks(requirements, progress, journal):
+            in_flight.acquire()
+            future = pool.submit(upload_requirement_chunk, target, major_code, items, progress, journal, stop_event, acknowledged)
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+            # Surface worker errors early and keep only unfinished futures
+            still_running = []
+            for f in futures:
+                if f.done():
+                    f.result()
+                else:
+                    still_running.append(f)
+            futures = still_running
+        for future in as_completed(futures):
+            future.result()
+        pool.shutdown()
 
+        elapsed = progress.elapsed()
         print(f"\nBatch writing complete.")
-        print(f"Successfully uploaded: {uploaded_count}")
-        print(f"Failed/Skipped:      {failed_count}")
-        print(f"Total:               {total_reqs}")
+        print(f"Successfully uploaded: {progress.uploaded}")
+        print(f"Failed/Skipped:      {progress.failed}")
+        if progress.resumed:
+            print(f"Already uploaded:    {progress.resumed}")
+        print(f"Total:               {progress.uploaded + progress.failed + progress.resumed}")
+        print(f"Elapsed:             {elapsed:.2f}s ({progress.items_per_second():.1f} items/sec)")
+        for line in target.stats.summary_lines(target.rate_limiter):
+            print(line)
 
+    except KeyboardInterrupt:
+        stop_event.set()
+        pool.shutdown(cancel_futures=True)
+        print(f"\nUpload interrupted. {progress.uploaded} requirements were uploaded before the interruption.")
+        if journal is not None:
+            print("Re-run with --resume to upload only the remaining requirements.")
+        raise
     except Exception as e:
+        stop_event.set()
+        pool.shutdown(cancel_futures=True)
         print(f"\nAn error occurred during the batch upload process: {e}")
-        print(f"Attempted to upload {uploaded_count} requirements before the error.")
+        print(f"Attempted to upload {progress.uploaded} requirements before the error.")
+        if journal is not None:
+            print("Re-run with --resume to upload only the remaining requirements.")
+
+# --- Incremental Sync ---
+
+def _canonical_json_default(value):
+    """JSON fallback so table items (Decimal/set/Binary) and file items hash identically."""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else str(value.normalize())
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if hasattr(value, 'value') and isinstance(value.value, (bytes, bytearray)): # boto3 Binary
+        return base64.b64encode(bytes(value.value)).decode('ascii')
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(bytes(value)).decode('ascii')
+    raise TypeError(f"Unsupported type in item: {type(value).__name__}")
+
+def item_content_hash(item):
+    """Returns a stable SHA-256 of an item's full content (key order and number formatting independent)."""
+    canonical = json.dumps(item, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=_canonical_json_default)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def scan_table_segment(table_name, session_args, segment, total_segments):
+    """Scans one segment of the table and returns {key: content_hash} for its items."""
+    table = get_worker_table(table_name, session_args)
+    hashes = {}
+    scan_args = {'Segment': segment, 'TotalSegments': total_segments}
+    while True:
+        response = table.scan(**scan_args)
+        for item in response.get('Items', []):
+            hashes[requirement_key(item)] = item_content_hash(item)
+        last_key = response.get('LastEvaluatedKey')
+        if not last_key:
+            return hashes
+        scan_args['ExclusiveStartKey'] = last_key
+
+def scan_table_hashes(table_name, session_args, total_segments=4):
+    """Reads the current table state with a parallel segmented scan, returning {key: content_hash}."""
+    print(f"Scanning table '{table_name}' with {total_segments} parallel segment(s)...")
+    started_at = time.perf_counter()
+    hashes = {}
+    with ThreadPoolExecutor(max_workers=total_segments) as pool:
+        futures = [pool.submit(scan_table_segment, table_name, session_args, segment, total_segments) for segment in range(total_segments)]
+        for future in as_completed(futures):
+            hashes.update(future.result())
+    print(f"  Scanned {len(hashes)} item(s) in {time.perf_counter() - started_at:.2f}s.")
+    return hashes
+
+def load_table_snapshot(snapshot_path):
+    """Loads a {key: content_hash} snapshot written by save_table_snapshot, or None if absent/unreadable."""
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return None
+    try:
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        print(f"Using table snapshot from '{os.path.abspath(snapshot_path)}' ({len(entries)} item(s)).")
+        return {(entry['MajorCode'], entry['RequirementType']): entry['Hash'] for entry in entries}
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        print(f"Warning: Could not read snapshot '{snapshot_path}': {e}. Scanning the table instead.")
+        return None
+
+def save_table_snapshot(snapshot_path, hashes):
+    """Atomically writes a {key: content_hash} snapshot."""
+    entries = [{'MajorCode': key[0], 'RequirementType': key[1], 'Hash': digest} for key, digest in sorted(hashes.items(), key=lambda kv: str(kv[0]))]
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, snapshot_path)
+    print(f"Table snapshot saved to '{os.path.abspath(snapshot_path)}'.")
+
+def compute_sync_plan(requirements, remote_hashes):
+    """
+    Compares file requirements with the table state by content hash.
+    Returns a dict with the requirements to write ('added', 'changed'), the 'unchanged' count,
+    keys present only in the table ('missing'), skipped item indexes ('invalid') and the new 'hashes'.
+    """
+    plan = {'added': [], 'changed': [], 'unchanged': 0, 'missing': [], 'invalid': [], 'hashes': {}}
+    for i, req in enumerate(requirements):
+        try:
+            item = prepare_requirement(req)
+            key = requirement_key(item)
+            digest = item_content_hash(item)
+        except (ValueError, TypeError, AttributeError) as e:
+            print(f"Error preparing item at index {i}: {e}. Skipping item.")
+            plan['invalid'].append(i)
+            continue
+        plan['hashes'][key] = digest
+        remote_digest = remote_hashes.get(key)
+        if remote_digest is None:
+            plan['added'].append(req)
+        elif remote_digest != digest:
+            plan['changed'].append(req)
+        else:
+            plan['unchanged'] += 1
+    plan['missing'] = [key for key in remote_hashes if key not in plan['hashes']]
+    return plan
+
+def delete_key_chunk(target, keys, deleted):
+    """Deletes one chunk of (MajorCode, RequirementType) keys through the worker's batch writer; acknowledged keys go to `deleted`."""
+    writer = target.new_writer(deleted.extend)
+    for key in keys:
+        writer.delete(key)
+    writer.flush()
+
+def delete_requirements_from_dynamodb(keys, target, workers=1):
+    """Deletes the given keys in parallel 25-item chunks. Returns the keys DynamoDB acknowledged as deleted."""
+    chunks = [keys[i:i + BATCH_WRITE_SIZE] for i in range(0, len(keys), BATCH_WRITE_SIZE)]
+    deleted = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks) or 1))) as pool:
+        for future in as_completed([pool.submit(delete_key_chunk, target, chunk, deleted) for chunk in chunks]):
+            try:
+                future.result()
+            except BatchWriteError as e:
+                print(f"Error deleting a chunk of requirements: {e}")
+    return deleted
+
+def sync_requirements_to_dynamodb(requirements, table_name, region_name, access_key_id=None, secret_access_key=None,
+                                  workers=1, journal=None, scan_segments=4, snapshot_path=None,
+                                  delete_missing=False, dry_run=False, assume_yes=False,
+                                  initial_rate=DEFAULT_INITIAL_RATE, max_rate=None):
+    """
+    Writes only the requirements that were added or changed since the table state was captured.
+    Rows that no longer exist in the file are deleted only when `delete_missing` is set.
+    """
+    session_args = build_session_args(region_name, access_key_id, secret_access_key)
+    try:
+        remote_hashes = load_table_snapshot(snapshot_path)
+        if remote_hashes is None:
+            remote_hashes = scan_table_hashes(table_name, session_args, scan_segments)
+    except Exception as e:
+        print(f"Error reading current table state: {e}")
+        print("Ensure your AWS credentials and region are configured correctly.")
+        return
+
+    plan = compute_sync_plan(requirements, remote_hashes)
+    to_write = plan['added'] + plan['changed']
+    print(f"\nSync plan for table '{table_name}':")
+    print(f"  Added:     {len(plan['added'])}")
+    print(f"  Changed:   {len(plan['changed'])}")
+    print(f"  Unchanged: {plan['unchanged']}")
+    print(f"  Invalid:   {len(plan['invalid'])}")
+    if delete_missing:
+        print(f"  Deleted:   {len(plan['missing'])}")
+    else:
+        print(f"  Missing from file (kept, pass --delete-missing to remove): {len(plan['missing'])}")
+
+    to_delete = plan['missing'] if delete_missing else []
+    if not to_write and not to_delete:
+        print("Table is already in sync. Nothing to do.")
+        return
+    if dry_run:
+        print("Dry run: no changes were made.")
+        return
+    if not assume_yes:
+        answer = input(f"Write {len(to_write)} and delete {len(to_delete)} item(s)? [y/N] ").strip().lower()
+        if answer not in ('y', 'yes'):
+            print("Sync cancelled. No changes were made.")
+            return
+
+    target = UploadTarget(table_name, session_args, initial_rate=initial_rate, max_rate=max_rate)
+    written = []
+    deleted = []
+    try:
+        if to_write:
+            upload_requirements_to_dynamodb(to_write, table_name, region_name, access_key_id, secret_access_key, workers=workers,
+                                            journal=journal, target=target, acknowledged=written)
+        if to_delete:
+            deleted = delete_requirements_from_dynamodb(to_delete, target, workers)
+            print(f"Deleted {len(deleted)}/{len(to_delete)} requirement(s) no longer present in the file.")
+    finally:
+        if snapshot_path:
+            # Only what DynamoDB acknowledged changes the snapshot, so failed writes and deletes are retried next sync
+            new_state = dict(remote_hashes)
+            for key in written:
+                new_state[key] = plan['hashes'][key]
+            for key in deleted:
+                new_state.pop(key, None)
+            not_applied = len(to_write) + len(to_delete) - len(set(written)) - len(set(deleted))
+            if not_applied > 0:
+                print(f"Warning: {not_applied} change(s) were not acknowledged; the next --sync will retry them.")
+            save_table_snapshot(snapshot_path, new_state)
 
 # --- Script Execution ---
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Upload degree requirements from a JSON file to DynamoDB.')
-    parser.add_argument('file_path', help='Path to the JSON file containing the requirements array.')
+    parser.add_argument('file_path', help='Path to the JSON file containing the requirements array (or a JSON Lines file with one requirement per line).')
     parser.add_argument('--region', default=os.environ.get('AWS_REGION'), help='AWS Region (overrides environment variable, uses boto3 default if not set)')
     parser.add_argument('--access-key', default=os.environ.get('AWS_ACCESS_KEY_ID'), help='AWS Access Key ID (overrides environment variable)')
     parser.add_argument('--secret-key', default=os.environ.get('AWS_SECRET_ACCESS_KEY'), help='AWS Secret Access Key (overrides environment variable)')
+    parser.add_argument('--resume', action='store_true', help='Skip requirements already acknowledged by a previous (interrupted) run of the same input file.')
+    parser.add_argument('--sync', action='store_true', help='Only write requirements that were added or changed compared to the current table state.')
+    parser.add_argument('--delete-missing', action='store_true', help='With --sync, also delete table rows that no longer exist in the input file.')
+    parser.add_argument('--snapshot', default=None, help='With --sync, read the table state from this local snapshot file instead of scanning (created/updated after each sync).')
+    parser.add_argument('--scan-segments', type=int, default=4, help='With --sync, number of parallel segments used to scan the table.')
+    parser.add_argument('--dry-run', action='store_true', help='With --sync, only report the planned changes.')
+    parser.add_argument('--yes', action='store_true', help='With --sync, apply the planned changes without asking for confirmation.')
+    parser.add_argument('--initial-rate', type=float, default=DEFAULT_INITIAL_RATE, help='Starting send rate in BatchWriteItem requests/sec (adapted to observed throttling).')
+    parser.add_argument('--max-rate', type=float, default=None, help='Upper bound for the adaptive send rate in requests/sec (default: unbounded).')
+    parser.add_argument('--workers', type=int, nargs='?', const=DEFAULT_WORKERS, default=1, help=f'Upload majors in parallel with up to N worker threads (default when flag is given without a value: {DEFAULT_WORKERS})')
 
     args = parser.parse_args()
 
+    if args.workers < 1:
+        print("Error: --workers must be a positive integer.")
+        sys.exit(1)
+    if args.initial_rate <= 0 or (args.max_rate is not None and args.max_rate <= 0):
+        print("Error: --initial-rate and --max-rate must be positive.")
+        sys.exit(1)
+    if args.scan_segments < 1:
+        print("Error: --scan-segments must be a positive integer.")
+        sys.exit(1)
+    if not args.sync and (args.delete_missing or args.snapshot or args.dry_run):
+        print("Error: --delete-missing, --snapshot and --dry-run require --sync.")
+        sys.exit(1)
+
     # --- Load Configuration Automatically ---
     config = load_config()
     try:
@@ -177,17 +793,49 @@ if __name__ == "__main__":
         print(f"Error: Could not find 'db_tables.degree_reqs' in the loaded config file.")
         sys.exit(1)
 
-    # --- Load Data ---
-    requirements_list = load_requirements_from_json(args.file_path)
-
-    # --- Upload Data ---
-    if requirements_list:
-        upload_requirements_to_dynamodb(
-            requirements_list,
-            DYNAMODB_TABLE_NAME,
-            args.region,
-            args.access_key,
-            args.secret_key
-        )
+    # --- Stream Data ---
+    # Requirements are read, cleaned and uploaded one at a time, so memory stays flat for any file size
+    input_path = os.path.abspath(args.file_path)
+    if os.path.exists(input_path):
+        journal = None
+        try:
+            requirements_stream = iter_requirements_from_json(input_path)
+            journal = None if args.dry_run else UploadJournal.for_input_file(args.file_path, DYNAMODB_TABLE_NAME, resume=args.resume)
+            if args.sync:
+                sync_requirements_to_dynamodb(
+                    requirements_stream,
+                    DYNAMODB_TABLE_NAME,
+                    args.region,
+                    args.access_key,
+                    args.secret_key,
+                    workers=args.workers,
+                    journal=journal,
+                    scan_segments=args.scan_segments,
+                    snapshot_path=args.snapshot,
+                    delete_missing=args.delete_missing,
+                    dry_run=args.dry_run,
+                    assume_yes=args.yes,
+                    initial_rate=args.initial_rate,
+                    max_rate=args.max_rate
+                )
+            else:
+                upload_requirements_to_dynamodb(
+                    requirements_stream,
+                    DYNAMODB_TABLE_NAME,
+                    args.region,
+                    args.access_key,
+                    args.secret_key,
+                    workers=args.workers,
+                    journal=journal,
+                    initial_rate=args.initial_rate,
+                    max_rate=args.max_rate
+                )
+        except ValueError as e:
+            print(f"Error: {e}")
+            print("Upload aborted due to errors loading JSON data.")
+        finally:
+            if journal is not None:
+                journal.close()
     else:
+        print(f"Error: Input JSON file not found at '{input_path}'")
         print("Upload aborted due to errors loading JSON data.")
\ No newline at end of file
@@ -1,14 +1,49 @@
-import json
+import argparse
+import os
+import queue
 import random
-from faker import Faker
+import sys
+import threading
+import time
+from collections import deque
 import datetime
 
-# Initialize Faker to generate mock data
-fake = Faker()
+from dynamo_json import dump_item, dumps_item, serialize_item
+
+# Faker, numpy and multiprocessing are imported on first use, so --help and argument errors return immediately
+np = None  # numpy module once load_numpy() has run; optional, only needed for --bulk generation
+_default_faker = None  # Faker used when generate_student_data is not given one
+
+def load_numpy():
+    """Imports numpy on first call; returns the module, or None when it is not installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+def new_faker():
+    """Creates a Faker instance (Faker is slow to import, so it is only loaded when data is generated)."""
+    from faker import Faker
+    return Faker()
+
+def new_pool(workers):
+    """Process pool for `workers` > 1, otherwise None (generation then runs in this process)."""
+    if workers <= 1:
+        return None
+    from multiprocessing import Pool
+    return Pool(processes=workers)
 
 # --- Configuration ---
-NUM_STUDENTS = 1  # Number of student records to generate
+NUM_STUDENTS = 1  # Default number of student records to generate (override with --count)
 OUTPUT_FILE = 'dynamodb_students.json'
+START_STUDENT_ID = 1000  # Student IDs start from this base number
+DEFAULT_SHARD_SIZE = 10000  # Students generated per worker task
+DEFAULT_WRITERS = 8  # Writer threads used by --load
+NAME_POOL_SIZE = 2000  # Distinct first/last/user names pre-built by Faker for --bulk generation
 
 # --- Data Pools for Realistic Generation ---
 MAJORS_AND_SUBJECTS = ['CIS', 'MATH', 'ENGL', 'HIST', 'BIOL', 'CHEM', 'ART', 'PSYC']
@@ -16,59 +51,46 @@ SEMESTERS = ['Fall', 'Spring', 'Summer']
 
 # --- Helper Functions ---
 
-def python_to_dynamodb_json(data):
-    """
-    Recursively converts a Python dictionary or list to DynamoDB JSON format.
-    """
-    if isinstance(data, dict):
-        return {'M': {k: python_to_dynamodb_json(v) for k, v in data.items()}}
-    elif isinstance(data, list):
-        return {'L': [python_to_dynamodb_json(i) for i in data]}
-    elif isinstance(data, str):
-        return {'S': data} if data else {'NULL': True}
-    elif isinstance(data, (int, float)):
-        return {'N': str(data)}
-    elif isinstance(data, bool):
-        return {'BOOL': data}
-    elif data is None:
-        return {'NULL': True}
-    else:
-        return {'S': str(data)}
-
-def create_random_course(subject_pool):
+def create_random_course(subject_pool, rng=random):
     """Generates a single random course dictionary."""
     return {
-        'Subject': random.choice(subject_pool),
+        'Subject': rng.choice(subject_pool),
         # MODIFIED: CourseNumber is now a number (integer)
-        'CourseNumber': random.randint(1000, 4999)
+        'CourseNumber': rng.randint(1000, 4999)
     }
 
 # --- Main Data Generation Function ---
 
-def generate_student_data(student_id):
+def generate_student_data(student_id, rng=random, faker=None):
     """
     Generates a single student record with realistic, randomized data.
+    Pass a seeded `rng` (random.Random) and `faker` instance for reproducible output.
     """
-    first_name = fake.first_name()
-    last_name = fake.last_name()
-    grad_year = random.randint(2024, 2028)
+    global _default_faker
+    if faker is None:
+        if _default_faker is None:
+            _default_faker = new_faker()
+        faker = _default_faker
+    first_name = faker.first_name()
+    last_name = faker.last_name()
+    grad_year = rng.randint(2024, 2028)
     
     completed_courses = []
-    for _ in range(random.randint(5, 20)):
-        course_year = random.randint(grad_year - 4, grad_year - 1)
+    for _ in range(rng.randint(5, 20)):
+        course_year = rng.randint(grad_year - 4, grad_year - 1)
         completed_courses.append({
-            **create_random_course(MAJORS_AND_SUBJECTS),
-            'Grade': round(random.uniform(2.0, 4.0), 2),
-            'Semester': random.choice(SEMESTERS),
+            **create_random_course(MAJORS_AND_SUBJECTS, rng),
+            'Grade': round(rng.uniform(2.0, 4.0), 2),
+            'Semester': rng.choice(SEMESTERS),
             'Year': course_year
         })
 
     grad_plan = {}
-    for i in range(random.randint(1, 4)):
+    for i in range(rng.randint(1, 4)):
         semester_year = grad_year - (i // 2)
         semester_name = f"{SEMESTERS[i % 2]}{semester_year}"
         grad_plan[semester_name] = [
-            create_random_course(MAJORS_AND_SUBJECTS) for _ in range(random.randint(2, 5))
+            create_random_course(MAJORS_AND_SUBJECTS, rng) for _ in range(rng.randint(2, 5))
         ]
 
     student = {
@@ -76,40 +98,472 @@ def generate_student_data(student_id):
         'StudentId': student_id,
         'FirstName': first_name,
         'LastName': last_name,
-        'Email': f"{first_name.lower()}.{last_name.lower()}{random.randint(1,99)}@university.edu",
-        'Major': random.sample(MAJORS_AND_SUBJECTS, k=random.randint(1, 2)),
-        'Minor': random.sample(MAJORS_AND_SUBJECTS, k=random.randint(0, 1)) if random.choice([True, False]) else [],
+        'Email': f"{first_name.lower()}.{last_name.lower()}{rng.randint(1,99)}@university.edu",
+        'Major': rng.sample(MAJORS_AND_SUBJECTS, k=rng.randint(1, 2)),
+        'Minor': rng.sample(MAJORS_AND_SUBJECTS, k=rng.randint(0, 1)) if rng.choice([True, False]) else [],
         'GraduationYear': grad_year,
         'CompletedCourses': completed_courses,
         'Overrides': [],
-        'CurrentSchedule': [create_random_course(MAJORS_AND_SUBJECTS) for _ in range(random.randint(3, 6))],
+        'CurrentSchedule': [create_random_course(MAJORS_AND_SUBJECTS, rng) for _ in range(rng.randint(3, 6))],
         'GraduationPlan': grad_plan
     }
     
-    if random.random() < 0.2:
+    if rng.random() < 0.2:
         student['Overrides'].append({
-            'SubThis': create_random_course(MAJORS_AND_SUBJECTS),
-            'SubFor': [create_random_course(MAJORS_AND_SUBJECTS) for _ in range(random.randint(1,2))],
-            'ApprovedBy': fake.user_name(),
-            'ApprovedDate': fake.date_this_year().isoformat()
+            'SubThis': create_random_course(MAJORS_AND_SUBJECTS, rng),
+            'SubFor': [create_random_course(MAJORS_AND_SUBJECTS, rng) for _ in range(rng.randint(1,2))],
+            'ApprovedBy': faker.user_name(),
+            'ApprovedDate': faker.date_this_year().isoformat()
         })
         
     return student
 
+# --- Bulk (Vectorized) Generation ---
+
+def build_name_pools(faker, size=NAME_POOL_SIZE):
+    """Calls Faker once per pool entry up front, so bulk generation only draws indexes afterwards."""
+    return {
+        'first': [faker.first_name() for _ in range(size)],
+        'last': [faker.last_name() for _ in range(size)],
+        'user': [faker.user_name() for _ in range(size)],
+    }
+
+def generate_student_chunk(start_id, count, np_rng, pools):
+    """
+    Generates `count` students (IDs start_id...) with the same shape and value ranges as generate_student_data.
+    Every numeric field is drawn in one NumPy call for the whole chunk; records are then assembled from the arrays.
+    """
+    np = load_numpy()
+    subjects = MAJORS_AND_SUBJECTS
+    num_subjects = len(subjects)
+
+    def courses(n):
+        """Draws n random courses as (subject, number) lists."""
+        return np_rng.integers(0, num_subjects, n).tolist(), np_rng.integers(1000, 5000, n).tolist()
+
+    first_names = np_rng.integers(0, len(pools['first']), count).tolist()
+    last_names = np_rng.integers(0, len(pools['last']), count).tolist()
+    email_numbers = np_rng.integers(1, 100, count).tolist()
+    grad_years_array = np_rng.integers(2024, 2029, count)
+    grad_years = grad_years_array.tolist()
+
+    # Completed courses: 5-20 per student, year in [grad_year - 4, grad_year - 1]
+    completed_counts_array = np_rng.integers(5, 21, count)
+    completed_counts = completed_counts_array.tolist()
+    total_completed = int(completed_counts_array.sum())
+    completed_subjects, completed_numbers = courses(total_completed)
+    completed_grades = np.round(np_rng.uniform(2.0, 4.0, total_completed), 2).tolist()
+    completed_semesters = np_rng.integers(0, len(SEMESTERS), total_completed).tolist()
+    completed_years = (np.repeat(grad_years_array, completed_counts_array) - np_rng.integers(1, 5, total_completed)).tolist()
+
+    # Majors (1-2, distinct) and minors (0-1, half the students) as random permutations of the subject pool
+    major_orders = np_rng.random((count, num_subjects)).argsort(axis=1).tolist()
+    major_counts = np_rng.integers(1, 3, count).tolist()
+    has_minor = (np_rng.random(count) < 0.5).tolist()
+    minor_counts = np_rng.integers(0, 2, count).tolist()
+    minor_subjects = np_rng.integers(0, num_subjects, count).tolist()
+
+    # Graduation plan: 1-4 semesters of 2-5 courses
+    plan_counts_array = np_rng.integers(1, 5, count)
+    plan_counts = plan_counts_array.tolist()
+    plan_course_counts = np_rng.integers(2, 6, int(plan_counts_array.sum())).tolist()
+    plan_subjects, plan_numbers = courses(sum(plan_course_counts))
+
+    # Current schedule: 3-6 courses
+    schedule_counts = np_rng.integers(3, 7, count).tolist()
+    schedule_subjects, schedule_numbers = courses(sum(schedule_counts))
+
+    # Overrides for ~20% of students: one SubThis, 1-2 SubFor, an approver and a date this year
+    has_override = (np_rng.random(count) < 0.2).tolist()
+    total_overrides = sum(has_override)
+    override_subjects, override_numbers = courses(total_overrides)
+    sub_for_counts = np_rng.integers(1, 3, total_overrides).tolist()
+    sub_for_subjects, sub_for_numbers = courses(sum(sub_for_counts))
+    approvers = np_rng.integers(0, len(pools['user']), total_overrides).tolist()
+    year_start = datetime.date(datetime.date.today().year, 1, 1)
+    days_so_far = (datetime.date.today() - year_start).days + 1
+    approved_days = np_rng.integers(0, days_so_far, total_overrides).tolist()
+
+    completed_pos = plan_pos = plan_course_pos = schedule_pos = override_pos = sub_for_pos = 0
+    students = []
+    for i in range(count):
+        first_name = pools['first'][first_names[i]]
+        last_name = pools['last'][last_names[i]]
+        grad_year = grad_years[i]
+
+        completed_courses = []
+        for j in range(completed_pos, completed_pos + completed_counts[i]):
+            completed_courses.append({
+                'Subject': subjects[completed_subjects[j]],
+                'CourseNumber': completed_numbers[j],
+                'Grade': completed_grades[j],
+                'Semester': SEMESTERS[completed_semesters[j]],
+                'Year': completed_years[j]
+            })
+        completed_pos += completed_counts[i]
+
+        grad_plan = {}
+        for semester_index in range(plan_counts[i]):
+            course_count = plan_course_counts[plan_pos]
+            plan_pos += 1
+            grad_plan[f"{SEMESTERS[semester_index % 2]}{grad_year - (semester_index // 2)}"] = [
+                {'Subject': subjects[plan_subjects[j]], 'CourseNumber': plan_numbers[j]}
+                for j in range(plan_course_pos, plan_course_pos + course_count)
+            ]
+            plan_course_pos += course_count
+
+        current_schedule = [
+            {'Subject': subjects[schedule_subjects[j]], 'CourseNumber': schedule_numbers[j]}
+            for j in range(schedule_pos, schedule_pos + schedule_counts[i])
+        ]
+        schedule_pos += schedule_counts[i]
+
+        overrides = []
+        if has_override[i]:
+            k = override_pos
+            overrides.append({
+                'SubThis': {'Subject': subjects[override_subjects[k]], 'CourseNumber': override_numbers[k]},
+                'SubFor': [
+                    {'Subject': subjects[sub_for_subjects[j]], 'CourseNumber': sub_for_numbers[j]}
+                    for j in range(sub_for_pos, sub_for_pos + sub_for_counts[k])
+                ],
+                'ApprovedBy': pools['user'][approvers[k]],
+                'ApprovedDate': (year_start + datetime.timedelta(days=approved_days[k])).isoformat()
+            })
+            sub_for_pos += sub_for_counts[k]
+            override_pos += 1
+
+        students.append({
+            'StudentId': start_id + i,
+            'FirstName': first_name,
+            'LastName': last_name,
+            'Email': f"{first_name.lower()}.{last_name.lower()}{email_numbers[i]}@university.edu",
+            'Major': [subjects[j] for j in major_orders[i][:major_counts[i]]],
+            'Minor': [subjects[minor_subjects[i]]] if has_minor[i] and minor_counts[i] else [],
+            'GraduationYear': grad_year,
+            'CompletedCourses': completed_courses,
+            'Overrides': overrides,
+            'CurrentSchedule': current_schedule,
+            'GraduationPlan': grad_plan
+        })
+    return students
+
+# --- Sharded Generation ---
+
+_worker_faker = None  # One Faker per worker process; re-seeded for every shard
+_worker_name_pools = {}  # base seed -> name pools, built once per worker process for --bulk
+
+def shard_seed(base_seed, shard_index):
+    """Derives the RNG seed of one shard, so output only depends on --seed and --shard-size."""
+    return base_seed * 1000003 + shard_index
+
+def random_base_seed():
+    """Picks a random base seed and prints it, so a run without --seed can still be reproduced."""
+    base_seed = random.randrange(2 ** 32)
+    print(f"Using random seed {base_seed} (pass --seed {base_seed} to reproduce this run).")
+    return base_seed
+
+def render_student(student, output_format):
+    """Renders one student as a line of the requested output format ('item' returns the DynamoDB JSON dict)."""
+    if output_format == 'item':
+        return serialize_item(student, empty_string_as_null=True)
+    if output_format == 'jsonl':
+        return dumps_item(student, empty_string_as_null=True)
+    # Match json.dump(students, indent=2): each array element is indented one level
+    return '  ' + dumps_item(student, indent=2, level=1, empty_string_as_null=True)
+
+def stream_student(f, student, output_format):
+    """Writes one student straight to an open file, producing exactly the text render_student returns."""
+    if output_format == 'jsonl':
+        dump_item(student, f, empty_string_as_null=True)
+    else:
+        f.write('  ')
+        dump_item(student, f, indent=2, level=1, empty_string_as_null=True)
+
+def generate_shard(task):
+    """
+    Generates one contiguous range of student IDs with its own seeded RNG and Faker
+    (or, with `bulk`, a seeded NumPy generator drawing from name pools shared by all shards of the run).
+    Writes the shard to `shard_path` when given (returning the count), otherwise returns the rendered records.
+    """
+    global _worker_faker
+    shard_index, start_id, count, base_seed, output_format, shard_path, bulk = task
+    if _worker_faker is None:
+        _worker_faker = new_faker()
+    seed = shard_seed(base_seed, shard_index)
+
+    if bulk:
+        if base_seed not in _worker_name_pools:
+            _worker_faker.seed_instance(base_seed)
+            _worker_name_pools[base_seed] = build_name_pools(_worker_faker)
+        students = generate_student_chunk(start_id, count, load_numpy().random.default_rng(seed), _worker_name_pools[base_seed])
+    else:
+        rng = random.Random(seed)
+        _worker_faker.seed_instance(seed)
+        students = (generate_student_data(student_id, rng, _worker_faker) for student_id in range(start_id, start_id + count))
+
+    if shard_path is None:
+        return [render_student(student, output_format) for student in students]
+    with open(shard_path, 'w', encoding='utf-8') as f:
+        write_records(f, students, output_format, lambda student: stream_student(f, student, output_format))
+    return count
+
+def write_records(f, records, output_format, write_record=None):
+    """
+    Streams records to an open file as JSON Lines or as one JSON array.
+    Records are rendered strings unless `write_record` is given to write each one itself.
+    """
+    write_record = write_record or f.write
+    if output_format == 'jsonl':
+        for record in records:
+            write_record(record)
+            f.write('\n')
+        return
+    f.write('[')
+    separator = '\n'
+    for record in records:
+        f.write(separator)
+        write_record(record)
+        separator = ',\n'
+    f.write('\n]' if separator != '\n' else ']')
+
+def shard_path_for(output_file, shard_index):
+    """Returns the file name of one shard, e.g. students.jsonl -> students-00003.jsonl."""
+    stem, extension = os.path.splitext(output_file)
+    return f"{stem}-{shard_index:05d}{extension}"
+
+def iter_shard_results(pool, tasks, max_in_flight):
+    """
+    Yields shard results in task order while keeping at most `max_in_flight` shards queued or running,
+    so generation never runs far ahead of whoever consumes the results. Runs inline without a pool.
+    """
+    if pool is None:
+        yield from map(generate_shard, tasks)
+        return
+    pending = deque()
+    task_iter = iter(tasks)
+    for task in task_iter:
+        pending.append(pool.apply_async(generate_shard, (task,)))
+        if len(pending) >= max_in_flight:
+            break
+    while pending:
+        result = pending.popleft().get()
+        next_task = next(task_iter, None)
+        if next_task is not None:
+            pending.append(pool.apply_async(generate_shard, (next_task,)))
+        yield result
+
+def build_shard_tasks(count, start_id, shard_size, base_seed, output_format, output_file=None, bulk=False):
+    if base_seed is None:
+        base_seed = random_base_seed()
+    tasks = []
+    for shard_index, shard_start in enumerate(range(0, count, shard_size)):
+        shard_count = min(shard_size, count - shard_start)
+        shard_path = shard_path_for(output_file, shard_index) if output_file else None
+        tasks.append((shard_index, start_id + shard_start, shard_count, base_seed, output_format, shard_path, bulk))
+    return tasks
+
+def generate_students(count, output_file, output_format='json', start_id=START_STUDENT_ID, seed=None,
+                      workers=1, shard_size=DEFAULT_SHARD_SIZE, split_shards=False, bulk=False):
+    """
+    Generates `count` students across a process pool of sharded ID ranges and streams them to disk.
+    With `split_shards` every shard is written by its worker to its own file; otherwise shards are
+    written to `output_file` in ID order as they complete, so memory stays bounded by the shards in flight.
+    """
+    tasks = build_shard_tasks(count, start_id, shard_size, seed, output_format, output_file if split_shards else None, bulk)
+    workers = max(1, min(workers, len(tasks)))
+    started_at = time.perf_counter()
+    written = 0
+
+    pool = new_pool(workers)
+    try:
+        results = iter_shard_results(pool, tasks, workers * 2)
+        if split_shards:
+            for shard_count in results:
+                written += shard_count
+                print(f"  Generated {written}/{count} students...")
+        else:
+            def records():
+                nonlocal written
+                for shard_records in results:
+                    yield from shard_records
+                    written += len(shard_records)
+                    print(f"  Generated {written}/{count} students...")
+            with open(output_file, 'w', encoding='utf-8') as f:
+                write_records(f, records(), output_format)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - started_at
+    rate = written / elapsed if elapsed > 0 else 0.0
+    print(f"Generated {written} students in {elapsed:.2f}s ({rate:,.0f} students/sec).")
+    return written
+
+# --- Direct Loading ---
+
+def load_students_to_dynamodb(count, table_name, session_args, endpoint_url=None, start_id=START_STUDENT_ID, seed=None,
+                              workers=1, shard_size=DEFAULT_SHARD_SIZE, writers=DEFAULT_WRITERS, initial_rate=None, max_rate=None, bulk=False):
+    """
+    Generates students in a process pool and writes them straight into DynamoDB (or DynamoDB Local via `endpoint_url`).
+    Generator processes and writer threads run concurrently: finished shards are cut into 25-item batches and handed
+    to the writers through a bounded queue, so neither side waits on the other beyond the queue's capacity.
+    Returns the number of students that could not be written.
+    """
+    # Only --load needs boto3; the helpers are shared with the degree requirements uploader
+    from degree_reqs_upload import DEFAULT_INITIAL_RATE, UploadTarget
+    from dynamo_batch_writer import BATCH_WRITE_SIZE, BatchWriteError
+
+    target = UploadTarget(table_name, session_args, initial_rate=initial_rate or DEFAULT_INITIAL_RATE, max_rate=max_rate,
+                          key_names=['StudentId'], endpoint_url=endpoint_url)
+    batches = queue.Queue(maxsize=writers * 4)
+    failed = []
+    failed_lock = threading.Lock()
+    stop = threading.Event() # Set when a writer thread can no longer write; the producer then stops generating
+
+    def drain_batches():
+        """Takes batches off the queue without writing them until this thread's end marker arrives."""
+        while batches.get() is not None:
+            pass
+
+    def writer_loop():
+        try:
+            writer = target.new_writer()
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                try:
+                    for item in batch:
+                        writer.put_serialized(item)
+                    writer.flush()
+                except BatchWriteError as e:
+                    with failed_lock:
+                        failed.extend(writer.pending_keys())
+                    print(f"  Error writing a batch of students: {e}")
+                    writer = target.new_writer() # Drop the unwritten requests and carry on with a clean buffer
+        except Exception as e:
+            print(f"  Error: writer thread stopped: {e}")
+            stop.set()
+            drain_batches() # Keeps the producer from blocking on a full queue
+
+    # Fail fast on a broken client (missing botocore, bad profile or endpoint) before anything is started
+    try:
+        target.new_writer()
+    except Exception as e:
+        print(f"Error: could not create a DynamoDB client: {e}")
+        return count
+
+    tasks = build_shard_tasks(count, start_id, shard_size, seed, 'item', bulk=bulk)
+    workers = max(1, min(workers, len(tasks)))
+    print(f"Loading {count} students into table '{table_name}'" + (f" at {endpoint_url}" if endpoint_url else "") +
+          f" ({workers} generator process(es), {writers} writer thread(s))...")
+
+    # Fork the generator processes before any writer thread exists, so no child inherits a held lock
+    pool = new_pool(workers)
+    writer_threads = [threading.Thread(target=writer_loop, daemon=True) for _ in range(writers)]
+    for thread in writer_threads:
+        thread.start()
+
+    started_at = time.perf_counter()
+    generated = 0
+    try:
+        for shard_items in iter_shard_results(pool, tasks, workers * 2):
+            if stop.is_set():
+                break
+            for i in range(0, len(shard_items), BATCH_WRITE_SIZE):
+                batches.put(shard_items[i:i + BATCH_WRITE_SIZE]) # Blocks while the writers are behind
+            generated += len(shard_items)
+            elapsed = time.perf_counter() - started_at
+            print(f"  Generated {generated}/{count}, acknowledged {target.stats.acknowledged} ({target.stats.acknowledged / elapsed:,.0f} items/sec)...")
+    finally:
+        for _ in writer_threads:
+            batches.put(None)
+        for thread in writer_threads:
+            thread.join()
+        if pool:
+            if stop.is_set():
+                pool.terminate() # Drop the shards still being generated
+            else:
+                pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - started_at
+    print(f"\nLoaded {target.stats.acknowledged}/{count} students in {elapsed:.2f}s ({target.stats.acknowledged / elapsed:,.0f} items/sec).")
+    unwritten = len(failed)
+    if stop.is_set():
+        unwritten = count - target.stats.acknowledged
+        print(f"Stopped early:       {unwritten} students not written (a writer thread failed)")
+    elif failed:
+        print(f"Failed:              {len(failed)}")
+    for line in target.stats.summary_lines(target.rate_limiter):
+        print(line)
+    return unwritten
+
 # --- Script Execution ---
 
 if __name__ == "__main__":
-    all_students_dynamodb = []
-    print(f"Generating {NUM_STUDENTS} student records...")
+    parser = argparse.ArgumentParser(description='Generate synthetic student records in DynamoDB JSON format.')
+    parser.add_argument('--count', type=int, default=NUM_STUDENTS, help='Number of student records to generate.')
+    parser.add_argument('--start-id', type=int, default=START_STUDENT_ID, help='First StudentId; IDs are consecutive.')
+    parser.add_argument('--output', default=OUTPUT_FILE, help='Output file (with --split-shards, the base name of the shard files).')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default=None, help='Output format: one JSON array or JSON Lines (default: jsonl for .jsonl outputs, json otherwise).')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of generator processes.')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Students per worker task (one file per shard with --split-shards).')
+    parser.add_argument('--seed', type=int, default=None, help='Base seed for reproducible output (random if omitted).')
+    parser.add_argument('--split-shards', action='store_true', help='Write each shard to its own file instead of one output file.')
+    parser.add_argument('--bulk', action='store_true', help='Vectorized generation: draw numeric fields in NumPy batches and names from pre-built Faker pools (requires numpy).')
+
+    load_group = parser.add_argument_group('direct loading')
+    load_group.add_argument('--load', action='store_true', help='Write generated students straight into the students table instead of a file.')
+    load_group.add_argument('--table', default=None, help="Target table (default: 'db_tables.students' from server/src/config/config.json).")
+    load_group.add_argument('--endpoint-url', default=os.environ.get('DYNAMODB_ENDPOINT_URL'), help='DynamoDB endpoint, e.g. http://localhost:8000 for DynamoDB Local.')
+    load_group.add_argument('--region', default=os.environ.get('AWS_REGION'), help='AWS Region (overrides environment variable).')
+    load_group.add_argument('--access-key', default=os.environ.get('AWS_ACCESS_KEY_ID'), help='AWS Access Key ID (overrides environment variable).')
+    load_group.add_argument('--secret-key', default=os.environ.get('AWS_SECRET_ACCESS_KEY'), help='AWS Secret Access Key (overrides environment variable).')
+    load_group.add_argument('--writers', type=int, default=DEFAULT_WRITERS, help='Number of concurrent batch writer threads.')
+    load_group.add_argument('--initial-rate', type=float, default=None, help='Starting send rate in BatchWriteItem requests/sec (adapted to observed throttling).')
+    load_group.add_argument('--max-rate', type=float, default=None, help='Upper bound for the adaptive send rate in requests/sec.')
+    args = parser.parse_args()
 
-    # Start student IDs from a base number
-    for i in range(1000, 1000 + NUM_STUDENTS):
-        py_student_record = generate_student_data(i)
-        dynamodb_student_item = python_to_dynamodb_json(py_student_record)['M']
-        all_students_dynamodb.append(dynamodb_student_item)
+    if args.count < 1 or args.workers < 1 or args.shard_size < 1:
+        print("Error: --count, --workers and --shard-size must be positive integers.")
+        sys.exit(1)
+    if args.bulk and load_numpy() is None:
+        print("Error: --bulk requires numpy. Install it with 'pip install numpy'.")
+        sys.exit(1)
+    output_format = args.format or ('jsonl' if args.output.lower().endswith('.jsonl') else 'json')
+    seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
 
-    with open(OUTPUT_FILE, 'w') as f:
-        json.dump(all_students_dynamodb, f, indent=2)
+    if args.load:
+        if args.writers < 1:
+            print("Error: --writers must be a positive integer.")
+            sys.exit(1)
+        from degree_reqs_upload import build_session_args, load_config
+        table_name = args.table
+        if not table_name:
+            try:
+                table_name = load_config()['db_tables']['students']
+            except KeyError:
+                print("Error: Could not find 'db_tables.students' in the loaded config file.")
+                sys.exit(1)
+        # DynamoDB Local accepts any region, but boto3 still insists on one
+        region = args.region or ('us-east-1' if args.endpoint_url else None)
+        session_args = build_session_args(region, args.access_key, args.secret_key)
+        print(f"Generating {args.count} student records (seed {seed}) for direct loading...")
+        failed = load_students_to_dynamodb(args.count, table_name, session_args, args.endpoint_url, args.start_id, seed,
+                                           args.workers, args.shard_size, args.writers, args.initial_rate, args.max_rate, args.bulk)
+        if failed > 0:
+            print(f"Error: {failed} student(s) were not written.")
+            sys.exit(1)
+        sys.exit(0)
 
-    print(f"Successfully generated data for {NUM_STUDENTS} students.")
-    print(f"Output saved to '{OUTPUT_FILE}'")
\ No newline at end of file
+    print(f"Generating {args.count} student records (seed {seed}, {args.workers} worker(s))...")
+    generate_students(args.count, args.output, output_format, args.start_id, seed, args.workers, args.shard_size, args.split_shards, args.bulk)
+
+    print(f"Successfully generated data for {args.count} students.")
+    if args.split_shards:
+        print(f"Output saved to '{shard_path_for(args.output, 0)}' and following shard files")
+    else:
+        print(f"Output saved to '{args.output}'")
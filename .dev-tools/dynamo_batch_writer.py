@@ -0,0 +1,228 @@
+import json
+import random
+import threading
+import time
+
+from dynamo_json import serialize_item
+
+BATCH_WRITE_SIZE = 25 # Max items per DynamoDB BatchWriteItem call
+
+# Error codes that mean "slow down and try again" rather than "this request is invalid"
+RETRYABLE_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable',
+}
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe AIMD send-rate controller shared by every writer of one upload.
+    The rate (BatchWriteItem requests/sec) grows additively while requests succeed and is cut
+    multiplicatively when DynamoDB throttles or returns UnprocessedItems.
+    """
+
+    def __init__(self, initial_rate=10.0, min_rate=0.5, max_rate=None, additive_step=0.5, decrease_factor=0.5, decrease_cooldown=1.0):
+        self.rate = float(initial_rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate) if max_rate else None
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown # Concurrent workers seeing one throttle event only cut the rate once
+        self._next_send_time = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until the caller may send its next request at the current rate."""
+        with self._lock:
+            now = time.monotonic()
+            send_at = max(now, self._next_send_time)
+            self._next_send_time = send_at + 1.0 / self.rate
+        delay = send_at - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self):
+        with self._lock:
+            self.rate += self.additive_step
+            if self.max_rate is not None:
+                self.rate = min(self.rate, self.max_rate)
+
+    def on_throttle(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.decrease_cooldown:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+class BatchWriteStats:
+    """Thread-safe counters describing what DynamoDB actually acknowledged."""
+
+    def __init__(self):
+        self.acknowledged = 0
+        self.requests = 0
+        self.retried_items = 0
+        self.throttled_requests = 0
+        self.consumed_wcu = 0.0
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, acknowledged=0, requests=0, retried_items=0, throttled_requests=0, consumed_wcu=0.0):
+        with self._lock:
+            self.acknowledged += acknowledged
+            self.requests += requests
+            self.retried_items += retried_items
+            self.throttled_requests += throttled_requests
+            self.consumed_wcu += consumed_wcu
+
+    def wcu_per_second(self):
+        elapsed = time.perf_counter() - self.started_at
+        return self.consumed_wcu / elapsed if elapsed > 0 else 0.0
+
+    def summary_lines(self, rate_limiter=None):
+        lines = [
+            f"Acknowledged items:  {self.acknowledged}",
+            f"BatchWrite requests: {self.requests}",
+            f"Retried items:       {self.retried_items}",
+            f"Throttled requests:  {self.throttled_requests}",
+            f"Consumed WCU:        {self.consumed_wcu:.1f} ({self.wcu_per_second():.1f} WCU/sec)",
+        ]
+        if rate_limiter is not None:
+            lines.append(f"Final send rate:     {rate_limiter.rate:.1f} requests/sec")
+        return lines
+
+class BatchWriteError(Exception):
+    """Raised when a batch could not be fully written within the retry budget."""
+
+    def __init__(self, message, unwritten_keys):
+        super().__init__(message)
+        self.unwritten_keys = unwritten_keys
+
+class AdaptiveBatchWriter:
+    """
+    Buffers put/delete requests for one table and sends them with raw `batch_write_item`.
+    UnprocessedItems and throttling errors are retried with exponential backoff plus full jitter,
+    and `on_acknowledged` is called with the keys of every item DynamoDB confirmed.
+    Not thread-safe: create one writer per worker and share the rate limiter and stats instead.
+    """
+
+    def __init__(self, client, table_name, key_names, rate_limiter=None, stats=None, on_acknowledged=None,
+                 max_attempts=10, base_delay=0.05, max_delay=20.0):
+        self.client = client
+        self.table_name = table_name
+        self.key_names = list(key_names)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.stats = stats or BatchWriteStats()
+        self.on_acknowledged = on_acknowledged
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buffer = {} # key -> (write_request, key); later writes to the same key replace earlier ones
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.flush()
+        return False
+
+    def put(self, item):
+        """Stages a PutRequest for a plain Python item (Decimal numbers, no floats)."""
+        key = tuple(item[k] for k in self.key_names)
+        self._stage(key, {'PutRequest': {'Item': serialize_item(item)}})
+
+    def put_serialized(self, item):
+        """Stages a PutRequest for an item already in DynamoDB JSON form ({'Attr': {'S': ...}, ...})."""
+        key = tuple(next(iter(item[k].values())) for k in self.key_names)
+        self._stage(key, {'PutRequest': {'Item': item}})
+
+    def delete(self, key):
+        """Stages a DeleteRequest for a key tuple ordered like `key_names`."""
+        key = tuple(key)
+        self._stage(key, {'DeleteRequest': {'Key': serialize_item(dict(zip(self.key_names, key)))}})
+
+    def _stage(self, key, write_request):
+        self._buffer.pop(key, None)
+        self._buffer[key] = (write_request, key)
+        if len(self._buffer) >= BATCH_WRITE_SIZE:
+            self.flush()
+
+    def pending_keys(self):
+        return list(self._buffer)
+
+    def flush(self):
+        """Sends everything staged so far, BATCH_WRITE_SIZE requests at a time."""
+        while self._buffer:
+            batch = []
+            for key in list(self._buffer)[:BATCH_WRITE_SIZE]:
+                batch.append(self._buffer.pop(key))
+            self._send(batch)
+
+    def _fingerprint(self, write_request):
+        """Identifies a (possibly echoed-back) write request by its serialized key attributes."""
+        if 'PutRequest' in write_request:
+            attributes = write_request['PutRequest']['Item']
+        else:
+            attributes = write_request['DeleteRequest']['Key']
+        return tuple(json.dumps(attributes[k], sort_keys=True) for k in self.key_names)
+
+    def _backoff(self, attempt):
+        time.sleep(random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt))))
+
+    def _send(self, batch):
+        # Imported here so loading this module (e.g. for --help) does not pull in botocore
+        from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, HTTPClientError
+        pending = batch
+        attempt = 0
+        while pending:
+            self.rate_limiter.acquire()
+            try:
+                response = self.client.batch_write_item(
+                    RequestItems={self.table_name: [request for request, _ in pending]},
+                    ReturnConsumedCapacity='TOTAL'
+                )
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code not in RETRYABLE_ERROR_CODES:
+                    self._put_back(pending)
+                    raise BatchWriteError(f"BatchWriteItem failed ({code}): {e}", [key for _, key in pending]) from e
+                self.stats.add(requests=1, throttled_requests=1, retried_items=len(pending))
+                self.rate_limiter.on_throttle()
+                attempt = self._next_attempt(attempt, pending, code)
+                continue
+            except (BotocoreConnectionError, HTTPClientError) as e:
+                self.stats.add(requests=1, retried_items=len(pending))
+                attempt = self._next_attempt(attempt, pending, type(e).__name__)
+                continue
+
+            consumed = sum(entry.get('CapacityUnits', 0) for entry in response.get('ConsumedCapacity') or [])
+            unprocessed = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            unprocessed_fingerprints = {self._fingerprint(request) for request in unprocessed}
+            acknowledged = [key for request, key in pending if self._fingerprint(request) not in unprocessed_fingerprints]
+            self.stats.add(acknowledged=len(acknowledged), requests=1, retried_items=len(unprocessed), consumed_wcu=consumed)
+            if acknowledged and self.on_acknowledged is not None:
+                self.on_acknowledged(acknowledged)
+
+            if not unprocessed:
+                self.rate_limiter.on_success()
+                return
+            self.rate_limiter.on_throttle()
+            pending = [(request, key) for request, key in pending if self._fingerprint(request) in unprocessed_fingerprints]
+            attempt = self._next_attempt(attempt, pending, 'UnprocessedItems')
+
+    def _next_attempt(self, attempt, pending, reason):
+        attempt += 1
+        if attempt >= self.max_attempts:
+            self._put_back(pending)
+            raise BatchWriteError(f"Gave up on {len(pending)} item(s) after {attempt} attempts ({reason}).", [key for _, key in pending])
+        self._backoff(attempt)
+        return attempt
+
+    def _put_back(self, pending):
+        """Returns unsent requests to the buffer so callers can see (or retry) what was not written."""
+        for request, key in pending:
+            self._buffer.setdefault(key, (request, key))
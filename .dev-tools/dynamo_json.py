@@ -0,0 +1,298 @@
+# File: .dev-tools/dynamo_json.py
+# Converts between plain Python values and DynamoDB JSON ({'S': ...}, {'N': ...}, {'M': {...}}, ...).
+# Every walk is iterative (no recursion limit on deep nesting) and type dispatch is memoized per class.
+
+import base64
+import json
+import math
+from decimal import Decimal
+from json.encoder import encode_basestring_ascii
+
+# --- Type Dispatch ---
+
+_KIND_CACHE = {} # Python class -> DynamoDB type tag, filled on first sight of each class
+
+def _resolve_kind(cls):
+    """Maps a Python class to its DynamoDB type tag. bool is checked before int, which it subclasses."""
+    if issubclass(cls, bool):
+        return 'BOOL'
+    if issubclass(cls, str):
+        return 'S'
+    if issubclass(cls, (int, float, Decimal)):
+        return 'N'
+    if cls is type(None):
+        return 'NULL'
+    if issubclass(cls, dict):
+        return 'M'
+    if issubclass(cls, (list, tuple)):
+        return 'L'
+    if issubclass(cls, (bytes, bytearray)):
+        return 'B'
+    if issubclass(cls, (set, frozenset)):
+        return 'SET'
+    return None
+
+def _kind_of(value):
+    cls = value.__class__
+    try:
+        return _KIND_CACHE[cls]
+    except KeyError:
+        kind = _KIND_CACHE[cls] = _resolve_kind(cls)
+        return kind
+
+def _number_text(value):
+    """Renders a number the way DynamoDB's N type expects it; NaN and Infinity are rejected."""
+    if value.__class__ is int:
+        return str(value)
+    if isinstance(value, float) and not math.isfinite(value):
+        raise ValueError(f"DynamoDB cannot store non-finite number {value!r}.")
+    if isinstance(value, Decimal) and not value.is_finite():
+        raise ValueError(f"DynamoDB cannot store non-finite number {value!r}.")
+    return str(value)
+
+def _set_attribute(value):
+    """Serializes a set as SS, NS or BS (sorted, so output is deterministic)."""
+    kinds = {_kind_of(member) for member in value}
+    if not value or len(kinds) != 1 or kinds.pop() not in ('S', 'N', 'B'):
+        raise TypeError(f"Sets must be non-empty and hold only strings, only numbers or only bytes: {value!r}")
+    first = next(iter(value))
+    if _kind_of(first) == 'S':
+        return {'SS': sorted(value)}
+    if _kind_of(first) == 'N':
+        return {'NS': [_number_text(member) for member in sorted(value)]}
+    return {'BS': [bytes(member) for member in sorted(value)]}
+
+def _scalar_attribute(value, kind, empty_string_as_null):
+    """Serializes one non-container value to its DynamoDB JSON attribute."""
+    if kind == 'S':
+        return {'NULL': True} if empty_string_as_null and not value else {'S': value}
+    if kind == 'N':
+        return {'N': _number_text(value)}
+    if kind == 'BOOL':
+        return {'BOOL': value}
+    if kind == 'NULL':
+        return {'NULL': True}
+    if kind == 'B':
+        return {'B': bytes(value)}
+    if kind == 'SET':
+        return _set_attribute(value)
+    raise TypeError(f"Unsupported type for DynamoDB: {type(value).__name__} ({value!r})")
+
+# --- Serialize (Python -> DynamoDB JSON) ---
+
+def serialize(value, empty_string_as_null=False):
+    """
+    Converts a Python value to one DynamoDB JSON attribute, e.g. 3 -> {'N': '3'}, [True] -> {'L': [{'BOOL': True}]}.
+    Pass `empty_string_as_null=True` to store '' as NULL instead of an empty S.
+    """
+    kind = _kind_of(value)
+    if kind != 'M' and kind != 'L':
+        return _scalar_attribute(value, kind, empty_string_as_null)
+    root = [None]
+    stack = [(value, kind, root, 0)]
+    while stack:
+        value, kind, parent, slot = stack.pop()
+        if kind == 'M':
+            out = {}
+            parent[slot] = {'M': out}
+            children = value.items()
+        else:
+            out = [None] * len(value)
+            parent[slot] = {'L': out}
+            children = enumerate(value)
+        for slot, child in children:
+            cls = child.__class__
+            # Exact-class fast paths for the common leaves; everything else goes through the memoized dispatch
+            if cls is str and (child or not empty_string_as_null):
+                out[slot] = {'S': child}
+                continue
+            if cls is int:
+                out[slot] = {'N': str(child)}
+                continue
+            child_kind = _KIND_CACHE.get(cls) or _kind_of(child)
+            if child_kind == 'M' or child_kind == 'L':
+                out[slot] = None # Reserve the slot so map keys keep their input order
+                stack.append((child, child_kind, out, slot))
+            else:
+                out[slot] = _scalar_attribute(child, child_kind, empty_string_as_null)
+    return root[0]
+
+def serialize_item(item, empty_string_as_null=False):
+    """Converts a Python dict to a DynamoDB item ({'Attr': {'S': ...}, ...}), as used by the low-level client."""
+    if not isinstance(item, dict):
+        raise TypeError(f"A DynamoDB item must be a dict, got {type(item).__name__}.")
+    return serialize(item, empty_string_as_null)['M']
+
+# --- Deserialize (DynamoDB JSON -> Python) ---
+
+def _scalar_value(tag, payload, parse_number):
+    if tag == 'S' or tag == 'BOOL':
+        return payload
+    if tag == 'N':
+        return parse_number(payload)
+    if tag == 'NULL':
+        return None
+    if tag == 'B':
+        return base64.b64decode(payload) if isinstance(payload, str) else bytes(payload)
+    if tag == 'SS':
+        return set(payload)
+    if tag == 'NS':
+        return {parse_number(member) for member in payload}
+    if tag == 'BS':
+        return {base64.b64decode(member) if isinstance(member, str) else bytes(member) for member in payload}
+    raise TypeError(f"Unknown DynamoDB type tag '{tag}'.")
+
+def deserialize(attribute, parse_number=Decimal):
+    """Converts one DynamoDB JSON attribute back to a Python value. Numbers go through `parse_number` (Decimal by default)."""
+    (tag, payload), = attribute.items()
+    if tag != 'M' and tag != 'L':
+        return _scalar_value(tag, payload, parse_number)
+    root = [None]
+    stack = [(tag, payload, root, 0)]
+    while stack:
+        tag, payload, parent, slot = stack.pop()
+        if tag == 'M':
+            out = {}
+            children = payload.items()
+        else:
+            out = [None] * len(payload)
+            children = enumerate(payload)
+        parent[slot] = out
+        for slot, child in children:
+            (child_tag, child_payload), = child.items()
+            if child_tag == 'M' or child_tag == 'L':
+                out[slot] = None
+                stack.append((child_tag, child_payload, out, slot))
+            else:
+                out[slot] = _scalar_value(child_tag, child_payload, parse_number)
+    return root[0]
+
+def deserialize_item(item, parse_number=Decimal):
+    """Converts a DynamoDB item ({'Attr': {'S': ...}, ...}) back to a plain Python dict."""
+    return deserialize({'M': item}, parse_number)
+
+# --- Streaming JSON Text ---
+
+_STREAM_FLUSH_PARTS = 4096 # Text fragments buffered before each write to the output stream
+
+def _binary_json(value):
+    """json.dumps fallback: B/BS payloads are written base64-encoded, as in DynamoDB's JSON wire format."""
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode('ascii')
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _scalar_json(value, kind, empty_string_as_null):
+    """Returns (tag, payload JSON text) for one non-container value."""
+    if kind == 'S':
+        if empty_string_as_null and not value:
+            return 'NULL', 'true'
+        return 'S', encode_basestring_ascii(value)
+    if kind == 'N':
+        return 'N', '"' + _number_text(value) + '"'
+    if kind == 'BOOL':
+        return 'BOOL', 'true' if value else 'false'
+    if kind == 'NULL':
+        return 'NULL', 'true'
+    if kind == 'B':
+        return 'B', '"' + base64.b64encode(bytes(value)).decode('ascii') + '"'
+    if kind == 'SET':
+        (tag, members), = _set_attribute(value).items()
+        if tag == 'BS':
+            members = [base64.b64encode(member).decode('ascii') for member in members]
+        return tag, members
+    raise TypeError(f"Unsupported type for DynamoDB: {type(value).__name__} ({value!r})")
+
+def _emit_item(item, write, indent, level, empty_string_as_null):
+    """
+    Writes `item` as the text json.dumps(serialize_item(item), indent=indent) would produce, indented as if
+    nested `level` levels deep, without building the intermediate wrapper dicts.
+    """
+    newlines = {} # level -> newline plus indentation
+
+    def newline(depth):
+        try:
+            return newlines[depth]
+        except KeyError:
+            text = newlines[depth] = '' if indent is None else '\n' + ' ' * (indent * depth)
+            return text
+
+    item_separator = ', ' if indent is None else ','
+
+    def open_body(value, kind, depth, stack):
+        """Pushes the body of a map/list at `depth` (its children one level deeper) in reverse order."""
+        opener, closer = ('{', '}') if kind == 'M' else ('[', ']')
+        if not value:
+            stack.append(opener + closer)
+            return
+        child_newline = newline(depth + 1)
+        stack.append(newline(depth) + closer)
+        entries = list(value.items()) if kind == 'M' else list(enumerate(value))
+        for position in range(len(entries) - 1, -1, -1):
+            key, child = entries[position]
+            stack.append((child, depth + 1))
+            prefix = item_separator + child_newline if position else opener + child_newline
+            if kind == 'M':
+                if key.__class__ is not str:
+                    raise TypeError(f"DynamoDB map keys must be strings, got {key!r}.")
+                prefix += encode_basestring_ascii(key) + ': '
+            stack.append(prefix)
+
+    stack = []
+    open_body(item, 'M', level, stack)
+    while stack:
+        entry = stack.pop()
+        if entry.__class__ is str:
+            write(entry)
+            continue
+        value, depth = entry
+        kind = _kind_of(value)
+        inner = newline(depth + 1)
+        if kind == 'M' or kind == 'L':
+            write('{' + inner + '"' + kind + '": ')
+            stack.append(newline(depth) + '}')
+            open_body(value, kind, depth + 1, stack)
+            continue
+        tag, payload = _scalar_json(value, kind, empty_string_as_null)
+        if payload.__class__ is list:
+            # String/number/binary sets render as a JSON array of strings
+            members = [encode_basestring_ascii(str(member)) for member in payload]
+            payload = '[' + newline(depth + 2) + (item_separator + newline(depth + 2)).join(members) + inner + ']'
+        write('{' + inner + '"' + tag + '": ' + payload + newline(depth) + '}')
+
+def dumps_item(item, indent=None, level=0, empty_string_as_null=False):
+    """
+    Returns the DynamoDB JSON text of a Python dict, identical to json.dumps(serialize_item(item), indent=indent).
+    `level` indents the text as if it were nested that many levels deep (e.g. 1 for an element of a JSON array).
+    """
+    if indent is None:
+        # Compact text goes through json's C encoder, which beats walking the item in Python;
+        # only items nested deeper than the recursion limit fall back to the iterative writer
+        try:
+            return json.dumps(serialize_item(item, empty_string_as_null), default=_binary_json)
+        except RecursionError:
+            pass
+    parts = []
+    _emit_item(item, parts.append, indent, level, empty_string_as_null)
+    return ''.join(parts)
+
+def dump_item(item, stream, indent=None, level=0, empty_string_as_null=False):
+    """
+    Like dumps_item, but writes indented text straight to `stream` in bounded pieces instead of returning it.
+    Compact text (indent=None) is encoded in one piece by json's C encoder unless the item is too deeply nested for it.
+    """
+    if indent is None:
+        try:
+            stream.write(json.dumps(serialize_item(item, empty_string_as_null), default=_binary_json))
+            return
+        except RecursionError:
+            pass
+    parts = []
+
+    def write(text):
+        parts.append(text)
+        if len(parts) >= _STREAM_FLUSH_PARTS:
+            stream.write(''.join(parts))
+            parts.clear()
+
+    _emit_item(item, write, indent, level, empty_string_as_null)
+    stream.write(''.join(parts))
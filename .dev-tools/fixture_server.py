@@ -0,0 +1,111 @@
+# File: .dev-tools/fixture_server.py
+# Serves saved catalog pages over local HTTP so reqs_creator can run (and be benchmarked) without the live site.
+# Pages carry an ETag and Last-Modified, so conditional requests get 304s exactly as from a real server.
+
+import argparse
+import csv
+import hashlib
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PAGE_EXTENSIONS = ('.html', '.htm')
+
+class FixtureServer(ThreadingHTTPServer):
+    """HTTP server for one directory of pages, with an optional per-request latency and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, directory, port=0, latency=0.0, host='127.0.0.1'):
+        self.directory = os.path.abspath(directory)
+        self.latency = latency
+        self.counts = {200: 0, 304: 0, 404: 0}
+        self.counts_lock = threading.Lock()
+        super().__init__((host, port), FixtureRequestHandler)
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_names(self):
+        return sorted(name for name in os.listdir(self.directory) if name.lower().endswith(PAGE_EXTENSIONS))
+
+    def count(self, status):
+        with self.counts_lock:
+            self.counts[status] = self.counts.get(status, 0) + 1
+
+    def start(self):
+        """Serves in a background thread; returns the server for chaining."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        name = os.path.basename(self.path.split('?', 1)[0])
+        path = os.path.join(server.directory, name)
+        if not name or not os.path.isfile(path):
+            server.count(404)
+            self.send_error(404)
+            return
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        last_modified = formatdate(os.path.getmtime(path), usegmt=True)
+        if self.headers.get('If-None-Match') == etag:
+            server.count(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        server.count(200)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark and test output clean
+
+def write_manifest(server, manifest_path):
+    """Writes a reqs_creator --manifest CSV with one row per page; the major code is the file name without extension."""
+    with open(manifest_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['major_code', 'url'])
+        for name in server.page_names():
+            writer.writerow([os.path.splitext(name)[0], f"{server.base_url}/{name}"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve saved catalog pages locally for offline reqs_creator runs.')
+    parser.add_argument('directory', help='Directory of saved .html pages.')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (0 picks a free one).')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to delay every response.')
+    parser.add_argument('--manifest', default=None, help='Also write a --manifest CSV listing every page.')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: '{args.directory}' is not a directory.")
+        sys.exit(1)
+
+    server = FixtureServer(args.directory, args.port, args.latency)
+    if args.manifest:
+        write_manifest(server, args.manifest)
+        print(f"Wrote manifest for {len(server.page_names())} page(s) to {args.manifest}")
+    print(f"Serving {server.directory} at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
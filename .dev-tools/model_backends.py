@@ -0,0 +1,183 @@
+# File: .dev-tools/model_backends.py
+# Model backends for reqs_creator. A backend has a `name`, `count_tokens(text)` returning an int and
+# `generate_content(prompt, major_code=None)` returning a response with `.text` and `.usage_metadata`
+# (total_token_count / prompt_token_count), like google.generativeai's GenerateContentResponse.
+
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+
+class BackendConfigError(Exception):
+    """Raised when a backend cannot be created (missing API key, unreadable replay file, ...)."""
+
+class ModelRateLimitError(Exception):
+    """A 429 / quota-exhausted answer from the model service (Gemini's ResourceExhausted, or ReplayBackend's injected errors)."""
+
+class UsageMetadata:
+    def __init__(self, total_token_count, prompt_token_count=None):
+        self.total_token_count = total_token_count
+        self.prompt_token_count = prompt_token_count
+
+class ModelResponse:
+    """Minimal stand-in for a GenerateContentResponse."""
+
+    def __init__(self, text, total_token_count, prompt_token_count=None):
+        self.text = text
+        self.usage_metadata = UsageMetadata(total_token_count, prompt_token_count)
+        self.prompt_feedback = None
+        self.candidates = []
+
+def prompt_key(prompt):
+    """Key recorded responses are stored under: the SHA-256 of the exact prompt."""
+    return hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+
+# --- Google Generative AI ---
+
+class GeminiBackend:
+    """Calls the Google Generative AI API. The SDK is imported and configured here, not at module import."""
+
+    def __init__(self, model_name, api_key, generation_config=None, safety_settings=None):
+        if not api_key:
+            raise BackendConfigError("API_KEY not found in environment variables or .env file.")
+        if not model_name:
+            raise BackendConfigError("DEGREE_REQS_SCRAPER_MODEL is not set.")
+        import google.generativeai as genai
+        from google.api_core.exceptions import ResourceExhausted
+        genai.configure(api_key=api_key)
+        self._resource_exhausted = ResourceExhausted
+        self.name = model_name
+        self._model = genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            safety_settings=safety_settings
+        )
+
+    def count_tokens(self, text):
+        return self._model.count_tokens(text).total_tokens
+
+    def generate_content(self, prompt, major_code=None):
+        try:
+            return self._model.generate_content(prompt)
+        except self._resource_exhausted as e:
+            raise ModelRateLimitError(str(e)) from e
+
+# --- Recording and Replay ---
+
+class RecordingBackend:
+    """Wraps another backend and appends every successful response to a JSON Lines file ReplayBackend can load."""
+
+    def __init__(self, backend, record_path):
+        self.backend = backend
+        self.name = backend.name
+        self.record_path = record_path
+        self._lock = threading.Lock()
+
+    def count_tokens(self, text):
+        return self.backend.count_tokens(text)
+
+    def generate_content(self, prompt, major_code=None):
+        response = self.backend.generate_content(prompt, major_code)
+        usage = getattr(response, 'usage_metadata', None)
+        entry = {
+            "prompt_sha256": prompt_key(prompt),
+            "major_code": major_code,
+            "text": response.text,
+            "total_token_count": getattr(usage, 'total_token_count', None),
+            "prompt_token_count": getattr(usage, 'prompt_token_count', None),
+        }
+        with self._lock:
+            with open(self.record_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return response
+
+class ReplayBackend:
+    """
+    Local stand-in model that answers from recorded responses (see RecordingBackend), for offline runs
+    and benchmarks. A prompt is matched by its hash first, then by major code; unmatched prompts get
+    `default_text`. Latency, random 429 errors and a server-side RPM/TPM limit (answered with 429s,
+    like the real service) can be injected. Counters of calls, errors and concurrency are kept.
+    """
+
+    def __init__(self, recordings=None, latency=0.0, jitter=0.0, error_rate=0.0, server_rpm=None, server_tpm=None,
+                 default_text='[]', seed=None, name='replay'):
+        self.name = name
+        self.by_prompt = {}
+        self.by_major = {}
+        for entry in recordings or []:
+            if entry.get("prompt_sha256"):
+                self.by_prompt[entry["prompt_sha256"]] = entry
+            if entry.get("major_code"):
+                self.by_major.setdefault(entry["major_code"], entry)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.server_rpm = server_rpm
+        self.server_tpm = server_tpm
+        self.default_text = default_text
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque() # (timestamp, tokens) of accepted requests in the last 60 seconds
+        self._window_tokens = 0
+        self.stats = {'generate': 0, 'count_tokens': 0, 'rate_limited': 0, 'replayed': 0, 'defaulted': 0,
+                      'active': 0, 'max_active': 0}
+
+    @classmethod
+    def from_file(cls, path, **options):
+        """Loads a JSON Lines recording; blank and malformed lines are skipped."""
+        recordings = []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        recordings.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError as e:
+            raise BackendConfigError(f"Could not read replay file '{path}': {e}")
+        options.setdefault('name', f"replay:{os.path.basename(path)}")
+        return cls(recordings, **options)
+
+    def count_tokens(self, text):
+        with self._lock:
+            self.stats['count_tokens'] += 1
+        return len(text) // 4
+
+    def _admit(self, tokens, now):
+        """Applies the injected error rate and server-side limits; returns False for a 429."""
+        while self._window and now - self._window[0][0] > 60:
+            self._window_tokens -= self._window.popleft()[1]
+        if self._random.random() < self.error_rate:
+            return False
+        if self.server_rpm is not None and len(self._window) >= self.server_rpm:
+            return False
+        if self.server_tpm is not None and self._window_tokens + tokens > self.server_tpm:
+            return False
+        self._window.append((now, tokens))
+        self._window_tokens += tokens
+        return True
+
+    def generate_content(self, prompt, major_code=None):
+        entry = self.by_prompt.get(prompt_key(prompt)) or self.by_major.get(major_code)
+        text = entry["text"] if entry else self.default_text
+        prompt_tokens = (entry or {}).get("prompt_token_count") or len(prompt) // 4
+        total_tokens = (entry or {}).get("total_token_count") or prompt_tokens + len(text) // 4
+
+        with self._lock:
+            self.stats['generate'] += 1
+            if not self._admit(total_tokens, time.time()):
+                self.stats['rate_limited'] += 1
+                raise ModelRateLimitError("429 Resource has been exhausted (e.g. check quota).")
+            self.stats['replayed' if entry else 'defaulted'] += 1
+            self.stats['active'] += 1
+            self.stats['max_active'] = max(self.stats['max_active'], self.stats['active'])
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self.stats['active'] -= 1
+        return ModelResponse(text, total_tokens, prompt_tokens)
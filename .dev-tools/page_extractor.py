@@ -0,0 +1,228 @@
+# File: .dev-tools/page_extractor.py
+# Turns catalog page HTML into the plain text blocks sent to the LLM.
+# Uses lxml directly when it is installed (an order of magnitude faster to parse) and BeautifulSoup otherwise.
+# Both are imported on the first parse, not when this module is loaded.
+
+import re
+from importlib.util import find_spec
+
+HTML_PARSER = 'lxml' if find_spec('lxml') else 'html.parser'
+
+# Elements dropped before extraction: scripts, navigation, page chrome and elements often used for ads/sidebars
+REMOVED_TAGS = ["script", "style", "nav", "header", "footer", "aside", "form", "button", "iframe", "img", "svg", "link", "meta"]
+
+# Elements that start a new text block; everything else (a, span, strong, td, ...) continues the current one
+BLOCK_TAGS = frozenset([
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'div', 'section', 'table', 'tr', 'caption',
+    'ul', 'ol', 'dl', 'dt', 'dd', 'blockquote', 'pre', 'article', 'main', 'br', 'hr',
+])
+
+# Headings are emitted as markdown-style "## Title" blocks so the text keeps its section structure
+HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+HEADING_PATTERN = re.compile(r'^(#{1,6}) ')
+
+# Main content candidates in priority order (common tags/IDs/classes); class tests match one class token
+_MAIN_CONTENT_XPATHS = [
+    '//main',
+    '//article',
+    '//*[@id="content"]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " content ")]',
+    '//*[@id="main"]',
+    '//*[contains(concat(" ", normalize-space(@class), " "), " main ")]',
+    '//*[@role="main"]',
+]
+
+def parse_html(content, parser=None):
+    """
+    Parses page bytes/text and drops REMOVED_TAGS. Returns an lxml root element, or a BeautifulSoup
+    document when lxml is unavailable (or `parser` names a BeautifulSoup parser).
+    """
+    parser = parser or HTML_PARSER
+    if parser == 'lxml' and HTML_PARSER == 'lxml':
+        import lxml.html
+        from lxml import etree
+        root = lxml.html.document_fromstring(content)
+        etree.strip_elements(root, *REMOVED_TAGS, with_tail=False)
+        return root
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, parser)
+    for element in soup(REMOVED_TAGS):
+        element.decompose()
+    return soup
+
+def _is_soup(node):
+    return hasattr(node, 'find_all')
+
+def find_main_content(document):
+    """
+    Returns (element, found): the page's main content area and True, or the <body> (possibly None)
+    and False when no specific main content area exists.
+    """
+    if _is_soup(document):
+        main_content = (
+            document.find('main') or
+            document.find('article') or
+            document.find(id='content') or
+            document.find(class_='content') or
+            document.find(id='main') or
+            document.find(class_='main') or
+            document.find(role='main')
+        )
+        return (main_content, True) if main_content else (document.body, False)
+    for xpath in _MAIN_CONTENT_XPATHS:
+        matches = document.xpath(xpath)
+        if matches:
+            return matches[0], True
+    return document.find('body'), False
+
+def _join_block(pieces, tag=None):
+    block = ' '.join(pieces).replace('\xa0', ' ')
+    level = HEADING_LEVELS.get(tag)
+    return f"{'#' * level} {block}" if level else block
+
+def _iter_soup_blocks(element):
+    from bs4 import CData, NavigableString
+    pieces = []
+    stack = [element]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is str: # Marker pushed after a block element's children: the block ends here
+            if pieces:
+                yield _join_block(pieces, node)
+                pieces = []
+            continue
+        if isinstance(node, NavigableString):
+            if type(node) in (NavigableString, CData): # Skip comments, doctypes, processing instructions
+                text = node.strip()
+                if text:
+                    pieces.append(text)
+            continue
+        if node.name in BLOCK_TAGS:
+            if pieces:
+                yield _join_block(pieces)
+                pieces = []
+            stack.append(node.name)
+        stack.extend(reversed(node.contents))
+    if pieces:
+        yield _join_block(pieces)
+
+def _iter_lxml_blocks(element):
+    pieces = []
+    stack = [(element, False)]
+    while stack:
+        node, closing = stack.pop()
+        is_element = isinstance(node.tag, str) # Comments and processing instructions have callable tags
+        if not closing:
+            if is_element:
+                if node.tag in BLOCK_TAGS and pieces:
+                    yield _join_block(pieces)
+                    pieces = []
+                text = node.text and node.text.strip()
+                if text:
+                    pieces.append(text)
+            stack.append((node, True))
+            if is_element:
+                stack.extend((child, False) for child in reversed(node))
+            continue
+        if is_element and node.tag in BLOCK_TAGS and pieces:
+            yield _join_block(pieces, node.tag)
+            pieces = []
+        if node is not element: # The root's tail lies outside the extracted subtree
+            tail = node.tail and node.tail.strip()
+            if tail:
+                pieces.append(tail)
+    if pieces:
+        yield _join_block(pieces)
+
+def iter_text_blocks(element):
+    """
+    Walks the element's subtree once and yields each block of text exactly once. A block is the inline text
+    between two block-level boundaries, so nested divs no longer repeat their children's text.
+    """
+    return _iter_soup_blocks(element) if _is_soup(element) else _iter_lxml_blocks(element)
+
+def extract_text(element):
+    """Joins the element's text blocks with blank lines and normalizes whitespace."""
+    text_content = '\n\n'.join(iter_text_blocks(element)) # Join blocks with double newlines
+
+    # Further cleanup: remove excessive whitespace within lines and multiple blank lines
+    text_content = re.sub(r'[ \t]+', ' ', text_content) # Replace multiple spaces/tabs with single space
+    text_content = re.sub(r'(\n\s*){3,}', '\n\n', text_content) # Replace 3+ newlines (with optional spaces) with double newline
+    return text_content.strip()
+
+# --- Section Chunking ---
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), used only to size chunks."""
+    return len(text) // 4
+
+def _split_oversized(text, max_tokens, count_tokens):
+    """Splits a block with no usable section boundaries on lines, then on characters."""
+    pieces, current = [], ''
+    for line in text.split('\n'):
+        candidate = f"{current}\n{line}" if current else line
+        if count_tokens(candidate) <= max_tokens:
+            current = candidate
+            continue
+        if current:
+            pieces.append(current)
+        while line and count_tokens(line) > max_tokens:
+            cut = max(1, len(line) * max_tokens // max(1, count_tokens(line)))
+            pieces.append(line[:cut])
+            line = line[cut:]
+        current = line
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_text_sections(text, max_tokens, count_tokens=estimate_tokens):
+    """
+    Splits extracted page text into chunks of at most `max_tokens`, cutting only at heading blocks when it
+    can. Whole sections are packed together greedily; a section too large on its own is split between its
+    blocks, and each piece repeats the section's heading so the model knows which requirement it belongs to.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+
+    sections = [] # Lists of blocks, each starting at a heading (the first may have none)
+    for block in text.split('\n\n'):
+        if HEADING_PATTERN.match(block) or not sections:
+            sections.append([block])
+        else:
+            sections[-1].append(block)
+
+    chunks, current = [], ''
+    def emit(piece):
+        nonlocal current
+        candidate = f"{current}\n\n{piece}" if current else piece
+        if count_tokens(candidate) <= max_tokens:
+            current = candidate
+            return
+        if current:
+            chunks.append(current)
+        current = piece
+
+    for blocks in sections:
+        section_text = '\n\n'.join(blocks)
+        if count_tokens(section_text) <= max_tokens:
+            emit(section_text)
+            continue
+        heading = blocks[0] if HEADING_PATTERN.match(blocks[0]) else None
+        if heading and count_tokens(heading) + 1 > max_tokens // 2:
+            heading = None # Too long to repeat in every piece; it is split like any other block instead
+        body_budget = max(1, max_tokens - (count_tokens(heading) + 1 if heading else 0))
+        piece = ''
+        for block in (blocks[1:] if heading else blocks):
+            for part in ([block] if count_tokens(block) <= body_budget else _split_oversized(block, body_budget, count_tokens)):
+                candidate = f"{piece}\n\n{part}" if piece else part
+                if count_tokens(candidate) <= body_budget:
+                    piece = candidate
+                    continue
+                if piece:
+                    emit(f"{heading}\n\n{piece}" if heading else piece)
+                piece = part
+        if piece:
+            emit(f"{heading}\n\n{piece}" if heading else piece)
+    if current:
+        chunks.append(current)
+    return chunks
@@ -1,9 +1,10 @@
 import csv
-import re
+import hashlib
 import json
-import requests
-from bs4 import BeautifulSoup
-import google.generativeai as genai
+import math
+from page_extractor import extract_text, find_main_content, parse_html, split_text_sections
+from model_backends import BackendConfigError, GeminiBackend, ModelRateLimitError, RecordingBackend, ReplayBackend
+from results_store import append_jsonl, atomic_write, export_json, is_jsonl_path, write_json_array, write_jsonl
 import time
 # Assuming get_env.py exists to read .env files
 # If not, replace get_env_value with os.getenv and ensure dotenv is installed and loaded
@@ -17,11 +18,15 @@ except ImportError:
     def get_env_value(key_name):
         return os.getenv(key_name)
 
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlparse
 from collections import deque
 import argparse
+import queue
+import random
+import sqlite3
 import sys
 import os # Added for file operations
+import threading
 
 # --- Configuration ---
 # Set the target URL, output file, and major code directly here
@@ -33,9 +38,7 @@ MAJOR_CODE = "Computer_Science_BS" # <<< SET THE MAJOR CODE HERE
 # --- API Key Configuration ---
 # To get a key, visit https://makersuite.google.com/app/apikey
 API_KEY = get_env_value("API_KEY") # IMPORTANT: REPLACE WITH YOUR ACTUAL API KEY or load from .env
-if not API_KEY:
-    print("Error: API_KEY not found in environment variables or .env file.")
-    sys.exit(1)
+# Checked when the Gemini backend is created, so offline (--backend replay) runs and imports need no key
 
 # --- Rate Limiting Configuration ---
 # Set your API limits here. They can be pulled from .env or defaulted.
@@ -43,11 +46,41 @@ RPM_LIMIT = int(get_env_value("RPM_LIMIT") or 60) # Peak requests per minute (RP
 TPM_LIMIT = int(get_env_value("TPM_LIMIT") or 1000000) # Peak input tokens per minute (TPM)
 RPD_LIMIT = int(get_env_value("RPD_LIMIT") or 1500) # Peak requests per day (RPD)
 
+# Request log shared by every reqs_creator process on this machine (see SharedThrottler)
+THROTTLE_DB_FILE = get_env_value("THROTTLE_DB") or os.path.join(os.path.dirname(os.path.abspath(__file__)), '.throttle_state.sqlite3')
+SHARED_THROTTLE_POLL = 1.0 # Max seconds between re-checks while throttled; other processes may free capacity sooner
+
+# A 429 from the model service is retried after a jittered exponential backoff, through the throttler again
+RATE_LIMIT_RETRIES = int(get_env_value("RATE_LIMIT_RETRIES") or 5) # Retries per request before it counts as failed
+RATE_LIMIT_BACKOFF = 2.0 # Seconds before the first retry; doubled for every further one
+RATE_LIMIT_MAX_BACKOFF = 60.0 # Upper bound of a single backoff
+
+# Local token estimation (see TokenEstimator); the remote count_tokens call is only made near the TPM limit
+ESTIMATOR_MIN_SAMPLES = 3 # Calibrated requests needed before the observed error bound is trusted
+ESTIMATOR_DEFAULT_ERROR = 0.5 # Assumed relative error until then
+
 # Delay between fetching pages from the target website
 WEBSITE_SCRAPE_DELAY = float(get_env_value("WEBSITE_SCRAPE_DELAY") or 1.0)  # Seconds to wait between website page fetches
 
+# Batch (--manifest) pipeline defaults
+DEFAULT_FETCH_WORKERS = 4 # Concurrent page fetches (still spaced per host by WEBSITE_SCRAPE_DELAY)
+DEFAULT_LLM_WORKERS = 1 # Concurrent LLM calls
+
+# Pages whose text exceeds this many tokens are split at section headings and extracted chunk by chunk
+CHUNK_TOKENS = int(get_env_value("CHUNK_TOKENS") or 30000)
+CHUNK_WORKERS = int(get_env_value("CHUNK_WORKERS") or 4) # Concurrent LLM calls for the chunks of one page
+
+# On-disk cache of LLM extraction results (see LLMResultCache)
+LLM_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.llm_cache')
+LLM_CACHE_MAX_AGE_DAYS = float(get_env_value("LLM_CACHE_MAX_AGE_DAYS") or 30) # Entries older than this are evicted
+LLM_CACHE_MAX_MB = float(get_env_value("LLM_CACHE_MAX_MB") or 200) # Least recently used entries are evicted above this size
+
+# On-disk cache of fetched catalog pages, revalidated with ETag/Last-Modified (see HttpPageCache)
+HTTP_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache')
+REQUEST_HEADERS = {'User-Agent': 'DegreePlanConverterBot/1.0 (https://your-contact-info-or-website.com)'} # Be polite & identifiable
+
 # Configure the Generative AI client
-genai.configure(api_key=API_KEY)
+MODEL_NAME = get_env_value("DEGREE_REQS_SCRAPER_MODEL")
 generation_config = {
     "temperature": 0.1, # Lower temperature for more deterministic, structured output
     "top_p": 1,
@@ -62,163 +95,573 @@ safety_settings = [
     {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
     {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
 ]
-# Select the appropriate model
-model = genai.GenerativeModel(
-    model_name=get_env_value("DEGREE_REQS_SCRAPER_MODEL"), # Using Flash for potentially faster/cheaper processing
-    generation_config=generation_config,
-    safety_settings=safety_settings
-)
+# Model backend (see model_backends.py), created from the command line: the Gemini API or a local replay model
+model = None
+
+
+# --- Extraction Prompt (Updated based on user examples) ---
+# Filled in with str.format(major_code=..., text_content=...); literal braces are doubled
+EXTRACTION_PROMPT_TEMPLATE = """
+    Analyze the following text describing university degree requirements for the major "{major_code}".
+    Extract all distinct requirement sections (like 'Core Courses', 'General Education', 'Electives', 'Business Minor', etc.).
+    Format the output as a JSON array, where each object represents one requirement rule according to the specified schema.
+
+    Schema for each rule object:
+    {{
+      "MajorCode": "{major_code}", /* REQUIRED: Use the provided major code */
+      "RequirementType": "string", /* REQUIRED: e.g., "CORE", "GENERAL_EDUCATION", "ELECTIVES", "BUSINESS_MINOR". Use descriptive UPPER_SNAKE_CASE. */
+      "Courses": [ /* Optional: Include ONLY if specific courses are listed. Array of objects: {{"Subject": "string", "CourseNumber": integer}}. Parse subject codes (e.g., "CS", "MATH") and course numbers accurately. Do NOT include credits here unless specified per course in the source text. */ ],
+      "MinCredits": integer, /* Optional: Include ONLY for elective-like rules specifying a minimum credit total needed FROM a group/list. */
+      "AllowedSubjects": ["string"], /* Optional: Include ONLY for elective-like rules listing allowed subjects/departments. Use subject codes. */
+      "Restrictions": ["string"], /* Optional: Include ONLY for elective-like rules specifying restrictions (e.g., "Must be 3000+ level", "Excludes internships"). List each restriction as a separate string. */
+      "TotalCreditsRequired": integer /* Optional: Include ONLY if the rule block explicitly states a total credit number FOR THAT SPECIFIC SECTION (e.g., "General Education: 44 Credits"). Do not confuse with overall degree credits or MinCredits for electives. */
+    }}
+
+    Processing Instructions:
+    1.  **Major Code:** Always set "MajorCode" to "{major_code}".
+    2.  **Requirement Type:** Identify logical sections (Core, Gen Ed, Electives, Minor, Concentration, etc.) and assign a concise `UPPER_SNAKE_CASE` "RequirementType".
+    3.  **Courses Array:**
+        * If a section lists specific courses (e.g., "MATH 101", "ENGL 102"), populate the "Courses" array.
+        * Each course object MUST contain "Subject" (string, e.g., "MATH") and "CourseNumber" (integer, e.g., 101). Convert course numbers like '1103' to the integer 1103.
+        * If the text explicitly states credits *for an individual course* within that list (rare), you can add a `"Credits": integer` field to that specific course object inside the "Courses" array.
+        * Do *not* include the "Courses" key if the section describes electives by rules (use MinCredits, AllowedSubjects, Restrictions instead) or only gives a total credit number.
+    4.  **Elective Rules (MinCredits, AllowedSubjects, Restrictions):**
+        * Use "MinCredits" when the text says "choose X credits from..." or similar. Convert credit numbers to integers.
+        * Use "AllowedSubjects" when allowed departments or subject codes are listed (e.g., "from CIS, MATH, or STAT"). Extract only the subject codes.
+        * Use "Restrictions" for conditions like level requirements ("3000+ level"), exclusions, course attributes, etc. List each distinct restriction as a separate string in the array.
+    5.  **TotalCreditsRequired:** Use this *only* when a specific section explicitly totals its own credit requirement (e.g., "General Education: 44 Credits"). Convert the number to an integer. Do not use it for the overall degree total or for elective minimums.
+    6.  **Parsing:** Extract Subject codes (usually 2-4 uppercase letters) and Course Numbers (usually 3-4 digits) accurately. Ensure CourseNumber, MinCredits, and TotalCreditsRequired are integers.
+    7.  **Exclusions:** Ignore general degree information like total hours for graduation (e.g., "120 hours required"), GPA requirements, university-wide policies, introductory paragraphs, and advisor notes unless they are part of a specific requirement block being parsed.
+    8.  **Output:** Ensure the final output is ONLY a valid JSON array `[...]` containing the rule objects. Do not include any other text, comments, markdown formatting (like ```json), or explanations.
+
+    Degree Requirements Text to Analyze:
+    ---
+    {text_content}
+    ---
+
+    JSON Output:
+    """
 
 
 # --- Throttler Class ---
+class RateLimitExceeded(Exception):
+    """Raised when the daily request limit (RPD) has been used up."""
+
 class Throttler:
-    """Manages API rate limits for RPM, TPM, and RPD."""
+    """
+    Thread-safe limiter for RPM, TPM, and RPD shared by every LLM worker.
+    Each admitted request is logged immediately with its estimated tokens (a reservation), so concurrent
+    workers never overshoot a limit, and is corrected with the real token usage once the response arrives.
+    Windows are kept as deques pruned from the left plus a running token total, so admission checks are
+    amortized O(1) instead of rescanning the whole day's log.
+    """
 
     def __init__(self, rpm_limit, tpm_limit, rpd_limit):
         self.rpm_limit = rpm_limit
         self.tpm_limit = tpm_limit
         self.rpd_limit = rpd_limit
 
-        # Use deques for efficient pop/append from both ends
         # Tracks timestamps of all requests in the last 24 hours
         self.request_timestamps = deque()
-        # Tracks (timestamp, token_count) of requests in the last 60 seconds
+        # Tracks timestamps of requests in the last 60 seconds (never longer than rpm_limit)
+        self.minute_timestamps = deque()
+        # Tracks [timestamp, token_count, in_window] reservations of the last 60 seconds
         self.token_log = deque()
+        self.tokens_in_window = 0
 
         self.day_window = 86400  # 24 hours in seconds
         self.minute_window = 60    # 60 seconds
+        self._condition = threading.Condition()
 
     def _prune_logs(self, current_time):
         """Removes old entries from logs."""
-        # Prune RPD log (timestamps older than 24 hours)
         while self.request_timestamps and (current_time - self.request_timestamps[0] > self.day_window):
             self.request_timestamps.popleft()
-
-        # Prune TPM log (entries older than 60 seconds)
+        while self.minute_timestamps and (current_time - self.minute_timestamps[0] > self.minute_window):
+            self.minute_timestamps.popleft()
         while self.token_log and (current_time - self.token_log[0][0] > self.minute_window):
-            self.token_log.popleft()
+            entry = self.token_log.popleft()
+            self.tokens_in_window -= entry[1]
+            entry[2] = False
+
+    def _wait_time(self, tokens_for_this_request, current_time):
+        """Seconds until a request of this size fits every window (0 if it fits now)."""
+        # --- 1. Check RPD (Hard Limit) ---
+        if len(self.request_timestamps) >= self.rpd_limit:
+            raise RateLimitExceeded(f"Daily Request Limit (RPD) of {self.rpd_limit} reached. Stopping.")
+
+        # --- 2. RPM: the window never holds more than rpm_limit requests, so the oldest one decides ---
+        rpm_wait = 0
+        if len(self.minute_timestamps) >= self.rpm_limit:
+            rpm_wait = self.minute_timestamps[0] + self.minute_window - current_time
+
+        # --- 3. TPM: walk the oldest reservations only while over budget ---
+        tpm_wait = 0
+        needed_to_free = self.tokens_in_window + tokens_for_this_request - self.tpm_limit
+        if needed_to_free > 0 and self.token_log:
+            # A request larger than the whole TPM limit waits for an empty window, then proceeds
+            needed_to_free = min(needed_to_free, self.tokens_in_window)
+            freed_tokens = 0
+            for ts, count, _ in self.token_log:
+                freed_tokens += count
+                if freed_tokens >= needed_to_free:
+                    tpm_wait = ts + self.minute_window - current_time
+                    break
+
+        return max(rpm_wait, tpm_wait)
+
+    def tokens_available(self):
+        """TPM tokens not yet used or reserved in the current minute window."""
+        with self._condition:
+            self._prune_logs(time.time())
+            return self.tpm_limit - self.tokens_in_window
+
+    def admission_tokens(self, estimated_tokens, error_bound, exact_count):
+        """
+        Tokens to reserve for a request known only by a local estimate. The estimate's upper bound is used
+        while it fits the remaining TPM budget; when it does not (the estimate alone would decide whether the
+        request waits), `exact_count()` is called for the real number instead.
+        """
+        upper_bound = math.ceil(estimated_tokens * (1 + error_bound))
+        if exact_count is None or upper_bound <= self.tokens_available():
+            return upper_bound, False
+        return exact_count(), True
+
+    def acquire(self, tokens_for_this_request):
+        """
+        Blocks until the request fits the RPM/TPM limits, then reserves it and returns the reservation
+        to pass to record_usage. Raises RateLimitExceeded when the daily limit is used up.
+        """
+        with self._condition:
+            while True:
+                current_time = time.time()
+                self._prune_logs(current_time)
+                wait_duration = self._wait_time(tokens_for_this_request, current_time)
+                if wait_duration <= 0:
+                    break
+                wait_duration += 0.01 # Window entries expire strictly after minute_window seconds
+                print(f"      -> Throttling: Waiting {wait_duration:.2f}s to respect RPM/TPM limits.")
+                # Releases the lock while sleeping; record_usage wakes waiters early when it frees tokens
+                self._condition.wait(wait_duration)
+
+            if tokens_for_this_request > self.tpm_limit:
+                print(f"      -> Warning: Single request token count ({tokens_for_this_request}) "
+                      f"exceeds total TPM limit ({self.tpm_limit}). "
+                      "Proceeding, but API may reject.")
+            reservation = [current_time, tokens_for_this_request, True]
+            self.request_timestamps.append(current_time)
+            self.minute_timestamps.append(current_time)
+            self.token_log.append(reservation)
+            self.tokens_in_window += tokens_for_this_request
+            return reservation
+
+    def record_usage(self, reservation, token_count):
+        """Replaces a reservation's estimated tokens with the actual usage (0 for a failed request)."""
+        with self._condition:
+            if reservation[2]:
+                self.tokens_in_window += token_count - reservation[1]
+                reservation[1] = token_count
+            self._condition.notify_all()
+
+class SharedThrottler(Throttler):
+    """
+    Throttler whose request log lives in a SQLite file instead of process memory, so every process on this
+    machine draws from one RPM/TPM/RPD quota and the daily count survives restarts. Each admission is an
+    atomic check-and-insert inside a BEGIN IMMEDIATE transaction.
+    """
 
-    def wait_if_needed(self, tokens_for_this_request):
-        """Checks limits and sleeps if necessary. Loops until safe to proceed."""
+    def __init__(self, rpm_limit, tpm_limit, rpd_limit, db_path):
+        super().__init__(rpm_limit, tpm_limit, rpd_limit)
+        self.db_path = db_path
+        self._local = threading.local() # sqlite3 connections cannot be shared between threads
+        self._connection()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            db_dir = os.path.dirname(self.db_path)
+            if db_dir:
+                os.makedirs(db_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=60, isolation_level=None) # Autocommit; transactions are explicit
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS requests (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL NOT NULL, tokens INTEGER NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS requests_ts ON requests (ts)")
+            self._local.conn = conn
+        return conn
+
+    def _db_wait_time(self, conn, tokens_for_this_request, current_time):
+        """Same rules as Throttler._wait_time, evaluated against the shared log."""
+        requests_today = conn.execute("SELECT COUNT(*) FROM requests WHERE ts > ?", (current_time - self.day_window,)).fetchone()[0]
+        if requests_today >= self.rpd_limit:
+            raise RateLimitExceeded(f"Daily Request Limit (RPD) of {self.rpd_limit} reached. Stopping.")
+
+        minute_start = current_time - self.minute_window
+        requests_this_minute, tokens_this_minute = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(tokens), 0) FROM requests WHERE ts > ?", (minute_start,)).fetchone()
+
+        rpm_wait = 0
+        if requests_this_minute >= self.rpm_limit:
+            # The request that has to expire before one more fits (other processes may use other limits)
+            expiring_ts = conn.execute("SELECT ts FROM requests WHERE ts > ? ORDER BY ts LIMIT 1 OFFSET ?",
+                                       (minute_start, requests_this_minute - self.rpm_limit)).fetchone()[0]
+            rpm_wait = expiring_ts + self.minute_window - current_time
+
+        tpm_wait = 0
+        needed_to_free = min(tokens_this_minute + tokens_for_this_request - self.tpm_limit, tokens_this_minute)
+        if needed_to_free > 0:
+            freed_tokens = 0
+            for ts, count in conn.execute("SELECT ts, tokens FROM requests WHERE ts > ? ORDER BY ts", (minute_start,)):
+                freed_tokens += count
+                if freed_tokens >= needed_to_free:
+                    tpm_wait = ts + self.minute_window - current_time
+                    break
+
+        return max(rpm_wait, tpm_wait)
+
+    def acquire(self, tokens_for_this_request):
+        """Blocks until the request fits the shared limits, then records it; returns the row id as the reservation."""
+        conn = self._connection()
+        announced = False
         while True:
-            current_time = time.time()
-            self._prune_logs(current_time)
-
-            # --- 1. Check RPD (Hard Limit) ---
-            if len(self.request_timestamps) >= self.rpd_limit:
-                raise Exception(f"Daily Request Limit (RPD) of {self.rpd_limit} reached. Stopping.")
-
-            # --- 2. Calculate RPM Wait ---
-            rpm_wait = 0
-            # Get requests in the last minute
-            requests_in_last_minute = [t for t in self.request_timestamps if current_time - t <= self.minute_window]
-            if len(requests_in_last_minute) >= self.rpm_limit:
-                # Find the oldest request *within* the current 60s window that needs to expire
-                # Sort timestamps in ascending order to find the one determining the wait
-                relevant_timestamps = sorted([t for t in self.request_timestamps if current_time - t <= self.minute_window])
-                # We need to wait until the (rpm_limit)-th request from the end falls out of the window
-                if len(relevant_timestamps) >= self.rpm_limit:
-                    oldest_request_to_expire = relevant_timestamps[len(relevant_timestamps) - self.rpm_limit]
-                    rpm_wait = max(0, (self.minute_window - (current_time - oldest_request_to_expire)) + 0.1) # 0.1s buffer, ensure non-negative
-
-            # --- 3. Calculate TPM Wait ---
-            tpm_wait = 0
-            current_tokens_in_window = sum(count for _, count in self.token_log)
-
-            if (current_tokens_in_window + tokens_for_this_request) > self.tpm_limit:
-                needed_to_free = (current_tokens_in_window + tokens_for_this_request) - self.tpm_limit
-                freed_tokens = 0
-                wait_until_time = 0
-                # Iterate through the token log from oldest to newest
-                for ts, count in self.token_log:
-                    freed_tokens += count
-                    wait_until_time = ts + self.minute_window + 0.1 # Time when this entry expires + buffer
-                    if freed_tokens >= needed_to_free:
-                        break # Found enough tokens that will expire
-
-                if wait_until_time > current_time:
-                    tpm_wait = max(0, wait_until_time - current_time) # Ensure non-negative wait
-                elif tokens_for_this_request > self.tpm_limit:
-                    # This single request is too large for the TPM limit
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                current_time = time.time()
+                conn.execute("DELETE FROM requests WHERE ts <= ?", (current_time - self.day_window,))
+                wait_duration = self._db_wait_time(conn, tokens_for_this_request, current_time)
+                reservation = None
+                if wait_duration <= 0:
+                    reservation = conn.execute("INSERT INTO requests (ts, tokens) VALUES (?, ?)",
+                                               (current_time, tokens_for_this_request)).lastrowid
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+            if reservation is not None:
+                if tokens_for_this_request > self.tpm_limit:
                     print(f"      -> Warning: Single request token count ({tokens_for_this_request}) "
                           f"exceeds total TPM limit ({self.tpm_limit}). "
                           "Proceeding, but API may reject.")
-                    # We can't wait based on past requests if the current one is too big
+                return reservation
+            wait_duration += 0.01 # Window entries expire strictly after minute_window seconds
+            if not announced:
+                print(f"      -> Throttling: Waiting up to {wait_duration:.2f}s to respect RPM/TPM limits.")
+                announced = True
+            time.sleep(min(wait_duration, SHARED_THROTTLE_POLL))
+
+    def tokens_available(self):
+        minute_start = time.time() - self.minute_window
+        tokens_this_minute = self._connection().execute(
+            "SELECT COALESCE(SUM(tokens), 0) FROM requests WHERE ts > ?", (minute_start,)).fetchone()[0]
+        return self.tpm_limit - tokens_this_minute
+
+    def record_usage(self, reservation, token_count):
+        self._connection().execute("UPDATE requests SET tokens = ? WHERE id = ?", (token_count, reservation))
+
+    def requests_today(self):
+        """Requests recorded by all processes in the last 24 hours."""
+        return self._connection().execute("SELECT COUNT(*) FROM requests WHERE ts > ?", (time.time() - self.day_window,)).fetchone()[0]
 
-            # --- 4. Decide and Act ---
-            wait_duration = max(rpm_wait, tpm_wait)
+# --- Instantiate Throttler ---
+# In-memory by default on import; the command line switches to the shared SQLite log (see --throttle-db)
+api_throttler = Throttler(RPM_LIMIT, TPM_LIMIT, RPD_LIMIT)
 
-            if wait_duration <= 0:
-                # No wait needed, break the loop and proceed
+# --- Token Estimation ---
+class TokenEstimator:
+    """
+    Estimates a prompt's token usage locally from its length, so requests need no count_tokens round-trip.
+    The tokens-per-character rate is calibrated (exponential moving average) against the
+    usage_metadata.total_token_count of each completed request, and the relative error of recent estimates
+    is kept as the error bound the throttler pads its reservations with.
+    """
+
+    def __init__(self, chars_per_token=4.0, smoothing=0.2, error_window=50):
+        self.tokens_per_char = 1 / chars_per_token
+        self.smoothing = smoothing
+        self.errors = deque(maxlen=error_window) # Relative errors of the most recent estimates
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def estimate(self, text):
+        return math.ceil(len(text) * self.tokens_per_char)
+
+    def error_bound(self):
+        """Worst relative error over recent requests (ESTIMATOR_DEFAULT_ERROR until enough are calibrated)."""
+        with self._lock:
+            if self.samples < ESTIMATOR_MIN_SAMPLES:
+                return max(ESTIMATOR_DEFAULT_ERROR, max(self.errors, default=0))
+            return max(self.errors)
+
+    def observe(self, text, actual_tokens):
+        """Calibrates against the real usage of a request whose prompt was `text`."""
+        if not text or not actual_tokens:
+            return
+        with self._lock:
+            # The error is measured before the update, so the bound reflects estimates made in advance
+            self.errors.append(abs(actual_tokens - self.estimate(text)) / actual_tokens)
+            observed_rate = actual_tokens / len(text)
+            if self.samples == 0:
+                self.tokens_per_char = observed_rate
+            else:
+                self.tokens_per_char += self.smoothing * (observed_rate - self.tokens_per_char)
+            self.samples += 1
+
+    def summary(self):
+        return (f"Token estimator: {self.samples} calibration sample(s), {1 / self.tokens_per_char:.2f} chars/token, "
+                f"error bound {self.error_bound():.1%}")
+
+token_estimator = TokenEstimator()
+
+# --- Rate Limit Retries ---
+class RateLimitRetries:
+    """Counts 429 answers from the model service that were retried, and requests that ran out of retries."""
+
+    def __init__(self):
+        self.retried = 0
+        self.gave_up = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number `attempt` (0-based): full jitter over a capped exponential."""
+        with self._lock:
+            self.retried += 1
+        return random.uniform(0, min(RATE_LIMIT_MAX_BACKOFF, RATE_LIMIT_BACKOFF * 2 ** attempt))
+
+    def record_gave_up(self):
+        with self._lock:
+            self.gave_up += 1
+
+    def summary(self):
+        return f"Rate-limit (429) retries: {self.retried}, requests that ran out of retries: {self.gave_up}"
+
+rate_limit_retries = RateLimitRetries()
+
+# --- LLM Result Cache ---
+class LLMResultCache:
+    """
+    Content-addressed on-disk cache of parsed LLM extraction results, one JSON file per key.
+    The key hashes everything that determines the model's answer (model, generation/safety config, prompt
+    template, major code and cleaned page text), so an unchanged page never costs an API call twice.
+    Entries expire after `max_age_days`; above `max_bytes` the least recently used entries are evicted.
+    """
+
+    def __init__(self, cache_dir, max_age_days=LLM_CACHE_MAX_AGE_DAYS, max_bytes=LLM_CACHE_MAX_MB * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 86400
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(major_code, text_content):
+        fingerprint = json.dumps({
+            "model": MODEL_NAME,
+            "generation_config": generation_config,
+            "safety_settings": safety_settings,
+            "prompt_template": EXTRACTION_PROMPT_TEMPLATE,
+            "major_code": major_code,
+            "text": text_content,
+        }, sort_keys=True)
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Returns the cached entry ({'rules': [...], 'usage': {...}, ...}) or None."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path) # Mark as recently used for eviction
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key, major_code, rules, usage):
+        """Stores one result atomically (temp file + rename), so readers never see a partial entry."""
+        entry = {"major_code": major_code, "model": MODEL_NAME, "created_at": time.time(), "rules": rules, "usage": usage}
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"     -> Warning: Could not write LLM cache entry: {e}")
+
+    def prune(self):
+        """Evicts expired entries, then the least recently used ones until the cache fits max_bytes."""
+        now = time.time()
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if not entry.name.endswith('.json'):
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.max_age:
+                os.remove(entry.path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
                 break
+            os.remove(path)
+            total_bytes -= size
 
-            print(f"      -> Throttling: Waiting {wait_duration:.2f}s to respect RPM/TPM limits.")
-            time.sleep(wait_duration)
-            # Loop will repeat to re-check conditions after sleeping
+    def summary(self):
+        return f"LLM cache: {self.hits} hit(s), {self.misses} miss(es) ({self.cache_dir})"
 
-    def log_request(self, token_count):
-        """Logs a new request timestamp and token count."""
-        current_time = time.time()
-        self.request_timestamps.append(current_time)
-        self.token_log.append((current_time, token_count))
-# --- Instantiate Throttler ---
-api_throttler = Throttler(RPM_LIMIT, TPM_LIMIT, RPD_LIMIT)
+llm_cache = None # Set from the command line; None disables caching
+
+# --- HTTP Page Cache ---
+class HttpPageCache:
+    """
+    On-disk copy of every fetched page that carries an ETag or Last-Modified header. Later fetches send
+    If-None-Match/If-Modified-Since, and a 304 reply reuses the stored body instead of downloading it again;
+    unchanged text then also hits the LLM result cache, so the page costs no model call either.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.revalidated = 0 # 304 Not Modified
+        self.downloaded = 0 # 200 with a body
+        self.downloaded_bytes = 0
+        self.lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def lookup(self, url):
+        """Returns the stored metadata plus 'content' (bytes), or None when the URL is not cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                meta['content'] = f.read()
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('url') == url else None
+
+    def conditional_headers(self, cached):
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    def store(self, url, response):
+        """Saves a 200 response if the server gave a validator to revalidate it with later."""
+        with self.lock:
+            self.downloaded += 1
+            self.downloaded_bytes += len(response.content)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_type": response.headers.get('content-type', ''),
+            "fetched_at": time.time(),
+        }
+        meta_path, body_path = self._paths(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Body first, metadata last: a lookup only trusts a body once its metadata exists
+            with open(body_path + suffix, 'wb') as f:
+                f.write(response.content)
+            os.replace(body_path + suffix, body_path)
+            with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(meta_path + suffix, meta_path)
+        except OSError as e:
+            print(f"     -> Warning: Could not write HTTP cache entry: {e}")
+
+    def record_revalidated(self):
+        with self.lock:
+            self.revalidated += 1
+
+    def summary(self):
+        return (f"HTTP cache: {self.revalidated} page(s) unchanged (304), {self.downloaded} downloaded "
+                f"({self.downloaded_bytes / 1024:.1f} KB) ({self.cache_dir})")
+
+http_cache = None # Set from the command line; None disables conditional fetches
+_http_state = threading.local() # One pooled requests.Session per thread (Session is not thread-safe)
+
+def get_http_session():
+    """Returns this thread's keep-alive session, so repeated fetches from one host reuse connections."""
+    session = getattr(_http_state, 'session', None)
+    if session is None:
+        import requests # Loaded with the first fetch, not at startup
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        session.headers.update(REQUEST_HEADERS)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _http_state.session = session
+    return session
+
+def fetch_page(url):
+    """
+    Downloads a page through the pooled session, revalidating any cached copy.
+    Returns (content bytes, content type); raises requests exceptions on failure.
+    """
+    cached = http_cache.lookup(url) if http_cache is not None else None
+    headers = http_cache.conditional_headers(cached) if cached else {}
+    response = get_http_session().get(url, headers=headers, timeout=30) # Increased timeout
+    if response.status_code == 304 and cached:
+        http_cache.record_revalidated()
+        print("   Page unchanged since last fetch (304 Not Modified), using cached copy.")
+        return cached['content'], cached.get('content_type', '').lower()
+    response.raise_for_status() # Raise an exception for bad status codes (4xx, 5xx)
+    if http_cache is not None:
+        http_cache.store(url, response)
+    return response.content, response.headers.get('content-type', '').lower()
 
 # --- Helper Functions ---
 
 def get_page_content(url):
     """Fetches and extracts the main textual content from a URL."""
+    import requests
     print(f"   Fetching content from: {url}")
     try:
-        headers = {'User-Agent': 'DegreePlanConverterBot/1.0 (https://your-contact-info-or-website.com)'} # Be polite & identifiable
-        response = requests.get(url, headers=headers, timeout=30) # Increased timeout
-        response.raise_for_status() # Raise an exception for bad status codes (4xx, 5xx)
+        content, content_type = fetch_page(url)
 
         # Basic check for non-HTML content
-        content_type = response.headers.get('content-type', '').lower()
         if 'html' not in content_type:
             print(f"   Warning: Content type is not HTML ({content_type}). Attempting to parse anyway.")
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Basic cleanup: remove script, style, nav, header, footer elements and elements often used for ads/sidebars
-        for element in soup(["script", "style", "nav", "header", "footer", "aside", "form", "button", "iframe", "img", "svg", "link", "meta"]):
-            element.decompose()
+        document = parse_html(content) # Drops scripts, navigation and page chrome
 
         # Try to find the main content area (common tags/IDs/classes) - Be more specific if possible for target sites
-        main_content = (
-            soup.find('main') or
-            soup.find('article') or
-            soup.find(id='content') or
-            soup.find(class_='content') or
-            soup.find(id='main') or
-            soup.find(class_='main') or
-            soup.find(role='main') or # Added role=main
-            soup.body # Fallback to body
-        )
+        main_content, found_main_content = find_main_content(document)
 
-        if not main_content or main_content.name == 'body':
+        if not found_main_content:
              print("     -> Warning: Could not find specific main content area, using entire body content.")
-             main_content = soup.body # Ensure it's assigned if fallbacks failed initially
 
-        if not main_content:
+        if main_content is None:
              print("     -> Error: Could not find body tag.")
              return None
 
-        # Extract text, trying to preserve some structure with paragraph breaks
-        text_blocks = []
-        # Find meaningful block elements
-        for element in main_content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'div', 'section', 'table']):
-            # Get text, replace non-breaking spaces, strip whitespace
-            block_text = element.get_text(separator=' ', strip=True).replace('\xa0', ' ')
-            if block_text:
-                text_blocks.append(block_text)
-
-        text_content = '\n\n'.join(text_blocks) # Join blocks with double newlines
-
-        # Further cleanup: remove excessive whitespace within lines and multiple blank lines
-        text_content = re.sub(r'[ \t]+', ' ', text_content) # Replace multiple spaces/tabs with single space
-        text_content = re.sub(r'(\n\s*){3,}', '\n\n', text_content) # Replace 3+ newlines (with optional spaces) with double newline
+        # Extract text in one pass, one block per paragraph/heading/list item, each emitted exactly once
+        text_content = extract_text(main_content)
 
         if not text_content.strip():
              print("     -> Warning: No significant text content found after cleanup.")
@@ -235,87 +678,150 @@ def get_page_content(url):
         return None
 
 def count_tokens(text):
-    """Estimates the token count for the given text using the GenAI API."""
+    """Counts the tokens of the given text with the GenAI API (a network call; see TokenEstimator for the local estimate)."""
     try:
         # Use the actual API count if possible
-        token_count = model.count_tokens(text).total_tokens
+        token_count = model.count_tokens(text)
         return token_count
     except Exception as e:
         print(f"     -> Warning: Could not get exact token count from API: {e}. Estimating.")
         # Fallback simple estimation: average ~4 chars per token.
-        return len(text) // 4
+        return token_estimator.estimate(text)
+
+def chunk_token_budget():
+    """Tokens of page text per LLM request: CHUNK_TOKENS, but always leaving room for the prompt within one minute's TPM."""
+    prompt_tokens = token_estimator.estimate(EXTRACTION_PROMPT_TEMPLATE)
+    return min(CHUNK_TOKENS, max(1000, api_throttler.tpm_limit - prompt_tokens))
+
+RULE_LIST_FIELDS = ("Courses", "AllowedSubjects", "Restrictions")
+
+def _course_key(course):
+    return (course.get("Subject"), course.get("CourseNumber")) if isinstance(course, dict) else repr(course)
+
+def _merge_list(existing, field, values):
+    """Unions `values` into existing[field]; the field is only created when a source rule has it as a list."""
+    if not isinstance(values, list):
+        return
+    if not isinstance(existing.get(field), list):
+        existing[field] = []
+    target = existing[field]
+    if field == "Courses":
+        seen = {_course_key(course) for course in target}
+        for course in values:
+            if _course_key(course) not in seen:
+                target.append(course)
+                seen.add(_course_key(course))
+        return
+    for value in values:
+        if value not in target:
+            target.append(value)
+
+def merge_rules(rule_lists):
+    """
+    Combines the rules extracted from each chunk of one page. Rules sharing (MajorCode, RequirementType) are
+    merged into the first one seen: course, subject and restriction lists are unioned, and fields the first
+    rule left empty are filled from later ones. A list field is only present on a merged rule when at least
+    one of its source rules had it (the audit treats an empty list differently from a missing one).
+    """
+    merged = {}
+    for rules in rule_lists:
+        for rule in rules:
+            key = (rule.get("MajorCode"), rule.get("RequirementType"))
+            existing = merged.get(key)
+            if existing is None:
+                existing = merged[key] = {field: value for field, value in rule.items() if field not in RULE_LIST_FIELDS}
+                for field in RULE_LIST_FIELDS:
+                    if field in rule and not isinstance(rule[field], list):
+                        existing[field] = rule[field] # Kept as extracted (e.g. null)
+            for field in RULE_LIST_FIELDS:
+                _merge_list(existing, field, rule.get(field))
+            for field, value in rule.items():
+                if field not in RULE_LIST_FIELDS and existing.get(field) in (None, "") and value not in (None, ""):
+                    existing[field] = value
+    return list(merged.values())
 
 def call_llm_api(text_content, major_code):
-    """Sends content to the LLM API and parses the JSON response."""
+    """
+    Sends content to the LLM API and parses the JSON response. Pages larger than the chunk budget are split
+    at section headings, the chunks are extracted concurrently (all through the shared throttler), and the
+    rules are merged back into one list. Raises RateLimitExceeded once the daily request limit is used up.
+    """
     if not text_content:
         print("   No text content provided to LLM.")
         return None
 
-    # Use the API to count tokens accurately if possible
-    estimated_tokens = count_tokens(text_content)
-    print(f"   Calling LLM API (estimated/counted tokens: {estimated_tokens})...")
-
-    # --- Wait if rate limited ---
-    try:
-        api_throttler.wait_if_needed(estimated_tokens)
-    except Exception as e:
-        print(f"   Stopping due to rate limit error: {e}")
-        sys.exit(1) # Exit script if RPD limit is hit
-
-    # --- Define the Prompt (Updated based on user examples) ---
-    prompt = f"""
-    Analyze the following text describing university degree requirements for the major "{major_code}".
-    Extract all distinct requirement sections (like 'Core Courses', 'General Education', 'Electives', 'Business Minor', etc.).
-    Format the output as a JSON array, where each object represents one requirement rule according to the specified schema.
-
-    Schema for each rule object:
-    {{
-      "MajorCode": "{major_code}", /* REQUIRED: Use the provided major code */
-      "RequirementType": "string", /* REQUIRED: e.g., "CORE", "GENERAL_EDUCATION", "ELECTIVES", "BUSINESS_MINOR". Use descriptive UPPER_SNAKE_CASE. */
-      "Courses": [ /* Optional: Include ONLY if specific courses are listed. Array of objects: {{"Subject": "string", "CourseNumber": integer}}. Parse subject codes (e.g., "CS", "MATH") and course numbers accurately. Do NOT include credits here unless specified per course in the source text. */ ],
-      "MinCredits": integer, /* Optional: Include ONLY for elective-like rules specifying a minimum credit total needed FROM a group/list. */
-      "AllowedSubjects": ["string"], /* Optional: Include ONLY for elective-like rules listing allowed subjects/departments. Use subject codes. */
-      "Restrictions": ["string"], /* Optional: Include ONLY for elective-like rules specifying restrictions (e.g., "Must be 3000+ level", "Excludes internships"). List each restriction as a separate string. */
-      "TotalCreditsRequired": integer /* Optional: Include ONLY if the rule block explicitly states a total credit number FOR THAT SPECIFIC SECTION (e.g., "General Education: 44 Credits"). Do not confuse with overall degree credits or MinCredits for electives. */
-    }}
-
-    Processing Instructions:
-    1.  **Major Code:** Always set "MajorCode" to "{major_code}".
-    2.  **Requirement Type:** Identify logical sections (Core, Gen Ed, Electives, Minor, Concentration, etc.) and assign a concise `UPPER_SNAKE_CASE` "RequirementType".
-    3.  **Courses Array:**
-        * If a section lists specific courses (e.g., "MATH 101", "ENGL 102"), populate the "Courses" array.
-        * Each course object MUST contain "Subject" (string, e.g., "MATH") and "CourseNumber" (integer, e.g., 101). Convert course numbers like '1103' to the integer 1103.
-        * If the text explicitly states credits *for an individual course* within that list (rare), you can add a `"Credits": integer` field to that specific course object inside the "Courses" array.
-        * Do *not* include the "Courses" key if the section describes electives by rules (use MinCredits, AllowedSubjects, Restrictions instead) or only gives a total credit number.
-    4.  **Elective Rules (MinCredits, AllowedSubjects, Restrictions):**
-        * Use "MinCredits" when the text says "choose X credits from..." or similar. Convert credit numbers to integers.
-        * Use "AllowedSubjects" when allowed departments or subject codes are listed (e.g., "from CIS, MATH, or STAT"). Extract only the subject codes.
-        * Use "Restrictions" for conditions like level requirements ("3000+ level"), exclusions, course attributes, etc. List each distinct restriction as a separate string in the array.
-    5.  **TotalCreditsRequired:** Use this *only* when a specific section explicitly totals its own credit requirement (e.g., "General Education: 44 Credits"). Convert the number to an integer. Do not use it for the overall degree total or for elective minimums.
-    6.  **Parsing:** Extract Subject codes (usually 2-4 uppercase letters) and Course Numbers (usually 3-4 digits) accurately. Ensure CourseNumber, MinCredits, and TotalCreditsRequired are integers.
-    7.  **Exclusions:** Ignore general degree information like total hours for graduation (e.g., "120 hours required"), GPA requirements, university-wide policies, introductory paragraphs, and advisor notes unless they are part of a specific requirement block being parsed.
-    8.  **Output:** Ensure the final output is ONLY a valid JSON array `[...]` containing the rule objects. Do not include any other text, comments, markdown formatting (like ```json), or explanations.
-
-    Degree Requirements Text to Analyze:
-    ---
-    {text_content}
-    ---
-
-    JSON Output:
+    # --- Reuse a cached result for identical input ---
+    cache_key = None
+    if llm_cache is not None:
+        cache_key = llm_cache.make_key(major_code, text_content)
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            print(f"   LLM cache hit, reusing {len(cached['rules'])} requirement rule(s).")
+            return cached['rules']
+
+    budget = chunk_token_budget()
+    chunks = split_text_sections(text_content, budget, token_estimator.estimate)
+    if len(chunks) == 1:
+        requirements_json, usage = request_rules(text_content, major_code)
+    else:
+        print(f"   Page exceeds the {budget}-token chunk budget, extracting {len(chunks)} sections concurrently...")
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=max(1, min(CHUNK_WORKERS, len(chunks)))) as executor:
+            results = list(executor.map(lambda chunk: request_rules(chunk, major_code), chunks))
+        if any(rules is None for rules, _ in results):
+            print("   Error: Extraction failed for at least one section, discarding this page's partial result.")
+            return None
+        requirements_json = merge_rules(rules for rules, _ in results)
+        usage = {"total_token_count": sum(chunk_usage["total_token_count"] or 0 for _, chunk_usage in results), "chunks": len(chunks)}
+        print(f"   Merged {sum(len(rules) for rules, _ in results)} rule(s) from {len(chunks)} sections into {len(requirements_json)}.")
+
+    if requirements_json is not None and cache_key is not None:
+        llm_cache.put(cache_key, major_code, requirements_json, usage)
+    return requirements_json
+
+def request_rules(text_content, major_code):
     """
+    Makes one throttled LLM request for `text_content`. Returns (rules, usage), or (None, None) on failure.
+    RateLimitExceeded (daily request limit reached) is left to the caller, which decides whether to stop.
+    """
+    # --- Build the Prompt ---
+    prompt = EXTRACTION_PROMPT_TEMPLATE.format(major_code=major_code, text_content=text_content)
 
-    try:
-        # Send the prompt to the model
-        response = model.generate_content(prompt)
+    # Estimate locally; the API's count_tokens is only consulted when the estimate is too close to the TPM limit
+    estimated_tokens, counted = api_throttler.admission_tokens(
+        token_estimator.estimate(prompt), token_estimator.error_bound(), lambda: count_tokens(prompt))
+    print(f"   Calling LLM API ({'counted' if counted else 'estimated'} tokens: {estimated_tokens})...")
 
-        # Log the request AFTER it completes successfully, using actual usage data
+    response = None
+    token_count = None # Set once the reservation has been settled with real usage
+    reservation = None
+    try:
+        # Send the prompt to the model; a 429 is retried, re-admitted through the throttler each time
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            # --- Wait if rate limited ---
+            reservation = api_throttler.acquire(estimated_tokens)
+            try:
+                response = model.generate_content(prompt, major_code)
+                break
+            except ModelRateLimitError as e:
+                api_throttler.record_usage(reservation, 0)
+                if attempt == RATE_LIMIT_RETRIES:
+                    rate_limit_retries.record_gave_up()
+                    print(f"   Error: Still rate limited after {RATE_LIMIT_RETRIES} retries: {e}")
+                    return None, None
+                delay = rate_limit_retries.backoff(attempt)
+                print(f"   Rate limited by the model service, retrying in {delay:.1f}s ({attempt + 1}/{RATE_LIMIT_RETRIES})...")
+                time.sleep(delay)
+
+        # Settle the reservation AFTER the request completes, using actual usage data
         token_count = estimated_tokens # Default if metadata missing
         # Use getattr safely in case usage_metadata or prompt_token_count is missing
         if hasattr(response, 'usage_metadata') and response.usage_metadata:
              token_count = getattr(response.usage_metadata, 'total_token_count', estimated_tokens) # Log total tokens if available
+             token_estimator.observe(prompt, getattr(response.usage_metadata, 'total_token_count', None))
 
 
-        api_throttler.log_request(token_count)
+        api_throttler.record_usage(reservation, token_count)
 
         # Debug: Print raw response text if needed
         # print("--- LLM Raw Response ---")
@@ -342,27 +848,33 @@ def call_llm_api(text_content, major_code):
         # Validation: Check if it's a list of dictionaries
         if not isinstance(requirements_json, list):
              print("   Error: LLM did not return a valid JSON array.")
-             return None
+             return None, None
         if not all(isinstance(item, dict) for item in requirements_json):
              print("   Error: LLM response is an array, but contains non-object items.")
              # Optionally print the problematic items for debugging
              # for i, item in enumerate(requirements_json):
              #     if not isinstance(item, dict):
              #         print(f"     Problematic item at index {i}: {item}")
-             return None
+             return None, None
 
         print(f"   LLM call successful, received {len(requirements_json)} requirement rule(s).")
-        return requirements_json
+        usage = {"total_token_count": token_count}
+        if getattr(response, 'usage_metadata', None):
+            usage["prompt_token_count"] = getattr(response.usage_metadata, 'prompt_token_count', None)
+        return requirements_json, usage
 
+    except RateLimitExceeded:
+        raise # The daily request limit ends the run, see run_batch
     except json.JSONDecodeError as e:
         print(f"   Error: Failed to decode JSON response from LLM: {e}")
         print(f"   LLM Raw Text (first 500 chars): {response.text[:500]}...") # Print beginning for debugging
-        return None
+        return None, None
     except Exception as e:
         # Catch other potential API errors (e.g., safety blocks, connection issues, explicit errors in text)
         print(f"   Error calling LLM API or processing response: {e}")
         # Log a failed request attempt (0 tokens used for limit calculation to avoid penalty)
-        api_throttler.log_request(0)
+        if token_count is None and reservation is not None:
+            api_throttler.record_usage(reservation, 0)
         # Attempt to get more specific error details if available from the response object
         if hasattr(response, 'prompt_feedback') and response.prompt_feedback:
             print(f"   LLM Prompt Feedback: {response.prompt_feedback}")
@@ -374,10 +886,33 @@ def call_llm_api(text_content, major_code):
                  if hasattr(candidate, 'safety_ratings'):
                      print(f"   Candidate Safety Ratings: {candidate.safety_ratings}")
 
-        return None
+        return None, None
 
 def write_results_to_json(data, filename, append=False):
-    """Writes or appends the extracted requirement rules to a JSON file."""
+    """
+    Writes or appends the extracted requirement rules to a JSON file. A .jsonl filename selects the JSON Lines
+    store: appends are fsync'd and cost only the new rules (export it with --export-json or results_store.py).
+    Full rewrites go through a temp file and rename, so a crash never leaves a half-written file.
+    """
+    # Ensure data to be added is always a list
+    if data is None: # Handle case where LLM failed
+        data = []
+    elif not isinstance(data, list):
+        print(f"Warning: Data to write is not a list ({type(data)}). Wrapping in a list.")
+        data = [data]
+
+    if is_jsonl_path(filename):
+        try:
+            if append:
+                append_jsonl(filename, data)
+                print(f"   Successfully appended {len(data)} rule(s) to {filename}")
+            else:
+                atomic_write(filename, lambda f: write_jsonl(f, data))
+                print(f"   Successfully wrote {len(data)} rule(s) to {filename}")
+        except OSError as e:
+            print(f"   Error writing to JSON Lines file {filename}: {e}")
+        return
+
     mode = 'a' if append else 'w'
     existing_data = []
     is_new_file = not os.path.exists(filename) or os.path.getsize(filename) == 0
@@ -415,13 +950,6 @@ def write_results_to_json(data, filename, append=False):
     elif append and is_new_file:
          mode = 'w' # Force write if appending to a new/empty file
 
-    # Ensure data to be added is always a list
-    if data is None: # Handle case where LLM failed
-        data = []
-    elif not isinstance(data, list):
-        print(f"Warning: Data to write is not a list ({type(data)}). Wrapping in a list.")
-        data = [data]
-
     # Combine existing data (if appending valid data) with new data
     combined_data = existing_data + data if append and not is_new_file else data
 
@@ -433,19 +961,8 @@ def write_results_to_json(data, filename, append=False):
             os.makedirs(output_dir)
             print(f"   Created output directory: {output_dir}")
 
-        # Write mode needs to write the whole list, append adds based on what was read
-        data_to_write = combined_data if mode == 'w' else data
-
-        with open(filename, mode, encoding='utf-8') as f_write:
-            if mode == 'w':
-                 json.dump(data_to_write, f_write, indent=2, ensure_ascii=False)
-            elif mode == 'a' and data_to_write: # Need to handle adding to existing JSON array carefully
-                 # This simple append mode might create invalid JSON if the file isn't empty
-                 # A more robust append would load, append in memory, and rewrite the whole file
-                 # For now, we rewrite the whole combined list if appending
-                 # Re-open in write mode to overwrite with combined data
-                 with open(filename, 'w', encoding='utf-8') as f_rewrite:
-                      json.dump(combined_data, f_rewrite, indent=2, ensure_ascii=False)
+        # A JSON array cannot be appended to in place: the whole combined list is rewritten (atomically)
+        atomic_write(filename, lambda f_write: write_json_array(f_write, combined_data))
 
 
         action = "appended to" if append and not is_new_file else ("created/wrote to" if is_new_file else "overwrote")
@@ -454,6 +971,212 @@ def write_results_to_json(data, filename, append=False):
         print(f"   Error writing to JSON file {filename}: {e}")
 
 
+def filter_rules(extracted_rules, limit=None, start_at=None):
+    """Applies --start-at and --limit to the rules extracted for one major."""
+    processed_count = 0
+    final_rules_to_write = []
+    rules_available = len(extracted_rules)
+
+    print(f"   LLM returned {rules_available} rule(s). Applying filters...")
+
+    for i, rule in enumerate(extracted_rules):
+        # NOTE: The prompt refers to "courses", but the arguments are --limit and --start-at for *rules*.
+        # Adjusting interpretation here to apply limits to the extracted *rules*.
+        if start_at is not None and i < start_at:
+            continue # Skip rules before the start_at index
+
+        if limit is not None and processed_count >= limit:
+            print(f"   Reached processing limit of {limit} rules.")
+            break # Stop processing if limit is reached
+
+        final_rules_to_write.append(rule)
+        processed_count += 1
+    return final_rules_to_write
+
+
+# --- Batch Pipeline ---
+
+def load_manifest(manifest_path):
+    """
+    Reads a CSV manifest with `major_code` and `url` columns (one major per row).
+    Returns a list of (MAJOR_CODE, url) pairs; exits on a missing file or invalid rows.
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or not {'major_code', 'url'} <= {name.strip() for name in reader.fieldnames}:
+                print(f"Error: Manifest '{manifest_path}' must have a header row with 'major_code' and 'url' columns.")
+                sys.exit(1)
+            entries = []
+            for line_number, row in enumerate(reader, start=2):
+                row = {(k or '').strip(): (v or '').strip() for k, v in row.items()}
+                if not row['major_code'] and not row['url']:
+                    continue # Skip blank lines
+                if not row['major_code'] or not row['url'].startswith(('http://', 'https://')):
+                    print(f"Error: Manifest line {line_number} needs a major_code and an http(s) url: {row}")
+                    sys.exit(1)
+                entries.append((row['major_code'].upper(), row['url']))
+    except FileNotFoundError:
+        print(f"Error: Manifest file '{manifest_path}' not found.")
+        sys.exit(1)
+    return entries
+
+class HostPoliteness:
+    """Spaces fetches to the same host at least `delay` seconds apart, across all fetch workers."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.next_fetch_time = {} # host -> earliest time the next fetch may start
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            now = time.monotonic()
+            fetch_at = max(now, self.next_fetch_time.get(host, now))
+            self.next_fetch_time[host] = fetch_at + self.delay
+        if fetch_at > now:
+            time.sleep(fetch_at - now)
+
+def run_batch(manifest, output_file, limit=None, start_at=None, append=False,
+              fetch_workers=DEFAULT_FETCH_WORKERS, llm_workers=DEFAULT_LLM_WORKERS):
+    """
+    Runs every (major code, URL) pair of the manifest through a bounded fetch -> LLM pipeline.
+    Fetch workers download pages (politely, per host) while LLM workers process earlier pages; a small
+    queue between the stages keeps fetching from running far ahead. Results are written in manifest order.
+    """
+    print(f"Starting batch extraction for {len(manifest)} major(s)")
+    print(f"Output File: {output_file}")
+    print(f"Fetch Workers: {fetch_workers}, LLM Workers: {llm_workers}")
+    print("-" * 20)
+
+    page_queue = queue.Queue(maxsize=llm_workers * 2) # Fetched pages waiting for an LLM worker
+    result_queue = queue.Queue() # (index, major_code, rules or None, stopped); None entry marks the end
+    stop_event = threading.Event() # Set when the daily request limit is reached
+    politeness = HostPoliteness(WEBSITE_SCRAPE_DELAY)
+    jobs = iter(enumerate(manifest))
+    jobs_lock = threading.Lock()
+
+    def fetch_worker():
+        while not stop_event.is_set():
+            with jobs_lock:
+                job = next(jobs, None)
+            if job is None:
+                return
+            index, (major_code, url) = job
+            politeness.wait(url)
+            try:
+                page_text = get_page_content(url)
+            except Exception as e:
+                print(f"   [{major_code}] Unexpected error fetching {url}: {e}")
+                page_text = None
+            if not page_text:
+                print(f"   [{major_code}] Page content could not be retrieved or was empty after cleaning.")
+                result_queue.put((index, major_code, None, False))
+                continue
+            while True:
+                if stop_event.is_set():
+                    # Every job taken must report a result, or later majors would never be written
+                    result_queue.put((index, major_code, None, True))
+                    break
+                try:
+                    page_queue.put((index, major_code, page_text), timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+
+    def llm_worker():
+        while True:
+            item = page_queue.get()
+            if item is None:
+                return
+            index, major_code, page_text = item
+            rules = None
+            stopped = stop_event.is_set()
+            if not stopped:
+                try:
+                    rules = call_llm_api(page_text, major_code)
+                except RateLimitExceeded as e:
+                    # The daily request limit is shared by every worker; stop the whole batch
+                    print(f"   [{major_code}] Stopping: {e}")
+                    stop_event.set()
+                    stopped = True
+                except Exception as e:
+                    print(f"   [{major_code}] Unexpected error during LLM processing: {e}")
+            result_queue.put((index, major_code, rules, stopped))
+
+    def close_pipeline(fetchers, llm_threads):
+        for thread in fetchers:
+            thread.join()
+        for _ in llm_threads:
+            page_queue.put(None)
+        for thread in llm_threads:
+            thread.join()
+        result_queue.put(None)
+
+    fetchers = [threading.Thread(target=fetch_worker, daemon=True) for _ in range(fetch_workers)]
+    llm_threads = [threading.Thread(target=llm_worker, daemon=True) for _ in range(llm_workers)]
+    for thread in fetchers + llm_threads:
+        thread.start()
+    threading.Thread(target=close_pipeline, args=(fetchers, llm_threads), daemon=True).start()
+
+    # Write results in manifest order as soon as every earlier major has finished
+    started_at = time.perf_counter()
+    finished = {}
+    next_index = 0
+    wrote_any = False
+    failed_majors = []
+    stopped_majors = [] # Taken from the manifest but left unprocessed once the daily limit was hit
+    rules_written = 0
+    while True:
+        result = result_queue.get()
+        if result is None:
+            break
+        index, major_code, rules, stopped = result
+        finished[index] = (major_code, rules, stopped)
+        while next_index in finished:
+            major_code, rules, stopped = finished.pop(next_index)
+            next_index += 1
+            if stopped:
+                stopped_majors.append(major_code)
+                continue
+            if rules is None:
+                failed_majors.append(major_code)
+                continue
+            final_rules_to_write = filter_rules(rules, limit, start_at)
+            if not final_rules_to_write:
+                print(f"   [{major_code}] No rules remain after applying limit/start_at filters.")
+                continue
+            # The first write honours --append; every later major is appended to it
+            write_results_to_json(final_rules_to_write, output_file, append=append or wrote_any)
+            wrote_any = True
+            rules_written += len(final_rules_to_write)
+
+    elapsed = time.perf_counter() - started_at
+    skipped = len(manifest) - next_index
+    print("-" * 20)
+    print(f"Batch finished in {elapsed:.1f}s: {next_index - len(failed_majors) - len(stopped_majors)} of {len(manifest)} major(s) processed, "
+          f"{rules_written} rule(s) written ({next_index / elapsed * 60 if elapsed > 0 else 0:.1f} majors/min).")
+    if http_cache is not None:
+        print(f"   {http_cache.summary()}")
+    if llm_cache is not None:
+        print(f"   {llm_cache.summary()}")
+    if token_estimator.samples:
+        print(f"   {token_estimator.summary()}")
+    if rate_limit_retries.retried or rate_limit_retries.gave_up:
+        print(f"   {rate_limit_retries.summary()}")
+    if failed_majors:
+        print(f"   Failed majors ({len(failed_majors)}): {', '.join(failed_majors)}")
+    if stop_event.is_set():
+        print("   Stopped early: daily request limit (RPD) reached.")
+        if stopped_majors:
+            print(f"   Stopped by RPD ({len(stopped_majors)}): {', '.join(stopped_majors)}")
+        print(f"   Not attempted: {skipped} major(s).")
+        sys.exit(1)
+    if failed_majors:
+        sys.exit(1)
+
+
 # --- Main Execution ---
 def main(url, output_file, major_code, limit=None, start_at=None, append=False):
     """Main function: scrape, process with LLM, and write results."""
@@ -475,7 +1198,11 @@ def main(url, output_file, major_code, limit=None, start_at=None, append=False):
     time.sleep(WEBSITE_SCRAPE_DELAY) # Be polite to the web server
 
     # --- 2. Process with LLM ---
-    extracted_rules = call_llm_api(page_text, major_code)
+    try:
+        extracted_rules = call_llm_api(page_text, major_code)
+    except RateLimitExceeded as e:
+        print(f"Stopping script due to rate limit error: {e}")
+        sys.exit(1) # Exit script if RPD limit is hit
 
     if extracted_rules is None: # Check specifically for None, as empty list [] is valid
         print("LLM processing failed or returned no data. Nothing written.")
@@ -490,24 +1217,8 @@ def main(url, output_file, major_code, limit=None, start_at=None, append=False):
         sys.exit(1)
 
     # --- 3. Apply Filtering (Limit/Start At - applied *after* extraction) ---
-    processed_count = 0
-    final_rules_to_write = []
-    rules_available = len(extracted_rules)
-
-    print(f"   LLM returned {rules_available} rule(s). Applying filters...")
-
-    for i, rule in enumerate(extracted_rules):
-        # NOTE: The prompt refers to "courses", but the arguments are --limit and --start-at for *rules*.
-        # Adjusting interpretation here to apply limits to the extracted *rules*.
-        if start_at is not None and i < start_at:
-            continue # Skip rules before the start_at index
-
-        if limit is not None and processed_count >= limit:
-            print(f"   Reached processing limit of {limit} rules.")
-            break # Stop processing if limit is reached
-
-        final_rules_to_write.append(rule)
-        processed_count += 1
+    final_rules_to_write = filter_rules(extracted_rules, limit, start_at)
+    processed_count = len(final_rules_to_write)
 
     if not final_rules_to_write:
          print("   No rules remain after applying limit/start_at filters, or LLM returned an empty list.")
@@ -521,6 +1232,12 @@ def main(url, output_file, major_code, limit=None, start_at=None, append=False):
     write_results_to_json(final_rules_to_write, output_file, append=append)
 
     print("-" * 20)
+    if http_cache is not None:
+        print(http_cache.summary())
+    if llm_cache is not None:
+        print(llm_cache.summary())
+    if token_estimator.samples:
+        print(token_estimator.summary())
     print("Script finished successfully.")
 
 
@@ -539,6 +1256,22 @@ if __name__ == "__main__":
                         help="Skip the first N rules found (0-based index) and start processing from there (applied *after* LLM extraction).")
     parser.add_argument("--append", action="store_true", default=False,
                         help="Append results to the output file if it exists and contains a valid JSON array, otherwise create/overwrite it.")
+    parser.add_argument("--output", default=OUTPUT_JSON_FILE,
+                        help="Output file. A .jsonl path uses the append-only JSON Lines store (appends cost only the new rules).")
+    parser.add_argument("--export-json", default=None,
+                        help="With a .jsonl --output: afterwards write this array-form JSON file (latest version of each rule) for the uploader.")
+
+    # --- Batch Mode ---
+    parser.add_argument("--manifest", default=None,
+                        help="CSV file with 'major_code' and 'url' columns; processes every row instead of the single configured URL/major.")
+    parser.add_argument("--fetch-workers", type=int, default=DEFAULT_FETCH_WORKERS,
+                        help="Batch mode: pages fetched concurrently (fetches to one host stay --scrape-delay apart).")
+    parser.add_argument("--llm-workers", type=int, default=DEFAULT_LLM_WORKERS,
+                        help="Batch mode: LLM calls made concurrently, all sharing the RPM/TPM/RPD throttler.")
+    parser.add_argument("--chunk-tokens", type=int, default=CHUNK_TOKENS,
+                        help="Pages with more text tokens than this are split at section headings and extracted in chunks (capped below the TPM limit).")
+    parser.add_argument("--chunk-workers", type=int, default=CHUNK_WORKERS,
+                        help="Concurrent LLM calls for the chunks of one oversized page.")
 
     # --- Optional Rate Limit Overrides ---
     parser.add_argument("--rpm", type=int, default=RPM_LIMIT,
@@ -549,14 +1282,73 @@ if __name__ == "__main__":
                         help=f"Override RPD limit (requests per day). Default: {RPD_LIMIT}")
     parser.add_argument("--scrape-delay", type=float, default=WEBSITE_SCRAPE_DELAY,
                         help=f"Override delay (in seconds) between website page fetches. Default: {WEBSITE_SCRAPE_DELAY}")
+    parser.add_argument("--llm-cache-dir", default=LLM_CACHE_DIR,
+                        help="Directory of cached LLM extraction results (reused when model, prompt, major and page text are unchanged).")
+    parser.add_argument("--no-llm-cache", action="store_true", default=False,
+                        help="Always call the LLM, without reading or writing the result cache.")
+    parser.add_argument("--http-cache-dir", default=HTTP_CACHE_DIR,
+                        help="Directory of fetched pages, revalidated with conditional requests (304 skips the download).")
+    parser.add_argument("--no-http-cache", action="store_true", default=False,
+                        help="Always download pages in full, without reading or writing the page cache.")
+    parser.add_argument("--backend", choices=["gemini", "replay"], default="gemini",
+                        help="Model to extract with: the Gemini API, or a local model replaying recorded responses (no network or API key).")
+    parser.add_argument("--replay-file", default=None,
+                        help="Replay backend: JSON Lines file of recorded responses (see --record-file). Unmatched prompts get an empty rule list.")
+    parser.add_argument("--record-file", default=None,
+                        help="Append every model response to this JSON Lines file, for later use with --backend replay.")
+    parser.add_argument("--fake-latency", type=float, default=0.0,
+                        help="Replay backend: seconds each response takes.")
+    parser.add_argument("--fake-429-rate", type=float, default=0.0,
+                        help="Replay backend: fraction of requests answered with a 429 error.")
+    parser.add_argument("--throttle-db", default=THROTTLE_DB_FILE,
+                        help="SQLite file holding the request log shared by all reqs_creator processes on this machine.")
+    parser.add_argument("--no-throttle-db", action="store_true", default=False,
+                        help="Keep rate-limit accounting in this process only (not shared, reset on restart).")
 
 
     args = parser.parse_args()
 
+    # --- Create the Model Backend ---
+    try:
+        if args.backend == "replay":
+            replay_options = {"latency": args.fake_latency, "error_rate": args.fake_429_rate}
+            model = ReplayBackend.from_file(args.replay_file, **replay_options) if args.replay_file else ReplayBackend(**replay_options)
+            MODEL_NAME = model.name # Keeps replayed results apart from real ones in the LLM cache
+        else:
+            model = GeminiBackend(MODEL_NAME, API_KEY, generation_config, safety_settings)
+    except BackendConfigError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.record_file:
+        model = RecordingBackend(model, args.record_file)
+
     # --- Update Config/Throttler if Overridden ---
     if args.rpm != RPM_LIMIT or args.tpm != TPM_LIMIT or args.rpd != RPD_LIMIT:
         print("Applying command-line rate limit overrides...")
+    if args.no_throttle_db:
         api_throttler = Throttler(args.rpm, args.tpm, args.rpd)
+    else:
+        try:
+            api_throttler = SharedThrottler(args.rpm, args.tpm, args.rpd, args.throttle_db)
+        except sqlite3.Error as e:
+            print(f"Error: Could not open shared throttle state '{args.throttle_db}': {e}")
+            sys.exit(1)
+        print(f"Shared throttle state: {args.throttle_db} ({api_throttler.requests_today()} request(s) in the last 24h)")
+    if not args.no_llm_cache:
+        try:
+            llm_cache = LLMResultCache(args.llm_cache_dir)
+            llm_cache.prune()
+        except OSError as e:
+            print(f"Warning: LLM cache disabled, could not use '{args.llm_cache_dir}': {e}")
+            llm_cache = None
+    if not args.no_http_cache:
+        try:
+            http_cache = HttpPageCache(args.http_cache_dir)
+        except OSError as e:
+            print(f"Warning: HTTP cache disabled, could not use '{args.http_cache_dir}': {e}")
+            http_cache = None
+    CHUNK_TOKENS = args.chunk_tokens
+    CHUNK_WORKERS = args.chunk_workers
     if args.scrape_delay != WEBSITE_SCRAPE_DELAY:
          print("Applying command-line scrape delay override...")
          WEBSITE_SCRAPE_DELAY = args.scrape_delay
@@ -569,6 +1361,37 @@ if __name__ == "__main__":
     if args.start_at is not None and args.start_at < 0:
          print("Error: --start-at must be a non-negative integer.")
          sys.exit(1)
+    if args.fetch_workers < 1 or args.llm_workers < 1:
+        print("Error: --fetch-workers and --llm-workers must be positive integers.")
+        sys.exit(1)
+    OUTPUT_JSON_FILE = args.output
+    if args.export_json and not is_jsonl_path(OUTPUT_JSON_FILE):
+        print("Error: --export-json needs a JSON Lines (.jsonl) --output.")
+        sys.exit(1)
+
+    def export_results():
+        """Exports the JSON Lines output for the uploader (also after a run that stopped early)."""
+        if not args.export_json or not os.path.exists(OUTPUT_JSON_FILE):
+            return
+        try:
+            print(f"Exported {export_json(OUTPUT_JSON_FILE, args.export_json)} rule(s) to {args.export_json}")
+        except (OSError, ValueError) as e:
+            print(f"Error: Could not export {OUTPUT_JSON_FILE} to {args.export_json}: {e}")
+
+    if args.manifest:
+        try:
+            run_batch(
+                manifest=load_manifest(args.manifest),
+                output_file=OUTPUT_JSON_FILE,
+                limit=args.limit,
+                start_at=args.start_at,
+                append=args.append,
+                fetch_workers=args.fetch_workers,
+                llm_workers=args.llm_workers
+            )
+        finally:
+            export_results()
+        sys.exit(0)
 
     # Validate hardcoded variables
     if not TARGET_URL or not TARGET_URL.startswith(('http://', 'https://')):
@@ -577,19 +1400,22 @@ if __name__ == "__main__":
     if not OUTPUT_JSON_FILE:
         print("Error: OUTPUT_JSON_FILE inside the script is not set.")
         sys.exit(1)
-    if not OUTPUT_JSON_FILE.lower().endswith('.json'):
-        print(f"Warning: OUTPUT_JSON_FILE ('{OUTPUT_JSON_FILE}') does not end with .json.")
+    if not OUTPUT_JSON_FILE.lower().endswith('.json') and not is_jsonl_path(OUTPUT_JSON_FILE):
+        print(f"Warning: OUTPUT_JSON_FILE ('{OUTPUT_JSON_FILE}') does not end with .json or .jsonl.")
     if not MAJOR_CODE:
          print("Error: MAJOR_CODE inside the script is not set.")
          sys.exit(1)
 
 
     # --- Run Main Function ---
-    main(
-        url=TARGET_URL,
-        output_file=OUTPUT_JSON_FILE,
-        major_code=MAJOR_CODE.upper(), # Standardize to upper case
-        limit=args.limit,
-        start_at=args.start_at,
-        append=args.append
-    )
\ No newline at end of file
+    try:
+        main(
+            url=TARGET_URL,
+            output_file=OUTPUT_JSON_FILE,
+            major_code=MAJOR_CODE.upper(), # Standardize to upper case
+            limit=args.limit,
+            start_at=args.start_at,
+            append=args.append
+        )
+    finally:
+        export_results()
\ No newline at end of file
@@ -0,0 +1,193 @@
+# File: .dev-tools/results_store.py
+# Crash-safe storage for extracted requirement rules: fsync'd JSON Lines appends, atomic (temp file + rename)
+# rewrites, and compaction/export to the array-form degree_requirements.json that degree_reqs_upload.py reads.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+_TAIL_SCAN_SIZE = 64 * 1024 # Bytes read per step while looking for the last complete line
+_UMASK = os.umask(0o022) # Read once (it can only be read by setting it) and restored right away
+os.umask(_UMASK)
+
+def is_jsonl_path(path):
+    return path.lower().endswith(JSONL_EXTENSIONS)
+
+def rule_key(rule):
+    """Identity of a rule for de-duplication (the uploader's partition + sort key), or None when incomplete."""
+    if isinstance(rule, dict) and rule.get('MajorCode') and rule.get('RequirementType'):
+        return rule['MajorCode'], rule['RequirementType']
+    return None
+
+# --- Atomic Rewrites ---
+
+def _fsync_directory(directory):
+    """Makes a rename durable; not supported on every platform (e.g. Windows), where it is skipped."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def replacement_mode(path):
+    """Permission bits for a file replacing `path`: those of the existing file, or what open() would give a new one."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def atomic_write(path, write):
+    """
+    Calls `write(f)` on a temporary file next to `path`, forces it to disk and renames it over `path`.
+    Readers (and a crash at any point) see either the old file or the complete new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, replacement_mode(path)) # mkstemp creates the file as 0600
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+def write_json_array(f, records):
+    """Streams records as the same text json.dump(list(records), f, indent=2, ensure_ascii=False) writes."""
+    first = True
+    for record in records:
+        # JSON strings cannot hold raw newlines, so every newline here is indentation that gains one level
+        f.write(('[\n  ' if first else ',\n  ') + json.dumps(record, indent=2, ensure_ascii=False).replace('\n', '\n  '))
+        first = False
+    f.write('[]' if first else '\n]')
+
+def write_jsonl(f, records):
+    for record in records:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+# --- JSON Lines Store ---
+
+def _drop_torn_tail(f):
+    """Truncates an unterminated last line (left by a crash mid-append) from a file opened in 'a+b' mode."""
+    end = f.seek(0, os.SEEK_END)
+    if not end:
+        return
+    f.seek(end - 1)
+    if f.read(1) == b'\n':
+        return
+    position = end
+    while position > 0:
+        start = max(0, position - _TAIL_SCAN_SIZE)
+        f.seek(start)
+        newline = f.read(position - start).rfind(b'\n')
+        if newline != -1:
+            f.truncate(start + newline + 1)
+            return
+        position = start
+    f.truncate(0)
+
+def append_jsonl(path, records):
+    """
+    Appends records as JSON Lines and fsyncs them before returning, so the cost is proportional to the new
+    records only. A torn line left by an earlier interrupted append is removed first. Returns the count written.
+    """
+    data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    is_new = not os.path.exists(path)
+    with open(path, 'a+b') as f:
+        _drop_torn_tail(f)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    if is_new:
+        _fsync_directory(directory)
+    return data.count(b'\n')
+
+def iter_jsonl(path):
+    """
+    Yields the records of a JSON Lines file. An unterminated, undecodable last line (a torn append) is skipped
+    with a warning; an invalid line anywhere else raises ValueError.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                if not line.endswith('\n'):
+                    print(f"Warning: Ignoring incomplete last line {line_number} of '{path}' (interrupted write).")
+                    return
+                raise ValueError(f"Invalid JSON Lines record at '{path}' line {line_number}: {e}") from e
+
+def latest_rules(records):
+    """
+    De-duplicates rules by (MajorCode, RequirementType): a later record replaces an earlier one but keeps its
+    position, so re-extracting a major updates its rules in place. Rules without both keys are all kept.
+    """
+    merged = {}
+    for index, record in enumerate(records):
+        key = rule_key(record)
+        merged[key if key is not None else ('', index)] = record
+    return list(merged.values())
+
+def compact_jsonl(path):
+    """Rewrites a JSON Lines store atomically with only the latest version of each rule; returns (before, after) counts."""
+    records = list(iter_jsonl(path))
+    rules = latest_rules(records)
+    atomic_write(path, lambda f: write_jsonl(f, rules))
+    return len(records), len(rules)
+
+def export_json(jsonl_path, json_path, compact=True):
+    """
+    Writes the array-form JSON file the uploader expects from a JSON Lines store (atomically, indent=2).
+    With `compact`, only the latest version of each rule is exported. Returns the number of rules written.
+    """
+    records = iter_jsonl(jsonl_path)
+    rules = latest_rules(records) if compact else list(records)
+    atomic_write(json_path, lambda f: write_json_array(f, rules))
+    return len(rules)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compact a JSON Lines rule store and/or export it as a JSON array for degree_reqs_upload.py.')
+    parser.add_argument('jsonl_file', help='JSON Lines file written by reqs_creator.py.')
+    parser.add_argument('--export', default=None,
+                        help='Array-form JSON file to write (default: the input path with a .json extension).')
+    parser.add_argument('--compact', action='store_true', default=False,
+                        help='Rewrite the JSON Lines file in place, keeping only the latest version of each rule.')
+    parser.add_argument('--keep-duplicates', action='store_true', default=False,
+                        help='Export every record, including rules superseded by a later extraction.')
+    args = parser.parse_args()
+
+    if not is_jsonl_path(args.jsonl_file):
+        print(f"Error: '{args.jsonl_file}' is not a JSON Lines file ({', '.join(JSONL_EXTENSIONS)}).")
+        sys.exit(1)
+    try:
+        if args.compact:
+            before, after = compact_jsonl(args.jsonl_file)
+            print(f"Compacted {args.jsonl_file}: {before} record(s) -> {after} rule(s).")
+        export_path = args.export or os.path.splitext(args.jsonl_file)[0] + '.json'
+        written = export_json(args.jsonl_file, export_path, compact=not args.keep_duplicates)
+        print(f"Exported {written} rule(s) to {export_path}")
+    except FileNotFoundError:
+        print(f"Error: '{args.jsonl_file}' not found.")
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
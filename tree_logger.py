@@ -1,9 +1,466 @@
+import hashlib
+import json
 import os
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-def print_directory_tree(start_path, indent="", is_last=False, log_file=None, current_depth=0, max_depth=None):
+# Directories left out of the tree (files with these names are still shown)
+EXCLUDED_DIRS = frozenset([".git", "target", "node_modules"])
+# Directory listings run ahead of the output in this many threads; listing is I/O bound (network filesystems)
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Characters of tree text collected before each write to the console and the log file
+OUTPUT_BUFFER_SIZE = 256 * 1024
+DEFAULT_LOG_FILE = "tree_log.txt"
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3") # --index paths written as SQLite; anything else is JSON Lines
+LINE_COUNT_CHUNK_SIZE = 1024 * 1024
+SNAPSHOT_VERSION = 1
+# --diff without --snapshot keeps one snapshot per tree here, outside the tree it describes
+SNAPSHOT_CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "tree_logger")
+# Directories modified this close to (or after) the moment a snapshot was taken are listed again: a change in
+# the same timestamp tick as the snapshot would leave their mtime unchanged
+SNAPSHOT_RACY_WINDOW_NS = 2 * 10**9
+_UMASK = os.umask(0o022) # Read once (it can only be read by setting it) and restored right away
+os.umask(_UMASK)
+
+def list_directory(path):
+    """
+    Returns the (name, is_dir) entries of one directory in directory order, without excluded directories.
+    Uses os.scandir, whose entries carry the file type from the directory read itself (d_type), so most
+    entries need no extra stat call. Raises OSError if the directory cannot be read.
+    """
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                is_dir = entry.is_dir() # Follows symlinks, like os.path.isdir
+            except OSError:
+                is_dir = False
+            if is_dir and entry.name in EXCLUDED_DIRS:
+                continue
+            entries.append((entry.name, is_dir))
+    return entries
+
+def count_lines(path):
+    """Counts newline characters like `wc -l`; returns None for binary files (a NUL byte in the first chunk)."""
+    lines = 0
+    with open(path, "rb") as f:
+        chunk = f.read(LINE_COUNT_CHUNK_SIZE)
+        if b"\0" in chunk:
+            return None
+        while chunk:
+            lines += chunk.count(b"\n")
+            chunk = f.read(LINE_COUNT_CHUNK_SIZE)
+    return lines
+
+def scan_directory(path, line_counts=False, lister=list_directory):
+    """
+    Like list_directory, but every entry is (name, is_dir, size, mtime, lines): the stat of the entry (following
+    symlinks; size and mtime are None when it cannot be read) and, with line_counts, the line count of files.
+    """
+    entries = []
+    for name, is_dir in lister(path):
+        entry_path = os.path.join(path, name)
+        try:
+            stat = os.stat(entry_path)
+            size, mtime = stat.st_size, stat.st_mtime
+        except OSError:
+            size = mtime = None
+        lines = None
+        if line_counts and not is_dir and size is not None:
+            try:
+                lines = count_lines(entry_path)
+            except OSError:
+                pass
+        entries.append((name, is_dir, size, mtime, lines))
+    return entries
+
+class TreeIndex:
+    """
+    Machine-readable record of one walk: path, type, size, mtime and (optionally) line count of every entry,
+    plus file/directory/size/line totals for each directory's subtree. Filled in by iter_tree_lines, whose
+    worker threads stat (and count) each directory's entries while listing it.
+    """
+
+    def __init__(self, start_path, line_counts=False):
+        self.start_path = start_path
+        self.line_counts = line_counts
+        self.listings = {} # Directory path -> scan_directory entries, for every directory that was listed
+        self.errors = {} # Directory path -> error message, for directories that could not be listed
+
+    def scan_directory(self, path, lister=list_directory):
+        return scan_directory(path, self.line_counts, lister)
+
+    def records(self):
+        """Returns one dict per entry in tree order (the start directory first, as path '.'), with subtree totals."""
+        try:
+            stat = os.stat(self.start_path)
+            root = (".", True, stat.st_size, stat.st_mtime, None)
+        except OSError:
+            root = (".", True, None, None, None)
+        records = []
+        stack = [(self.start_path, ".", 0, root)]
+        while stack:
+            path, relative_path, depth, (name, is_dir, size, mtime, lines) = stack.pop()
+            record = {"path": relative_path, "type": "dir" if is_dir else "file", "depth": depth, "size": size, "mtime": mtime}
+            if self.line_counts and not is_dir:
+                record["lines"] = lines
+            records.append(record)
+            if not is_dir:
+                continue
+            if path in self.errors:
+                record["error"] = self.errors[path]
+            for child in reversed(self.listings.get(path, [])):
+                child_relative = child[0] if relative_path == "." else relative_path + "/" + child[0]
+                stack.append((os.path.join(path, child[0]), child_relative, depth + 1, child))
+
+        # Records are in pre-order, so walking them backwards reaches every entry before its parent directory
+        totals = {}
+        for record in reversed(records):
+            if record["type"] == "dir":
+                subtree = totals.pop(record["path"], {"files": 0, "dirs": 0, "total_size": 0, "total_lines": 0})
+                record.update(subtree)
+                if not self.line_counts:
+                    del record["total_lines"]
+            if record["path"] == ".":
+                continue
+            parent = record["path"].rpartition("/")[0] or "."
+            parent_totals = totals.setdefault(parent, {"files": 0, "dirs": 0, "total_size": 0, "total_lines": 0})
+            if record["type"] == "dir":
+                parent_totals["dirs"] += 1 + record["dirs"]
+                parent_totals["files"] += record["files"]
+                parent_totals["total_size"] += record["total_size"]
+                parent_totals["total_lines"] += record.get("total_lines", 0)
+            else:
+                parent_totals["files"] += 1
+                parent_totals["total_size"] += record["size"] or 0
+                parent_totals["total_lines"] += record.get("lines") or 0
+        return records
+
+    def write(self, index_path):
+        """Writes the records to index_path (SQLite for .db/.sqlite/.sqlite3, else JSON Lines); returns them."""
+        records = self.records()
+
+        def write_records(temp_path):
+            if index_path.lower().endswith(SQLITE_EXTENSIONS):
+                write_index_sqlite(records, temp_path)
+            else:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        replace_atomically(index_path, write_records)
+        return records
+
+def replacement_mode(path):
+    """Permission bits for a file replacing `path`: those of the existing file, or what open() would give a new one."""
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+def replace_atomically(path, write_temp):
+    """Calls write_temp(temp_path) for a temporary file next to path, then renames it over path."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        write_temp(temp_path)
+        os.chmod(temp_path, replacement_mode(path)) # mkstemp creates the file as 0600
+        os.replace(temp_path, path) # Readers see the old file or the complete new one
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def write_index_sqlite(records, db_path):
+    """Writes the records to an `entries` table (one row per path; columns missing from a record are NULL)."""
+    import sqlite3
+    columns = ["path", "parent", "type", "depth", "size", "mtime", "lines",
+               "files", "dirs", "total_size", "total_lines", "error"]
+    connection = sqlite3.connect(db_path)
+    try:
+        connection.execute("DROP TABLE IF EXISTS entries")
+        connection.execute("""
+            CREATE TABLE entries (
+                path TEXT PRIMARY KEY, parent TEXT, type TEXT NOT NULL, depth INTEGER NOT NULL,
+                size INTEGER, mtime REAL, lines INTEGER,
+                files INTEGER, dirs INTEGER, total_size INTEGER, total_lines INTEGER, error TEXT
+            )""")
+        connection.execute("CREATE INDEX entries_parent ON entries (parent)")
+        rows = []
+        for record in records:
+            parent = None if record["path"] == "." else (record["path"].rpartition("/")[0] or ".")
+            rows.append([parent if column == "parent" else record.get(column) for column in columns])
+        connection.executemany(f"INSERT INTO entries VALUES ({', '.join('?' * len(columns))})", rows)
+        connection.commit()
+    finally:
+        connection.close()
+
+def count_below(directories, key):
+    """Number of entries below directory `key` in a snapshot's directories (0 when it was never listed)."""
+    total = 0
+    stack = [key]
+    while stack:
+        current = stack.pop()
+        directory = directories.get(current)
+        if directory is None:
+            continue
+        total += len(directory["entries"])
+        stack.extend(f"{current}/{entry[0]}" if current != "." else entry[0] for entry in directory["entries"] if entry[1])
+    return total
+
+def default_snapshot_path(start_path):
+    """Snapshot file used by --diff without --snapshot: one per tree (by absolute path) in SNAPSHOT_CACHE_DIR."""
+    digest = hashlib.sha256(os.path.abspath(start_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(SNAPSHOT_CACHE_DIR, f"{digest}.json")
+
+def entry_count(count):
+    return f"{count} entry" if count == 1 else f"{count} entries"
+
+class TreeSnapshot:
+    """
+    Persistent listing cache for repeat walks of one tree, keyed by directory path (relative to the start
+    directory) and mtime. A directory whose mtime is unchanged since the previous snapshot reuses the stored
+    listing instead of being read again. Every directory is still stat'ed: its mtime only changes with its own
+    entries, not with those of its subdirectories. With stat_files (--diff), file sizes and mtimes are recorded
+    too, so diff() can report modified files; without it, the stats of the previous snapshot are carried over.
+    """
+
+    def __init__(self, start_path, stat_files=False, ignored_paths=()):
+        self.start_path = start_path
+        self.root = os.path.abspath(start_path)
+        self.prefix = os.path.join(start_path, "") # Walked paths are os.path.join(start_path, ...)
+        self.stat_files = stat_files
+        self.previous = {} # Directory key -> {"mtime_ns", "entries": [[name, is_dir, size, mtime_ns], ...]}
+        self.previous_taken_at_ns = None
+        self.directories = {} # The same, for this walk
+        self.taken_at_ns = time.time_ns()
+        self.reused = 0
+        self.reused_lock = threading.Lock()
+        # The tool's own output files (snapshot, log, index) inside the tree, by directory key; left out of listings
+        self.ignored = {}
+        for ignored_path in ignored_paths:
+            relative = os.path.relpath(os.path.abspath(ignored_path), self.root)
+            if relative != os.pardir and not relative.startswith(os.pardir + os.sep):
+                directory, name = os.path.split(relative)
+                self.ignored.setdefault(directory.replace(os.sep, "/") or ".", set()).add(name)
+
+    def is_ignored(self, key, name):
+        """True for an output file of this run in directory `key`, or a temporary file written while replacing one."""
+        names = self.ignored.get(key)
+        if not names:
+            return False
+        return name in names or (name.endswith(".tmp") and any(name.startswith(f".{ignored}.") for ignored in names))
+
+    def key(self, path):
+        if path == self.start_path:
+            return "."
+        key = path[len(self.prefix):] if path.startswith(self.prefix) else os.path.relpath(path, self.start_path)
+        return key.replace(os.sep, "/") if os.sep != "/" else key
+
+    def load(self, snapshot_path):
+        """Loads the previous snapshot of this tree; returns False when there is none that can be used."""
+        try:
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable snapshot '{snapshot_path}': {e}")
+            return False
+        if (not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION or data.get("root") != self.root
+                or data.get("excluded_dirs") != sorted(EXCLUDED_DIRS)):
+            print(f"Warning: Snapshot '{snapshot_path}' was taken of another tree or by another version. Starting a new one.")
+            return False
+        self.previous = data["directories"]
+        self.previous_taken_at_ns = data["taken_at_ns"]
+        return True
+
+    def save(self, snapshot_path):
+        data = {"version": SNAPSHOT_VERSION, "root": self.root, "excluded_dirs": sorted(EXCLUDED_DIRS),
+                "taken_at_ns": self.taken_at_ns, "directories": self.directories}
+
+        def write_snapshot(temp_path):
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, ensure_ascii=False, separators=(",", ":"))) # dumps uses the C encoder
+
+        os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+        replace_atomically(snapshot_path, write_snapshot)
+
+    def list_directory(self, path):
+        """Drop-in for list_directory that reuses the previous listing of an unchanged directory and records it."""
+        key = self.key(path)
+        mtime_ns = os.stat(path).st_mtime_ns
+        previous = self.previous.get(key)
+        if (previous is not None and previous["mtime_ns"] == mtime_ns
+                and mtime_ns < self.previous_taken_at_ns - SNAPSHOT_RACY_WINDOW_NS):
+            listing = [(entry[0], entry[1]) for entry in previous["entries"]]
+            with self.reused_lock:
+                self.reused += 1
+            if not self.stat_files:
+                self.directories[key] = previous # Same entries, same carried-over file stats
+                return listing
+        else:
+            listing = list_directory(path)
+            if key in self.ignored:
+                listing = [(name, is_dir) for name, is_dir in listing if not self.is_ignored(key, name)]
+
+        previous_stats = {entry[0]: entry[2:] for entry in previous["entries"] if not entry[1]} if previous else {}
+        entries = []
+        for name, is_dir in listing:
+            stats = [None, None]
+            if is_dir:
+                pass
+            elif self.stat_files:
+                try:
+                    stat = os.stat(os.path.join(path, name))
+                    stats = [stat.st_size, stat.st_mtime_ns]
+                except OSError:
+                    pass
+            else:
+                stats = previous_stats.get(name, stats)
+            entries.append([name, is_dir] + stats)
+        self.directories[key] = {"mtime_ns": mtime_ns, "entries": entries}
+        return listing
+
+    def diff(self):
+        """
+        Compares this walk with the previous snapshot. Returns (change, path, detail) tuples sorted by path, where
+        change is '+' (added), '-' (removed) or '~' (modified: a file whose size or mtime changed, or an entry
+        that changed between file and directory). Added and removed directories are reported once, not per entry.
+        """
+        changes = []
+        for key, current in self.directories.items():
+            previous = self.previous.get(key)
+            if previous is None:
+                continue # Added (reported at its parent) or not listed in the previous walk
+            old_entries = {entry[0]: entry for entry in previous["entries"]}
+            for name, is_dir, size, mtime_ns in current["entries"]:
+                path = name if key == "." else f"{key}/{name}"
+                old = old_entries.pop(name, None)
+                if old is None:
+                    detail = entry_count(count_below(self.directories, path)) if is_dir else ""
+                    changes.append(("+", path + "/" if is_dir else path, detail))
+                elif old[1] != is_dir:
+                    changes.append(("~", path + "/" if is_dir else path, "file -> directory" if is_dir else "directory -> file"))
+                elif not is_dir and None not in old[2:] and size is not None and [size, mtime_ns] != old[2:]:
+                    detail = f"{old[2]:,} -> {size:,} bytes" if size != old[2] else "mtime changed"
+                    changes.append(("~", path, detail))
+            for name, was_dir, _, _ in old_entries.values():
+                path = name if key == "." else f"{key}/{name}"
+                detail = entry_count(count_below(self.previous, path)) if was_dir else ""
+                changes.append(("-", path + "/" if was_dir else path, detail))
+        changes.sort(key=lambda change: change[1].rstrip("/").split("/"))
+        return changes
+
+def iter_tree_lines(start_path, indent="", current_depth=0, max_depth=None, workers=DEFAULT_WORKERS, index=None, snapshot=None):
+    """
+    Yields the tree lines below start_path in the same order a depth-first walk prints them.
+    When a directory is reached, the listings of all its subdirectories are handed to a thread pool, so they
+    are read in parallel while earlier siblings are still being printed; output order never depends on which
+    listing finishes first. Directories at max_depth are never listed.
+    With a TreeIndex, the same threads also stat (and count lines of) every entry and the index records them.
+    With a TreeSnapshot, unchanged directories are not read again and every listing is recorded.
+    """
+    if max_depth is not None and current_depth >= max_depth:
+        return
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    lister = snapshot.list_directory if snapshot is not None else list_directory
+    if index is not None:
+        lister = partial(index.scan_directory, lister=lister)
+
+    def schedule(path):
+        """Starts (or, without a pool, defers) the listing of one directory; call the result to get it."""
+        if pool is None:
+            return partial(lister, path)
+        return pool.submit(lister, path).result
+
+    frames = [] # Open directories, innermost last: [entries, next position, path, indent, depth, child listings]
+
+    def open_directory(path, indent, depth, listing):
+        try:
+            entries = listing()
+        except OSError as e:
+            if index is not None:
+                index.errors[path] = str(e)
+            return f"Error accessing {path}: {e}"
+        if index is not None:
+            index.listings[path] = entries
+        descend = max_depth is None or depth + 1 < max_depth
+        children = {entry[0]: schedule(os.path.join(path, entry[0])) for entry in entries if entry[1]} if descend else {}
+        frames.append([entries, 0, path, indent, depth, children])
+        return None
+
+    try:
+        error = open_directory(start_path, indent, current_depth, schedule(start_path))
+        if error:
+            yield error
+        while frames:
+            frame = frames[-1]
+            entries, position, path, indent, depth, children = frame
+            if position == len(entries):
+                frames.pop()
+                continue
+            frame[1] += 1
+            name, is_dir = entries[position][:2]
+            is_last_item = position == len(entries) - 1
+            if is_dir:
+                yield indent + ("└── " if is_last_item else "├── ") + name + "/"  # Indicate directory with "/"
+                listing = children.pop(name, None)
+                if listing is not None:
+                    new_indent = indent + ("    " if is_last_item else "│   ")
+                    error = open_directory(os.path.join(path, name), new_indent, depth + 1, listing)
+                    if error:
+                        yield error
+            else:
+                yield indent + ("└── " if is_last_item else "├── ") + name  # Print file names
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+class TreeOutput:
+    """
+    Destination of the tree lines: the console, a log file, or both. Lines are collected and written in
+    blocks of about buffer_size characters, one write per destination per block, instead of a print and a
+    file write for every line.
+    """
+
+    def __init__(self, console=True, log_file=None, buffer_size=OUTPUT_BUFFER_SIZE):
+        self.console = sys.stdout if console is True else (console or None) # True, False or a text stream
+        self.log_file = log_file
+        self.buffer_size = buffer_size
+        self.lines = 0
+        self._parts = []
+        self._size = 0
+
+    def write_line(self, text):
+        self._parts.append(text)
+        self._size += len(text) + 1
+        self.lines += 1
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if not self._parts:
+            return
+        block = "\n".join(self._parts) + "\n"
+        self._parts = []
+        self._size = 0
+        if self.console is not None:
+            self.console.write(block)
+            self.console.flush()
+        if self.log_file is not None:
+            self.log_file.write(block)
+
+def print_directory_tree(start_path, indent="", is_last=False, log_file=None, current_depth=0, max_depth=None, workers=DEFAULT_WORKERS, output=None, index=None, snapshot=None):
     """
-    Recursively prints the directory tree structure relative to the start path, logging to a file.
+    Prints the directory tree structure relative to the start path, logging to a file.
     Args:
         start_path (str): The path to the directory to start traversing from.
         indent (str): The current indentation level for printing the tree.
@@ -11,36 +468,21 @@ def print_directory_tree(start_path, indent="", is_last=False, log_file=None, cu
         log_file (file object): The file to log the output to.
         current_depth (int): Current depth in the directory hierarchy.
         max_depth (int): Maximum depth to traverse. None means no limit.
+        workers (int): Threads listing directories ahead of the output (1 lists them one at a time).
+        output (TreeOutput): Where the lines go; defaults to the console plus log_file. It is flushed on return.
+        index (TreeIndex): Optional index filled in during the same walk.
+        snapshot (TreeSnapshot): Optional listing cache used and refreshed by the walk.
     """
-    # Check if we've reached the maximum depth
-    if max_depth is not None and current_depth >= max_depth:
-        return
+    if output is None:
+        output = TreeOutput(console=True, log_file=log_file)
     try:
-        # Get all items in the directory
-        all_items = os.listdir(start_path)
-        
-        # Filter out .git and target folders
-        items = [item for item in all_items if not ((item == ".git" or item == "target" or item == "node_modules") 
-                                                   and os.path.isdir(os.path.join(start_path, item)))]
-        
-        num_items = len(items)
-        for i, item in enumerate(items):
-            item_path = os.path.join(start_path, item)
-            is_last_item = (i == num_items - 1)
-            if os.path.isdir(item_path):
-                line = indent + ("└── " if is_last_item else "├── ") + item + "/"  # Indicate directory with "/"
-                print_and_log(line, log_file)
-                new_indent = indent + ("    " if is_last_item else "│   ")
-                print_directory_tree(item_path, new_indent, is_last_item, log_file, current_depth + 1, max_depth)
-            else:
-                line = indent + ("└── " if is_last_item else "├── ") + item  # Print file names
-                print_and_log(line, log_file)
-    except OSError as e:
-        line = f"Error accessing {start_path}: {e}"
-        print_and_log(line, log_file)
+        for line in iter_tree_lines(start_path, indent, current_depth, max_depth, workers, index, snapshot):
+            output.write_line(line)
     except Exception as e:
         line = f"An unexpected error occurred: {e}"
-        print_and_log(line, log_file)
+        output.write_line(line)
+    finally:
+        output.flush()
 
 def print_and_log(text, log_file):
     """Prints the text to the console and logs it to the file."""
@@ -64,6 +506,18 @@ ARGUMENTS:
 
 OPTIONS:
     --force            Force execution in current directory
+    --workers N        Threads listing directories in parallel (default: {workers}; 1 = sequential)
+    --quiet            Only write the log file; the tree is not shown in the console
+    --no-log           Only show the tree in the console; no log file is written
+    --log-file PATH    Write the log to PATH instead of 'tree_log.txt'
+    --index PATH       Also write a machine-readable index: path, type, size, mtime per entry and
+                       file/dir/size totals per directory (SQLite for .db/.sqlite/.sqlite3, else JSON Lines)
+    --line-counts      Add line counts per file (and per directory subtree) to the index
+    --snapshot PATH    Keep a snapshot of the tree in PATH; directories unchanged since the last run
+                       (same mtime) are not listed again. The tool's own output files are left out
+    --diff             Instead of the tree, show what was added (+), removed (-) or modified (~) since
+                       the last snapshot (default snapshot: one file per tree in ~/.cache/tree_logger).
+                       Modified files are found by the sizes and mtimes recorded by --diff runs
     -h, --help         Show this help message
 
 EXAMPLES:
@@ -71,11 +525,14 @@ EXAMPLES:
     python tree.py /path/to/folder 3        # Show tree with max depth of 3
     python tree.py --force                  # Force run in current directory
     python tree.py --force 2                # Force run in current dir with depth 2
+    python tree.py . --no-log --quiet --index tree.db --line-counts   # Only write an SQLite index
+    python tree.py /path/to/folder --diff   # Changes since the previous --diff of that folder
 
 OUTPUT:
-    - Displays tree structure in console
-    - Saves output to 'tree_log.txt' in current directory
-    - Automatically excludes .git and target directories
+    - Displays tree structure in console (unless --quiet)
+    - Saves output to 'tree_log.txt' in current directory (unless --no-log)
+    - With --index, writes the index to the given path
+    - Automatically excludes .git, target and node_modules directories
 
 TREE FORMAT:
     my_project/
@@ -87,16 +544,60 @@ TREE FORMAT:
     │   └── test_main.py
     └── README.md
 """
-    print(usage_text)
+    print(usage_text.format(workers=DEFAULT_WORKERS))
+
+def pop_option(args, name):
+    """Removes `name VALUE` from the argument list and returns VALUE (None when the option is absent)."""
+    if name not in args:
+        return None
+    index = args.index(name)
+    if index + 1 >= len(args):
+        print(f"Warning: {name} needs a value. Ignoring it.")
+        del args[index]
+        return None
+    value = args[index + 1]
+    del args[index:index + 2]
+    return value
+
+def pop_flag(args, name):
+    """Removes `name` from the argument list; returns whether it was present."""
+    if name not in args:
+        return False
+    args.remove(name)
+    return True
 
 def main():
     """
     Main function to parse arguments and start the directory tree printing, logging to a file.
     """
+    argv = sys.argv[:]
     # Check for help option first
-    if len(sys.argv) > 1 and sys.argv[1] in ['-h', '--help']:
+    if len(argv) > 1 and argv[1] in ['-h', '--help']:
         print_usage()
         return
+
+    # Options may appear anywhere; what remains is parsed positionally below
+    workers = DEFAULT_WORKERS
+    workers_arg = pop_option(argv, "--workers")
+    if workers_arg is not None:
+        try:
+            workers = max(1, int(workers_arg))
+        except ValueError:
+            print(f"Warning: Invalid worker count '{workers_arg}'. Using {DEFAULT_WORKERS}.")
+    quiet = pop_flag(argv, "--quiet")
+    no_log = pop_flag(argv, "--no-log")
+    log_file_path = pop_option(argv, "--log-file") or DEFAULT_LOG_FILE
+    index_path = pop_option(argv, "--index")
+    line_counts = pop_flag(argv, "--line-counts")
+    snapshot_path = pop_option(argv, "--snapshot")
+    diff = pop_flag(argv, "--diff")
+    if line_counts and index_path is None:
+        print("Warning: --line-counts only applies with --index. Ignoring it.")
+    if quiet and no_log and index_path is None:
+        print("Error: --quiet and --no-log together leave nothing to output.")
+        return
+    if no_log:
+        log_file_path = None
     
     # Set default values
     start_path = None
@@ -104,8 +605,8 @@ def main():
     force_current_dir = False
     
     # Use sys.argv to get the command-line arguments
-    if len(sys.argv) > 1:
-        first_arg = sys.argv[1]
+    if len(argv) > 1:
+        first_arg = argv[1]
         
         # Check for --force option
         if first_arg == "--force":
@@ -113,39 +614,63 @@ def main():
             start_path = "."  # Current directory
             
             # Check if depth limit was provided after --force
-            if len(sys.argv) > 2:
+            if len(argv) > 2:
                 try:
-                    max_depth = int(sys.argv[2])
+                    max_depth = int(argv[2])
                     print(f"Depth limit set to: {max_depth}")
                 except ValueError:
-                    print(f"Warning: Invalid depth limit '{sys.argv[2]}'. Using no limit.")
+                    print(f"Warning: Invalid depth limit '{argv[2]}'. Using no limit.")
             
             print("Forcing execution in current directory...")
-            continue_script(start_path, max_depth)
+            continue_script(start_path, max_depth, workers, not quiet, log_file_path, index_path, line_counts,
+                            snapshot_path, diff)
             
         else:
             # Regular path argument
             start_path = first_arg
             
             # Check if a depth limit was provided
-            if len(sys.argv) > 2:
+            if len(argv) > 2:
                 try:
-                    max_depth = int(sys.argv[2])
+                    max_depth = int(argv[2])
                     print(f"Depth limit set to: {max_depth}")
                 except ValueError:
-                    print(f"Warning: Invalid depth limit '{sys.argv[2]}'. Using no limit.")
+                    print(f"Warning: Invalid depth limit '{argv[2]}'. Using no limit.")
             
-            continue_script(start_path, max_depth)
+            continue_script(start_path, max_depth, workers, not quiet, log_file_path, index_path, line_counts,
+                            snapshot_path, diff)
     else:
         print("No arguments provided.")
         print("Default relative directory logging is disabled due to caution.")
         print("Use '--force' to run in current directory or provide a specific path.")
         print("Use '-h' for help.")
 
-def continue_script(start_path, max_depth=None):
-    log_file_path = "tree_log.txt"
+def write_diff(snapshot, has_previous, output):
+    """Writes the changes since the previous snapshot, one per line, followed by a summary line."""
+    if not has_previous:
+        output.write_line("No previous snapshot to compare with; the current tree is recorded for the next --diff.")
+        output.flush()
+        return
+    taken_at = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot.previous_taken_at_ns / 10**9))
+    output.write_line(f"Changes since snapshot of {taken_at}:")
+    counts = {"+": 0, "-": 0, "~": 0}
+    for change, path, detail in snapshot.diff():
+        counts[change] += 1
+        output.write_line(f"{change} {path}" + (f" ({detail})" if detail else ""))
+    output.write_line(f"{counts['+']} added, {counts['-']} removed, {counts['~']} modified")
+    output.flush()
+
+def continue_script(start_path, max_depth=None, workers=DEFAULT_WORKERS, console=True, log_file_path=DEFAULT_LOG_FILE,
+                    index_path=None, line_counts=False, snapshot_path=None, diff=False):
+    """
+    Prints/logs the tree of start_path. `console` False logs only (--quiet); `log_file_path` None prints only
+    (--no-log). With index_path, the same walk also writes a TreeIndex there. With snapshot_path, the walk
+    reuses and refreshes a TreeSnapshot; `diff` prints/logs the changes since that snapshot instead of the tree.
+    """
     try:
-        with open(log_file_path, "w", encoding="utf-8") as log_file:  # Specify encoding here
+        with open(log_file_path or os.devnull, "w", encoding="utf-8") as log_file:  # Specify encoding here
+            if log_file_path is None:
+                log_file = None
             if not os.path.exists(start_path):
                 line = f"Error: The path '{start_path}' does not exist."
                 print_and_log(line, log_file)
@@ -162,12 +687,49 @@ def continue_script(start_path, max_depth=None):
                 root_name = os.path.basename(start_path)
             
             line = root_name + "/"  # Print the root directory name
-            print(f"Attempting to access directory tree starting at: '{os.path.abspath(start_path)}'")
-            if max_depth is not None:
-                print(f"With maximum depth of: {max_depth}")
-            print_and_log(line, log_file)
-            print_directory_tree(start_path, log_file=log_file, max_depth=max_depth)
-            print(f"Tree logged to: {os.path.abspath(log_file_path)}")
+            if console:
+                print(f"Attempting to access directory tree starting at: '{os.path.abspath(start_path)}'")
+                if max_depth is not None:
+                    print(f"With maximum depth of: {max_depth}")
+            output = TreeOutput(console=console, log_file=log_file)
+            index = TreeIndex(start_path, line_counts) if index_path else None
+            snapshot = None
+            has_previous = False
+            if diff and not snapshot_path:
+                snapshot_path = default_snapshot_path(start_path)
+            if snapshot_path:
+                own_files = [path for path in (snapshot_path, log_file_path, index_path) if path]
+                snapshot = TreeSnapshot(start_path, stat_files=diff, ignored_paths=own_files)
+                has_previous = snapshot.load(snapshot_path)
+            if diff:
+                # The walk only refreshes the snapshot; its tree lines are not shown
+                print_directory_tree(start_path, max_depth=max_depth, workers=workers,
+                                     output=TreeOutput(console=False), index=index, snapshot=snapshot)
+                write_diff(snapshot, has_previous, output)
+            else:
+                output.write_line(line)
+                print_directory_tree(start_path, max_depth=max_depth, workers=workers, output=output, index=index, snapshot=snapshot)
+            if log_file_path is not None:
+                print(f"Tree logged to: {os.path.abspath(log_file_path)} ({output.lines} lines)")
+            if index is not None:
+                try:
+                    records = index.write(index_path)
+                except (OSError, ValueError) as e:
+                    print(f"Error writing index '{index_path}': {e}")
+                    return
+                root = records[0]
+                summary = f"{len(records)} entries, {root['files']} files, {root['total_size']:,} bytes"
+                if line_counts:
+                    summary += f", {root['total_lines']:,} lines"
+                print(f"Index written to: {os.path.abspath(index_path)} ({summary})")
+            if snapshot is not None:
+                try:
+                    snapshot.save(snapshot_path)
+                except (OSError, ValueError) as e:
+                    print(f"Error writing snapshot '{snapshot_path}': {e}")
+                    return
+                print(f"Snapshot saved to: {os.path.abspath(snapshot_path)} "
+                      f"(reused {snapshot.reused} of {len(snapshot.directories)} directory listings)")
     except Exception as e:
         print(f"Error opening or writing to log file: {e}")
 